@@ -1,26 +1,87 @@
+import time
+_T0 = time.perf_counter()  # instante zero da medição de abertura (core/tempo_inicio.py)
+
 import multiprocessing
 import sys
 import os
 import io
+import json
 import tkinter as tk
 from tkinter import messagebox
 from datetime import datetime
 import subprocess
-from playwright.sync_api import sync_playwright
 
 # ===== PROTEÇÃO CRÍTICA: BLOQUEIA GUI EM MODO EXECUTOR =====
 if os.environ.get("EXECUTOR_MODE") == "1":
     print("[BLOQUEIO] Tentativa de abrir GUI em modo executor - BLOQUEADO")
     sys.exit(1)
 
+def _pasta_navegadores():
+    """Onde o Playwright instala os navegadores (mesma regra do próprio Playwright)."""
+    caminho = os.environ.get("PLAYWRIGHT_BROWSERS_PATH")
+    if caminho == "0":
+        try:
+            import importlib.util
+            spec = importlib.util.find_spec("playwright")
+            return os.path.join(os.path.dirname(spec.origin), "driver", "package", ".local-browsers")
+        except Exception:
+            return None
+    if caminho:
+        return caminho
+    if sys.platform == "win32":
+        return os.path.join(os.environ.get("LOCALAPPDATA", ""), "ms-playwright")
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Caches/ms-playwright")
+    return os.path.expanduser("~/.cache/ms-playwright")
+
+def _impressao_navegador():
+    """
+    Identifica a instalação atual sem abrir navegador nenhum:
+    versão do Playwright + pastas chromium-* instaladas + Chrome/Edge do sistema.
+    """
+    try:
+        from importlib.metadata import version
+        versao_pw = version("playwright")
+    except Exception:
+        versao_pw = None
+    pasta = _pasta_navegadores()
+    try:
+        instalados = sorted(n for n in os.listdir(pasta) if n.startswith("chromium"))
+    except Exception:
+        instalados = []
+    try:
+        from core.paths import get_chrome_path
+        chrome = get_chrome_path()
+        chrome_stamp = [chrome, os.path.getmtime(chrome), os.path.getsize(chrome)]
+    except Exception:
+        chrome_stamp = None
+    return {"playwright": versao_pw, "pasta": pasta, "chromium": instalados, "chrome": chrome_stamp}
+
 def assegurar_navegador():
-    """Verifica se o Chromium está instalado, se não, exibe aviso e instala."""
+    """
+    Verifica se o Chromium está instalado, se não, exibe aviso e instala.
+    O teste real (abrir e fechar o Chromium) só roda quando a instalação muda;
+    a última verificada fica em user_data/navegador_ok.json.
+    """
     if "--parent-process" in sys.argv or "install" in sys.argv:
         return
-    
+
+    from core.paths import get_user_data_dir
+    cache_file = os.path.join(get_user_data_dir(), "navegador_ok.json")
+    impressao = _impressao_navegador()
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            if json.load(f) == json.loads(json.dumps(impressao)):
+                return
+    except Exception:
+        pass
+
     try:
+        from playwright.sync_api import sync_playwright
         with sync_playwright() as p:
             p.chromium.launch(headless=True).close()
+        with open(cache_file, "w", encoding="utf-8") as f:
+            json.dump(impressao, f)
     except Exception:
         # Criar uma janela de aviso temporária
         root = tk.Tk()
@@ -59,8 +120,9 @@ if __name__ == "__main__":
             pass
 
     # --- 3. IMPORTS BÁSICOS ---
-    import json
     import argparse
+    from core import tempo_inicio
+    tempo_inicio.iniciar(_T0)
     from core.paths import get_app_base_dir, get_whatsapp_profile_dir
 
     BASE_DIR = get_app_base_dir()
@@ -77,8 +139,81 @@ if __name__ == "__main__":
     parser.add_argument("--auto", help="Arquivo JSON de automação")
     parser.add_argument("--executor-json", help="Executa automação isolada via executor.py")
     parser.add_argument("--task_id", type=int, help="ID da tarefa")
+    parser.add_argument("--servico-sessao", action="store_true", help="Mantém um navegador logado atendendo envios")
+    parser.add_argument("--parar-servico-sessao", action="store_true", help="Encerra o serviço de sessão")
+    parser.add_argument("--contas", action="store_true", help="Lista as contas (perfis) e as estatísticas de envio")
+    parser.add_argument("--adicionar-conta", metavar="NOME", help="Registra uma conta nova (perfil próprio)")
+    parser.add_argument("--manutencao-perfil", action="store_true", help="Relatório de tamanho e limpeza dos caches do perfil")
+    parser.add_argument("--somente-relatorio", action="store_true", help="Com --manutencao-perfil: não apaga nada")
+    parser.add_argument("--agressivo", action="store_true", help="Com --manutencao-perfil: apaga também as mídias do IndexedDB")
+    parser.add_argument("--medir-inicializacao", action="store_true", help="Com --manutencao-perfil: mede a abertura antes/depois")
+    parser.add_argument("--conta", help="Conta (perfil) usada pela manutenção")
+    parser.add_argument("--agendar-manutencao", metavar="HH:MM", help="Agenda a manutenção semanal do perfil (domingo)")
+    parser.add_argument("--relatorio-fases", action="store_true", help="Percentis (p50/p90/p99) do tempo de cada fase das tarefas")
+    parser.add_argument("--desde", metavar="AAAA-MM-DD", help="Com --relatorio-fases: data inicial")
+    parser.add_argument("--ate", metavar="AAAA-MM-DD", help="Com --relatorio-fases: data final (inclusiva)")
+    parser.add_argument("--benchmark-db", action="store_true", help="Mede a latência do banco num arquivo temporário")
+    parser.add_argument("--repeticoes", type=int, default=300, help="Com --benchmark-db: chamadas por operação")
     args, _ = parser.parse_known_args()
 
+    # --- 4.1 SERVIÇO DE SESSÃO RESIDENTE (SEM GUI) ---
+    if args.servico_sessao:
+        from core.session_service import main as servico_main
+        sys.exit(servico_main())
+
+    if args.parar_servico_sessao:
+        from core.session_service import parar_servico
+        resultado = parar_servico()
+        if resultado is None:
+            print("[SERVIÇO] Nenhum serviço rodando.")
+        elif resultado.get("ok"):
+            print("[SERVIÇO] Encerrado.")
+        else:
+            print(f"[SERVIÇO] ❌ Não foi possível encerrar: {resultado.get('erro')}")
+            sys.exit(1)
+        sys.exit(0)
+
+    # --- 4.2 REGISTRO DE CONTAS ---
+    if args.adicionar_conta:
+        from core.contas import adicionar_conta
+        conta = adicionar_conta(args.adicionar_conta)
+        print(f"[CONTAS] Conta '{conta['nome']}' registrada | Perfil: {conta['perfil']}")
+        sys.exit(0)
+
+    if args.contas:
+        from core.contas import listar_contas, ler_estatisticas
+        stats = ler_estatisticas()
+        for conta in listar_contas():
+            s = stats.get(conta["nome"], {})
+            print(f"{conta['nome']:<20} {conta['perfil']:<40} "
+                  f"{s.get('enviados', 0)} ok | {s.get('falhas', 0)} falha(s) | {s.get('segundos', 0)}s")
+        sys.exit(0)
+
+    # --- 4.3 MANUTENÇÃO DO PERFIL ---
+    if args.manutencao_perfil:
+        from core.manutencao_perfil import main as manutencao_main
+        sys.exit(manutencao_main(
+            limpar=not args.somente_relatorio,
+            agressivo=args.agressivo,
+            medir=args.medir_inicializacao,
+            conta=args.conta
+        ))
+
+    if args.agendar_manutencao:
+        from core.windows_scheduler import create_maintenance_task
+        ok, msg = create_maintenance_task(args.agendar_manutencao)
+        print(msg)
+        sys.exit(0 if ok else 1)
+
+    # --- 4.4 RELATÓRIO DE TEMPO POR FASE ---
+    if args.relatorio_fases:
+        from core.linha_do_tempo import main as relatorio_main
+        sys.exit(relatorio_main(args.desde, args.ate))
+
+    if args.benchmark_db:
+        from core.benchmark_db import main as benchmark_main
+        sys.exit(benchmark_main(args.repeticoes))
+
     # --- 5. MODO EXECUTOR (USADO NO EXECUTÁVEL) ---
     if args.executor_json:
         from executor import main as executor_main
@@ -94,8 +229,11 @@ if __name__ == "__main__":
     # --- 7. MODO GUI ---
     else:
         try:
+            tempo_inicio.marcar("imports")
             assegurar_navegador()
+            tempo_inicio.marcar("navegador")
             from ui.main_window import App
+            tempo_inicio.marcar("modulos_gui")
             app = App()
             app.mainloop()
         except Exception as e:
@@ -1,37 +1,14 @@
 import os
 os.environ["PLAYWRIGHT_BROWSERS_PATH"] = "0"
-import time
 import sys
 import json
-import pyperclip
-from core.paths import get_chrome_path
-
-def _log(logger, msg):
-    if logger:
-        try: logger.info(msg) if hasattr(logger, 'info') else logger(msg)
-        except: pass
-    else: print(f"[LOG] {msg}")
-
-def clicar_primeiro_disponivel(page, lista_seletores, timeout_por_tentativa=300, escrever_texto=None):
-    """
-    Percorre a lista de seletores rapidamente. 
-    Se encontrar, clica. Se houver escrever_texto, ele cola o conteúdo.
-    """
-    for sel in lista_seletores:
-        try:
-            elemento = page.locator(sel).last # Usa o último para evitar menus ocultos
-            elemento.wait_for(state="visible", timeout=timeout_por_tentativa)
-            elemento.scroll_into_view_if_needed()
-            elemento.click(force=True)
-            
-            if escrever_texto:
-                time.sleep(1)
-                pyperclip.copy(escrever_texto)
-                page.keyboard.press("Control+V")
-            return True
-        except:
-            continue
-    return False
+import asyncio
+import threading
+# Constantes e auxiliares compartilhados com core/automation_async.py (reexportados aqui)
+from core.automation_base import (
+    _log, FalhaParcialAnexos, pior_status, argumentos_navegador, agrupar_anexos,
+    separar_arquivos, extrair_numero, identidade_de_conversa, titulo_corresponde,
+)
 
 def contador_execucao(incrementar=True):
     base_dir = os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -49,274 +26,108 @@ def contador_execucao(incrementar=True):
             f.write(str(count))
     return count
 
-def iniciar_driver(userdir, modo_execucao='manual', logger=None):
-    from playwright.sync_api import sync_playwright
-    userdir = os.path.abspath(userdir)
-    os.makedirs(userdir, exist_ok=True)
-
-    #if getattr(sys, 'frozen', False) or 'nuitka' in sys.modules:
-        # Força o Playwright a usar a pasta padrão de instalação no AppData do Windows
-        #os.environ["PLAYWRIGHT_BROWSERS_PATH"] = "0"
-    _log(logger, f"Iniciando Playwright | Perfil: {userdir}")
-    _log(logger, f"Modo de execução: {modo_execucao}")
-    pw = sync_playwright().start()
-    is_auto = modo_execucao in ['auto', 'background']
-
-    _log(logger, f"is_auto = {is_auto}")  
-    
-    browser_args = [
-        '--disable-blink-features=AutomationControlled',
-        '--disable-notifications', 
-        '--no-sandbox', 
-        '--disable-setuid-sandbox',
-        '--start-maximized', 
-        '--force-device-scale-factor=0.90', 
-        '--high-dpi-support=1', 
-        '--lang=pt-BR'
-    ]
-    
-    if is_auto:
-        browser_args.extend(['--window-position=-2400,-2400', '--force-device-scale-factor=0.90','--window-size=1366,768', '--high-dpi-support=1'])
+# ===== API SÍNCRONA =====
+# Invólucros finos sobre core/automation_async.py (usados pelo executor.py e por scripts),
+# importado sob demanda para a interface não carregar o Playwright só pelo contador.
+# Todos rodam as corrotinas no MESMO event loop (_rodar); para várias contas ao mesmo
+# tempo use automation_async.executar_contas_em_paralelo.
 
-    chromium_path = get_chrome_path()
-    _log(logger, f"Chrome path: {chromium_path}")
-    _log(logger, f"Browser args: {browser_args}")
+_loop_sincrono = None
+_trava_loop = threading.Lock()
 
+def _rodar(corrotina):
+    """
+    Roda a corrotina no event loop das chamadas síncronas (thread própria, criado no
+    primeiro uso) e devolve o resultado. O loop continua vivo entre as chamadas: os
+    objetos do Playwright de um NavegadorSincrono só funcionam no loop em que nasceram.
+    """
+    global _loop_sincrono
+    with _trava_loop:
+        if _loop_sincrono is None:
+            _loop_sincrono = asyncio.new_event_loop()
+            threading.Thread(target=_loop_sincrono.run_forever, name="automacao-sincrona", daemon=True).start()
+    futuro = asyncio.run_coroutine_threadsafe(corrotina, _loop_sincrono)
     try:
-        browser_context = pw.chromium.launch_persistent_context(
-            executable_path=str(chromium_path),
-            user_data_dir=userdir, 
-            headless=False, 
-            args=browser_args, 
-            locale="pt-BR", 
-            timezone_id="America/Sao_Paulo",
-            viewport=None, 
-            no_viewport=True,
-            # User agent comum para evitar bloqueios
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
-        )
-    except Exception as e:
-        _log(logger, "❌ Erro ao lançar navegador. Verifique se já não há uma janela aberta.")
-        pw.stop()
-        raise e
-    
-    page = browser_context.pages[0]
-    page.set_default_timeout(120000)
-    try:
-        page.goto("https://web.whatsapp.com")
-        page.wait_for_selector('div[data-tab="3"]', timeout=120000)
-        _log(logger, "✓ WhatsApp carregado.")
-    except Exception as e:
-        if is_auto: 
-            try: page.screenshot(path="erro_login.png")
-            except: pass
-        # Se falhar o login, não derruba tudo imediatamente, tenta fechar limpo
-        raise e
-    return pw, browser_context, page
-
-def enviar_arquivo_com_mensagem(page, file_path, message, logger=None):
-    _log(logger, "📎 Preparando anexos...")
-    
-    # 1. Botão Anexar
-    xpath_anexo = '//div[@aria-label="Anexar"] | //span[@data-icon="plus"] | //span[@data-icon="plus-rounded"] | //span[@data-icon="clip"] | //div[@aria-label="Attach"]'
-    btn_anexo = page.wait_for_selector(xpath_anexo, state="visible", timeout=120000)
-    btn_anexo.click()
-    time.sleep(2)
-
-    # 2. Processamento de Caminhos
-    if isinstance(file_path, str):
-        clean_path = file_path.replace('nC:\\', '\nC:\\').replace('"', '')
-        lista_arquivos = [os.path.abspath(p.strip()) for p in clean_path.split('\n') if p.strip()]
-    else:
-        lista_arquivos = [os.path.abspath(str(file_path).strip())]
-
-    ext = os.path.splitext(lista_arquivos[0].lower())[1]
-    is_media = ext in ['.jpg', '.jpeg', '.png', '.gif', '.mp4', '.avi']
+        return futuro.result()
+    except BaseException:
+        # Ctrl+C etc.: cancela a corrotina para ela fechar o navegador no finally
+        futuro.cancel()
+        raise
 
-    # SEPARAÇÃO DOS SEUS SELETORES DE TIPO (FOTO OU DOCUMENTO)
-    if is_media:
-        seletores_tipo = [
-            "xpath=//span[contains(text(), 'Fotos')]",    # PT
-            "xpath=//span[contains(text(), 'Photos')]",   # EN
-            "xpath=//div[@aria-label='Fotos e vídeos']",
-            "xpath=//div[@aria-label='Photos & videos']",
-            "css=[data-icon='image']", 
-            "css=[data-testid='mi-attach-media']",
-            "xpath=//div[@aria-label='Fotos e vídeos']",
-            "css=#app > div > div > span:nth-child(8) > div > ul > div > div > div:nth-child(2) > li > div > span",
-            "xpath=//*[@id='app']/div/div/span[6]/div/ul/div/div/div[2]/li/div/span",
-            "xpath=/html/body/div[1]/div/div/div/div/span[6]/div/ul/div/div/div[2]/li/div/span",
-            'css=#app > div > div > div:nth-child(11) > div > div > div.xu96u03.xm80bdy.x10l6tqk.x13vifvy.xoz0ns6.x1gslohp > div.html-div.xdj266r.x14z9mp.xat24cr.x1lziwak.xexx8yu.xyri2b.x18d9i69.x1c1uobl > div > div > div > div > div.x78zum5.xdt5ytf.x1iyjqo2.x1n2onr6 > div:nth-child(2) > div.x6s0dn4.xlr9sxt.xvvg52n.xwd4zgb.xq8v1ta.x78zum5.xu0aao5.xh8yej3 > div.x78zum5.xdt5ytf.x1iyjqo2.xeuugli.x6ikm8r.x10wlt62.xde1mab > span',
-            'xpath=//*[@id="app"]/div/div/div[4]/div/div/div[1]/div[1]/div/div/div/div/div[1]/div[2]/div[1]/div[2]/span',
-            'xpath=/html/body/div[1]/div/div/div/div/div[4]/div/div/div[1]/div[1]/div/div/div/div/div[1]/div[2]/div[1]/div[2]/span'
-        ]
-        backup_selector = "input[type='file']"
-    else:
-        seletores_tipo = [
-            "xpath=//span[contains(text(), 'Documento')]", # PT
-            "xpath=//span[contains(text(), 'Document')]",  # EN
-            "xpath=//div[@aria-label='Documento']",
-            "xpath=//div[@aria-label='Document']",
-            "css=[data-icon='document']",
-            "css=[data-testid='mi-attach-document']",
-            "xpath=//div[@aria-label='Documento']",
-            "css=#app > div > div > span:nth-child(8) > div > ul > div > div > div:nth-child(1) > li > div > span",
-            'css=#app > div > div > div:nth-child(11) > div > div > div.xu96u03.xm80bdy.x10l6tqk.x13vifvy.xoz0ns6.x1gslohp > div.html-div.xdj266r.x14z9mp.xat24cr.x1lziwak.xexx8yu.xyri2b.x18d9i69.x1c1uobl > div > div > div > div > div.x78zum5.xdt5ytf.x1iyjqo2.x1n2onr6 > div:nth-child(1) > div.x6s0dn4.xlr9sxt.xvvg52n.xwd4zgb.xq8v1ta.x78zum5.xu0aao5.xh8yej3 > div.x78zum5.xdt5ytf.x1iyjqo2.xeuugli.x6ikm8r.x10wlt62.xde1mab > span',
-            'xpath=//*[@id="app"]/div/div/div[4]/div/div/div[1]/div[1]/div/div/div/div/div[1]/div[1]/div[1]/div[2]/span',
-            'xpath=/html/body/div[1]/div/div/div/div/div[4]/div/div/div[1]/div[1]/div/div/div/div/div[1]/div[1]/div[1]/div[2]/span',
-            "xpath=//*[@id='app']/div/div/span[6]/div/ul/div/div/div[1]/li/div/span",
-            "xpath=/html/body/div[1]/div/div/div/div/span[6]/div/ul/div/div/div[1]/li/div/span"
-        ]
-        backup_selector = "input[type='file']"
-
-    # Tentativa de clique no tipo de arquivo
-    clicou_tipo = False
-    time.sleep(2)
-
-    for sel in seletores_tipo:
-        try:
-            with page.expect_file_chooser(timeout=1000) as fc_info:
-                page.locator(sel).first.click(force=True, timeout=1000)
-            file_chooser = fc_info.value
-            file_chooser.set_files(lista_arquivos)
-            clicou_tipo = True
-            _log(logger, f"✅ Arquivo(s) carregados via: {sel}")
-            break
-        except:
-            continue
-    
-    if not clicou_tipo:
-        raise Exception("Nenhum seletor de tipo de arquivo funcionou.")
-    
-    # ESPERA DINÂMICA DE CARREGAMENTO (ARQUIVOS PESADOS)
-    # ================================================================
-    _log(logger, f"⏳ Processando {len(lista_arquivos)} arquivo(s). Aguardando o WhatsApp carregar...")
-    
-    # Seletor do botão de enviar (que só aparece quando o arquivo está pronto para legenda)
-    xpath_btn_enviar = '//*[@data-icon="send"] | //div[@aria-label="Enviar"] | //span[@data-icon="send"] | //*[@id="app"]/div/div/div[3]/div/div[3]/div[2]/div/span/div/div/div/div[2]/div/div[2]/div[2]/span/div/div[1]/span' 
-    
-    try:
-        # Timeout de 5 minutos (300.000ms) para arquivos pesados, NÃO vai esperar 5 min se carregar em 10 segundos, ele segue na hora.
-        page.wait_for_selector(xpath_btn_enviar, state="visible", timeout=300000)
-        _log(logger, "✅ Arquivos carregados com sucesso.")
-    except Exception as e:
-        _log(logger, "❌ Timeout: Os arquivos demoraram mais de 5 minutos ou houve erro no upload.")
-        raise e
+class NavegadorSincrono:
+    """
+    Navegador aberto para scripts que enviam passo a passo, sem asyncio:
 
-    # 3. Legenda (SEUS SELETORES)
-    if message:
-        _log(logger, "✍️ Inserindo legenda...")
-        seletores_legenda = [
-            "css=#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div.x10l6tqk.x13vifvy.x1o0tod.x78zum5.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x47corl > div.x9f619.x1n2onr6.x5yr21d.x6ikm8r.x10wlt62.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.xyyilfv.x1iyjqo2.xpilrb4.x1t7ytsu.x1vb5itz.x12xzwr > div > span > div > div > div > div.x1n2onr6.xupqr0c.x78zum5.x1r8uery.x1iyjqo2.xdt5ytf.x1hc1fzr.x6ikm8r.x10wlt62.x1anedsm > div > div.x1n2onr6.x78zum5.x98rzlu.xdt5ytf.x1qughib.x6ikm8r.x10wlt62 > div.x1n2onr6.x78zum5.x6s0dn4.xl56j7k.xbktkl8.x16ovd2e.xvtqlqk.x12xbjc7.xdx6fka > div > div > div.x1n2onr6.xh8yej3.x1k70j0n.x14z9mp.xzueoph.x1lziwak.xisnujt.x14ug900.x1vvkbs.x126k92a.x1hx0egp.lexical-rich-text-input > div.x1hx0egp.x6ikm8r.x1odjw0f.x1k6rcq7.x1lkfr7t > p",
-            "xpath=//*[@id='app']/div/div/div[3]/div/div[3]/div[2]/div/span/div/div/div/div[2]/div/div[1]/div[3]/div/div/div[1]/div[1]/p",
-            "xpath=/html/body/div[1]/div/div/div/div/div[3]/div/div[3]/div[2]/div/span/div/div/div/div[2]/div/div[1]/div[3]/div/div/div[1]/div[1]/p",
-            "xpath=//*[@id='app']/div/div/div[3]/div/div[3]/div[2]/div/span/div/div/div/div[2]/div/div[1]/div[3]/div/div/div[1]/div[1]/div[1]/p",
-            "css=#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div.x10l6tqk.x13vifvy.x1o0tod.x78zum5.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x47corl > div.x9f619.x1n2onr6.x5yr21d.x6ikm8r.x10wlt62.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.xyyilfv.x1iyjqo2.xpilrb4.x1t7ytsu.x1vb5itz.x12xzwr > div > span > div > div > div > div.x1n2onr6.xupqr0c.x78zum5.x1r8uery.x1iyjqo2.xdt5ytf.x1hc1fzr.x6ikm8r.x10wlt62.x1anedsm > div > div.x78zum5.x1iyjqo2.xs83m0k.x1r8uery.xdt5ytf.x1qughib.x6ikm8r.x10wlt62 > div.x1c4vz4f.xs83m0k.xdl72j9.x1g77sc7.x78zum5.xozqiw3.x1oa3qoh.x12fk4p8.xeuugli.x2lwn1j.xl56j7k.x1q0g3np.x6s0dn4.x1n2onr6.xo8q3i6.x1y1aw1k.xwib8y2.x1c1uobl.xyri2b > div > div > div.x1c4vz4f.xs83m0k.xdl72j9.x1g77sc7.x78zum5.xozqiw3.x1oa3qoh.x12fk4p8.xeuugli.x2lwn1j.x1nhvcw1.x1q0g3np.x1cy8zhl.x9f619.xh8yej3.x1ba4aug.x1tiyuxx.xvtqlqk.x1nbhmlj.xdx6fka.x1od0jb8.xyi3aci.xwf5gio.x1p453bz.x1suzm8a > div.x1n2onr6.xh8yej3.x1k70j0n.x14z9mp.xzueoph.x1lziwak.xisnujt.x14ug900.x1vvkbs.x126k92a.x1hx0egp.lexical-rich-text-input > div.x1hx0egp.x6ikm8r.x1odjw0f.x1k6rcq7.x1lkfr7t > p",
-            "xpath=//div[contains(@aria-label, 'legenda')]",
-            "css=div.lexical-rich-text-input div[contenteditable='true']",
-            'css=#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div.x10l6tqk.x13vifvy.x1o0tod.x78zum5.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x47corl > div.x9f619.x1n2onr6.x5yr21d.x6ikm8r.x10wlt62.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.xyyilfv.x1iyjqo2.xpilrb4.x1t7ytsu.x1vb5itz.x12xzxwr > div > span > div > div > div > div.x1n2onr6.xupqr0c.x78zum5.x1r8uery.x1iyjqo2.xdt5ytf.x1hc1fzr.x6ikm8r.x10wlt62.x1anedsm > div > div.x78zum5.x1iyjqo2.xs83m0k.x1r8uery.xdt5ytf.x1qughib.x6ikm8r.x10wlt62 > div.x1c4vz4f.xs83m0k.xdl72j9.x1g77sc7.x78zum5.xozqiw3.x1oa3qoh.x12fk4p8.xeuugli.x2lwn1j.xl56j7k.x1q0g3np.x6s0dn4.x1n2onr6.xo8q3i6.x1y1aw1k.xwib8y2.x1c1uobl.xyri2b > div > div > div > div.x1n2onr6.xh8yej3.x1k70j0n.x14z9mp.xzueoph.x1lziwak.xisnujt.x14ug900.x1vvkbs.x126k92a.x1hx0egp.lexical-rich-text-input > div.x1hx0egp.x6ikm8r.x1odjw0f.x1k6rcq7.x1lkfr7t > p',
-            'xpath=//*[@id="app"]/div/div/div[3]/div/div[3]/div[2]/div/span/div/div/div/div[2]/div/div[1]/div[3]/div/div/div/div[1]/div[1]/p',
-            'xpath=/html/body/div[1]/div/div/div/div/div[3]/div/div[3]/div[2]/div/span/div/div/div/div[2]/div/div[1]/div[3]/div/div/div/div[1]/div[1]/p',
-            "xpath=//div[contains(@aria-label, 'legenda')]", # Português
-            "xpath=//div[contains(@aria-label, 'caption')]", # Inglês
-            "css=div[contenteditable='true'][role='textbox']", # Genérico funcional
-            "css=.lexical-rich-text-input [contenteditable='true']", # Estrutura técnica
-            "xpath=//footer//div[@contenteditable='true']" # Posição na tela
-        ]
+        with NavegadorSincrono(perfil) as nav:
+            nav.enviar("5511999999999", "text", "Olá")
 
+    A página é da API assíncrona do Playwright e fica presa ao loop de _rodar, por
+    isso não é exposta: cada método roda a corrotina equivalente de automation_async.
+    """
+    def __init__(self, userdir, modo_execucao='manual', logger=None):
+        from core import automation_async
+        self.logger = logger
+        self._pw, self._context, self._page = _rodar(automation_async.iniciar_driver(userdir, modo_execucao, logger))
+
+    def enviar(self, target, mode, message=None, file_path=None, contatos=None, ja_enviados=None):
+        """Envio completo na página já carregada. Returns: dict {'status', 'latencia_s'}"""
+        from core import automation_async
         try:
-            page.wait_for_selector(seletores_legenda[0], state="visible", timeout=1000)
-        except:
-            _log(logger, "⚠️ Aviso: Tela de legenda demorou a aparecer, tentando loop rápido...")
-
-        time.sleep(1.2)
-        campo_ok = False
-        for sel in seletores_legenda:
-            try:
-                target = page.locator(sel).last
-                target.wait_for(state="visible", timeout=1000)
-                target.scroll_into_view_if_needed()
-                target.click(force=True)
-                time.sleep(2)
-                pyperclip.copy(message)
-                page.keyboard.press("Control+V")
-                campo_ok = True
-                _log(logger, "✅ Legenda inserida.")
-                break
-            except: continue
-        
-        if not campo_ok:
-            time.sleep(0.5)
-            _log(logger, "❌ Não foi possível encontrar o campo de legenda pelos seletores.")
-        time.sleep(0.5)
-
-    # 4. Enviar 
-    _log(logger, "🚀 Enviando...")
-    seletores_enviar = [
-        "css=#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div.x10l6tqk.x13vifvy.x1o0tod.x78zum5.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x47corl > div.x9f619.x1n2onr6.x5yr21d.x6ikm8r.x10wlt62.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.xyyilfv.x1iyjqo2.xpilrb4.x1t7ytsu.x1vb5itz.x12xzxwr > div > span > div > div > div > div.x1n2onr6.xupqr0c.x78zum5.x1r8uery.x1iyjqo2.xdt5ytf.x1hc1fzr.x6ikm8r.x10wlt62.x1anedsm > div > div.x78zum5.x1c4vz4f.x2lah0s.x1helyrv.x6s0dn4.x1qughib.x178xt8z.x13fuv20.xx42vgk.x1y1aw1k.xwib8y2.xf7dkkf.xv54qhq > div.x1247r65.xng8ra > span > div > div.x78zum5.x6s0dn4.xl56j7k.xexx8yu.xyri2b.x18d9i69.x1c1uobl.x1f6kntn.xk50ysn.xtvhhri.x1c9tyrk.xeusxvb.x1pahc9y.x1ertn4p.xu306ak.x12s1jxh.xkdsq27.xwwtwea.x1gfkgh9.x1247r65.xng8ra.x1pse0pq.xfn3atn > span",
-        "xpath=//span[@data-icon='send']",
-        "xpath=//div[@role='button' and @aria-label='Enviar']",
-        "xpath=//*[@id='app']/div/div/div[3]/div/div[3]/div[2]/div/span/div/div/div/div[2]/div/div[2]/div[2]/span/div/div/span",
-        "xpath=/html/body/div[1]/div/div/div/div/div[3]/div/div[3]/div[2]/div/span/div/div/div/div[2]/div/div[2]/div[2]/span/div/div/span",
-        "css=div[aria-label='Enviar'] span[data-icon='send']",
-        "css=#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div.x10l6tqk.x13vifvy.x1o0tod.x78zum5.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x47corl > div.x9f619.x1n2onr6.x5yr21d.x6ikm8r.x10wlt62.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.xyyilfv.x1iyjqo2.xpilrb4.x1t7ytsu.x1vb5itz.x12xzwr > div > span > div > div > div > div.x1n2onr6.xupqr0c.x78zum5.x1r8uery.x1iyjqo2.xdt5ytf.x1hc1fzr.x6ikm8r.x10wlt62.x1anedsm > div > div.x78zum5.x1c4vz4f.x2lah0s.x1helyrv.x6s0dn4.x1qughib.x178xt8z.x13fuv20.xx42vgk.x1y1aw1k.xwib8y2.xf7dkkf.xv54qhq > div.x1247r65.xng8ra > span > div > div > span",
-        "css=#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div.x10l6tqk.x13vifvy.x1o0tod.x78zum5.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x47corl > div.x9f619.x1n2onr6.x5yr21d.x6ikm8r.x10wlt62.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.xyyilfv.x1iyjqo2.xpilrb4.x1t7ytsu.x1vb5itz.x12xzxwr > div > span > div > div > div > div.x1n2onr6.xupqr0c.x78zum5.x1r8uery.x1iyjqo2.xdt5ytf.x1hc1fzr.x6ikm8r.x10wlt62.x1anedsm > div > div.x78zum5.x1c4vz4f.x2lah0s.x1helyrv.x6s0dn4.x1qughib.x178xt8z.x13fuv20.xx42vgk.x1y1aw1k.xwib8y2.xf7dkkf.xv54qhq > div.x1247r65.xng8ra > span > div > div > span",
-        "xpath=//*[@id='app']/div/div/div[3]/div/div[3]/div[2]/div/span/div/div/div/div[2]/div/div[2]/div[2]/span/div/div/span",
-    ]
-    time.sleep(2)
-    enviou = False
-    for sel_env in seletores_enviar:
+            return _rodar(automation_async.enviar_na_pagina(
+                self._page, target, mode, message, file_path, self.logger, contatos, ja_enviados
+            ))
+        finally:
+            _rodar(automation_async.resetar_tela(self._page))
+
+    def enviar_lote(self, jobs, contatos=None):
+        """Envia os jobs um após o outro. Returns: list[dict] um resultado por item"""
+        from core import automation_async
+        return _rodar(automation_async.enviar_lote_na_pagina(self._page, jobs, self.logger, contatos))
+
+    def enviar_arquivo_com_mensagem(self, file_path, message, ja_enviados=None):
+        """Envia os anexos (e a legenda) na conversa aberta. Returns: resultado por grupo de anexos."""
+        from core import automation_async
+        return _rodar(automation_async.enviar_arquivo_com_mensagem(self._page, file_path, message, self.logger, ja_enviados))
+
+    def clicar_primeiro_disponivel(self, lista_seletores, timeout_por_tentativa=300, escrever_texto=None, etapa=None):
+        """
+        Clica no primeiro seletor visível da lista (corrida única, ver resolver_primeiro_visivel).
+        Se houver escrever_texto, ele cola o conteúdo.
+        """
+        from core import automation_async
+        return _rodar(automation_async.clicar_primeiro_disponivel(
+            self._page, lista_seletores, timeout_por_tentativa, escrever_texto, etapa
+        ))
+
+    def fechar(self):
+        from core import automation_async
+        if self._context is None: return
         try:
-            btn = page.locator(sel_env).last
-            btn.wait_for(state="visible", timeout=1500)
-            btn.scroll_into_view_if_needed()
-            btn.click(force=True)
-            enviou = True
-            break
-        except: continue
+            _rodar(automation_async._fechar(self._pw, self._context))
+        finally:
+            self._pw = self._context = self._page = None
 
-    if not enviou:
-        _log(logger, "Botão não encontrado visualmente, apertando ENTER...")
-        page.keyboard.press("Enter")
-        enviou = True
+    def __enter__(self):
+        return self
 
-    if enviou:
-        time.sleep(15)
-        #contador_execucao(incrementar=True)
-        _log(logger, "🚀 Concluído!")
-    else:
-        page.keyboard.press("Enter") # plano B
+    def __exit__(self, *exc):
+        self.fechar()
 
-def executar_envio(userdir, target, mode, message=None, file_path=None, logger=None, modo_execucao='manual'):
-    pw, context, page = None, None, None
-    
-    try:
-        pw, context, page = iniciar_driver(userdir, modo_execucao, logger)
-        
-        search_box = page.locator('div[contenteditable="true"][data-tab="3"]')
-        search_box.fill(target)
-        time.sleep(5)
-        page.keyboard.press("Enter")
-        time.sleep(5)
+def executar_envio_em_lote(userdir, jobs, logger=None, modo_execucao='manual', contatos=None):
+    """
+    Abre o navegador UMA vez e envia todos os jobs do lote.
 
-        if mode == "text":
-            chat_box = page.locator('div[contenteditable="true"][data-tab="10"]')
-            chat_box.wait_for(state="visible")
-            chat_box.click(force=True)
-            pyperclip.copy(message)
-            page.keyboard.press("Control+V")
-            page.keyboard.press("Enter")
-            time.sleep(5)
-        else:
-            enviar_arquivo_com_mensagem(page, file_path, message, logger)
-            
-        return True
-    except Exception as e:
-        _log(logger, f"❌ Falha no processo: {str(e)}")
-        raise e
-    finally:
-        if context: context.close()
-        if pw: pw.stop()
+    Returns:
+        list[dict]: um resultado por item {'target', 'ok', 'erro'}
+    """
+    from core import automation_async
+    return _rodar(automation_async.executar_envio_em_lote(userdir, jobs, logger, modo_execucao, contatos))
+
+def executar_envio(userdir, target, mode, message=None, file_path=None, logger=None, modo_execucao='manual', contatos=None, ja_enviados=None):
+    from core import automation_async
+    return _rodar(automation_async.executar_envio(
+        userdir, target, mode, message, file_path, logger, modo_execucao, contatos, ja_enviados=ja_enviados
+    ))
 
 def run_auto(json_path):
     if not os.path.exists(json_path): return
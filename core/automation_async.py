@@ -0,0 +1,825 @@
+"""
+NÚCLEO ASSÍNCRONO DA AUTOMAÇÃO (playwright.async_api)
+
+Fluxo de envio sem bloquear o processo em cada espera: um único event loop pode
+dirigir vários contextos (contas) ao mesmo tempo. Seletores, scripts JS e funções
+puras ficam em core/automation_base.py.
+
+A API síncrona de core/automation.py (executar_envio, executar_envio_em_lote,
+NavegadorSincrono) é apenas um invólucro que roda estas corrotinas num event loop.
+
+Uso direto:
+    import asyncio
+    from core import automation_async
+    asyncio.run(automation_async.executar_envio(userdir, "5511999999999", "text", "Olá"))
+"""
+
+import os
+os.environ["PLAYWRIGHT_BROWSERS_PATH"] = "0"
+import time
+import asyncio
+from core.paths import get_chrome_path
+from core.config import get_config
+from core.selector_cache import get_selector_cache
+from core.filtro_rede import instalar_filtro
+from core.perfil_ram import preparar_perfil
+from core.automation_base import (
+    _log, _timeout, _separar_seletor, argumentos_navegador, separar_arquivos,
+    identidade_de_conversa, titulo_corresponde, extrair_numero, agrupar_anexos,
+    OPCOES_CONTEXTO, XPATH_MENU_ANEXO, XPATH_BOTAO_ANEXO, XPATH_BOTAO_ENVIAR_PREVIEW,
+    SELETORES_TIPO_MIDIA, SELETORES_TIPO_DOCUMENTO, SELETORES_LEGENDA, SELETORES_ENVIAR,
+    SELETOR_CAIXA_PESQUISA, SELETOR_CAIXA_MENSAGEM, SELETOR_BALAO_SAIDA, SELETOR_POPUP,
+    JS_MARCAR_CONVERSA, JS_NOVA_CONVERSA, JS_IDENTIDADE_CONVERSA, JS_ABRIR_ROTA_INTERNA,
+    JS_RESULTADO_PESQUISA, JS_EDITOR_FOCADO, JS_COLAR_SINTETICO, JS_EDITOR_CRESCEU,
+    JS_PRIMEIRO_VISIVEL, JS_STATUS_BALAO, JS_ESTADO_UPLOAD, JS_POPUP_NUMERO_INVALIDO, pior_status,
+    FalhaParcialAnexos,
+)
+from core import upload, cache_midia
+from core import linha_do_tempo
+
+async def aguardar_fase(logger, fase, condicao, espera_antiga=0.0, obrigatoria=True, limite=None):
+    """
+    Executa uma espera por condição (em vez de time.sleep fixo) e loga a duração.
+
+    Args:
+        fase: chave de TIMEOUTS_PADRAO (define o limite máximo)
+        condicao: função que recebe o timeout em ms e devolve o awaitable da espera
+        espera_antiga: segundos do sleep fixo que essa espera substituiu (para log de economia)
+        obrigatoria: se False, estourar o limite só gera aviso e o fluxo segue
+        limite: timeout em ms calculado pelo chamador (substitui o da fase)
+
+    Returns:
+        bool: True se a condição foi atendida
+    """
+    limite = limite or _timeout(fase)
+    inicio = time.monotonic()
+    ok = False
+    try:
+        with linha_do_tempo.fase(fase):
+            await condicao(limite)
+        ok = True
+    except Exception:
+        if obrigatoria:
+            raise
+        _log(logger, f"⚠️ {fase}: condição não atendida em {limite}ms, seguindo.")
+    finally:
+        gasto = time.monotonic() - inicio
+        if espera_antiga:
+            _log(logger, f"⏱️ {fase}: {gasto:.2f}s (antes {espera_antiga:.0f}s fixos | economia {espera_antiga - gasto:+.2f}s)")
+        else:
+            _log(logger, f"⏱️ {fase}: {gasto:.2f}s")
+    return ok
+
+async def inserir_texto(page, texto, logger=None):
+    """
+    Escreve o texto no editor que está com foco (mensagem ou legenda).
+
+    Modos (config.json -> "modo_insercao_texto"):
+    - "direto" (padrão): injeta o texto na página via evento de colar sintético,
+      SEM usar a área de transferência do sistema. Seguro para vários envios em paralelo.
+      Se o editor não aceitar, digita com keyboard.insert_text (Shift+Enter entre linhas).
+    - "area_transferencia": comportamento antigo (pyperclip + Ctrl+V).
+    """
+    if not texto:
+        return
+    if get_config("modo_insercao_texto", "direto") == "area_transferencia":
+        import pyperclip
+        pyperclip.copy(texto)
+        await page.keyboard.press("Control+V")
+        return
+
+    tamanho_antes = await page.evaluate(JS_COLAR_SINTETICO, texto)
+    if tamanho_antes is not None and tamanho_antes >= 0:
+        try:
+            await page.wait_for_function(JS_EDITOR_CRESCEU, arg=tamanho_antes, timeout=1500)
+            return
+        except Exception:
+            pass
+
+    # Plano B: digitação direta (também não usa a área de transferência)
+    _log(logger, "⌨️ Editor não aceitou o colar sintético, digitando o texto...")
+    await page.keyboard.press("Control+A")
+    await page.keyboard.press("Delete")
+    for i, linha in enumerate(texto.split("\n")):
+        if i:
+            await page.keyboard.press("Shift+Enter")
+        if linha:
+            await page.keyboard.insert_text(linha)
+
+async def contar_baloes_saida(page):
+    try:
+        return await page.locator(SELETOR_BALAO_SAIDA).count()
+    except Exception:
+        return 0
+
+async def aguardar_editor_focado(page, logger=None, espera_antiga=0.0):
+    """Espera o foco cair em um editor de texto (caixa de mensagem ou legenda)."""
+    return await aguardar_fase(
+        logger, "caixa_focada",
+        lambda t: page.wait_for_function(JS_EDITOR_FOCADO, timeout=t),
+        espera_antiga=espera_antiga, obrigatoria=False
+    )
+
+async def status_do_envio(page, baloes_antes):
+    """Status do último balão de saída novo (ver JS_STATUS_BALAO), ou None se não apareceu."""
+    try:
+        return await page.evaluate(JS_STATUS_BALAO, baloes_antes)
+    except Exception:
+        return None
+
+async def aguardar_envio_concluido(page, baloes_antes, logger=None, espera_antiga=0.0):
+    """
+    Espera o novo balão de saída sair do relógio (ícone de enviada/entregue/lida).
+
+    Returns:
+        dict {'status', 'latencia_s'}: latência medida a partir do Enter
+
+    Raises:
+        Exception: o balão não apareceu ou continuou no relógio até o limite
+    """
+    inicio = time.monotonic()
+    confirmado = f"(antes) => {{ const s = ({JS_STATUS_BALAO})(antes); return s && s !== 'pendente' ? s : null; }}"
+    try:
+        await aguardar_fase(
+            logger, "mensagem_enviada",
+            lambda t: page.wait_for_function(confirmado, arg=baloes_antes, timeout=t),
+            espera_antiga=espera_antiga
+        )
+    except Exception:
+        status = await status_do_envio(page, baloes_antes)
+        if status is None:
+            raise Exception("A mensagem não apareceu na conversa depois do envio.")
+        raise Exception(f"A mensagem continua no relógio após {time.monotonic() - inicio:.0f}s (não confirmada).")
+
+    status = await status_do_envio(page, baloes_antes)
+    latencia = round(time.monotonic() - inicio, 3)
+    _log(logger, f"✅ Confirmação: {status} em {latencia:.2f}s")
+    return {"status": status, "latencia_s": latencia}
+
+async def aguardar_upload_concluido(page, baloes_antes, total_bytes, logger=None):
+    """
+    Acompanha o upload dos anexos até TODOS os balões novos saírem do estado pendente.
+
+    O prazo vem do tamanho total e da vazão já observada (core/upload.py) e é
+    renovado enquanto a barra de progresso avança; sem avanço por 'estagnado_s'
+    o envio é dado como travado.
+
+    Returns:
+        dict {'status', 'latencia_s'} (ver aguardar_envio_concluido)
+
+    Raises:
+        Exception: o balão não apareceu ou continuou pendente além do prazo
+    """
+    with linha_do_tempo.fase("upload"):
+        return await _acompanhar_upload(page, baloes_antes, total_bytes, logger)
+
+async def _acompanhar_upload(page, baloes_antes, total_bytes, logger):
+    inicio = time.monotonic()
+    prazo = upload.prazo_upload_s(total_bytes)
+    limite = inicio + prazo
+    ultimo_avanco, ultimo_progresso, estado = inicio, None, {}
+    _log(logger, f"📤 Enviando {upload.formatar_mb(total_bytes)} (prazo estimado {prazo:.0f}s)...")
+
+    while True:
+        try:
+            estado = await page.evaluate(JS_ESTADO_UPLOAD, baloes_antes) or {}
+        except Exception:
+            estado = {}
+        agora = time.monotonic()
+        if estado.get("novos") and not estado.get("pendentes"):
+            break
+
+        progresso = estado.get("progresso")
+        if progresso is not None and progresso != ultimo_progresso:
+            if ultimo_progresso is not None and progresso > ultimo_progresso:
+                # Está andando: o prazo passa a ser o tempo restante na vazão atual
+                vazao = total_bytes * (progresso - ultimo_progresso) / 100 / max(agora - ultimo_avanco, 0.001)
+                restante = upload.prazo_upload_s(total_bytes * (100 - progresso) / 100, vazao)
+                limite = max(limite, agora + restante)
+            ultimo_progresso, ultimo_avanco = progresso, agora
+
+        if agora - ultimo_avanco > upload.estagnado_s() and agora > limite:
+            raise Exception(f"Upload não concluiu em {agora - inicio:.0f}s (progresso: {ultimo_progresso}%).")
+        await asyncio.sleep(0.5)
+
+    gasto = time.monotonic() - inicio
+    upload.registrar_vazao(total_bytes, gasto)
+    _log(logger, f"⏱️ mensagem_enviada: {gasto:.2f}s para {upload.formatar_mb(total_bytes)} (prazo era {prazo:.0f}s)")
+    return {"status": await status_do_envio(page, baloes_antes), "latencia_s": round(gasto, 3)}
+
+async def resolver_primeiro_visivel(page, seletores, timeout=None):
+    """
+    Avalia TODOS os seletores de uma vez dentro da página (uma única espera)
+    e retorna o primeiro, na ordem da lista, que tem um elemento visível.
+
+    Returns:
+        (seletor, locator) ou (None, None) se nada ficou visível no prazo
+    """
+    seletores = list(dict.fromkeys(seletores))
+    if not seletores:
+        return None, None
+    if timeout is None:
+        timeout = _timeout("resolver_seletor")
+    try:
+        handle = await page.wait_for_function(
+            JS_PRIMEIRO_VISIVEL,
+            arg=[_separar_seletor(s) for s in seletores],
+            timeout=timeout,
+            polling=100
+        )
+        achado = await handle.json_value()
+    except Exception:
+        return None, None
+    seletor = seletores[achado["i"]]
+    return seletor, page.locator(seletor).nth(achado["k"])
+
+async def acionar_primeiro_disponivel(page, seletores, acao, etapa=None, timeout=None, logger=None, tentativas=3):
+    """
+    Resolve o primeiro seletor visível (corrida única) e executa 'await acao(locator)'.
+    Se a ação falhar, descarta aquele seletor e corre de novo entre os restantes.
+    Com 'etapa', usa o cache de seletores.
+
+    Returns:
+        str: seletor usado, ou None se nenhum funcionou
+    """
+    cache = get_selector_cache() if etapa else None
+    ordem = cache.ordenar(etapa, seletores) if cache else list(dict.fromkeys(seletores))
+    vencedor = cache.vencedor(etapa) if cache else None
+
+    for _ in range(tentativas):
+        sel, alvo = await resolver_primeiro_visivel(page, ordem, timeout)
+        if sel is None:
+            break
+        try:
+            await acao(alvo)
+        except Exception as e:
+            _log(logger, f"⚠️ Seletor visível mas ação falhou ({etapa or 'seletor'}): {e}")
+            if cache: cache.registrar_falha(etapa, sel)
+            if sel == vencedor:
+                vencedor = None  # falha já registrada
+            ordem = [s for s in ordem if s != sel]
+            continue
+        if cache:
+            if vencedor and vencedor != sel:
+                cache.registrar_falha(etapa, vencedor)
+            cache.registrar_sucesso(etapa, sel)
+        return sel
+
+    if cache and vencedor:
+        cache.registrar_falha(etapa, vencedor)
+    return None
+
+async def clicar_primeiro_disponivel(page, lista_seletores, timeout_por_tentativa=300, escrever_texto=None, etapa=None):
+    """
+    Clica no primeiro seletor visível da lista (corrida única, ver resolver_primeiro_visivel).
+    Se houver escrever_texto, ele cola o conteúdo.
+    """
+    async def clicar(elemento):
+        await elemento.scroll_into_view_if_needed()
+        await elemento.click(force=True)
+        if escrever_texto:
+            await aguardar_editor_focado(page, espera_antiga=1)
+            await inserir_texto(page, escrever_texto)
+
+    return await acionar_primeiro_disponivel(page, lista_seletores, clicar, etapa=etapa, timeout=timeout_por_tentativa) is not None
+
+# Contexto -> cópia do perfil em RAM a sincronizar no fechamento
+_copias_perfil = {}
+
+async def iniciar_driver(userdir, modo_execucao='manual', logger=None, pw=None):
+    """
+    Abre o Chrome com o perfil persistente e espera o WhatsApp carregar.
+
+    Args:
+        pw: instância async_playwright já iniciada. Passar a mesma instância
+            permite abrir vários perfis (contas) no mesmo processo/event loop.
+            Sem ela, uma nova é iniciada e devolvida para o chamador encerrar.
+
+    Returns:
+        (pw, context, page)
+    """
+    from playwright.async_api import async_playwright
+    userdir = os.path.abspath(userdir)
+    os.makedirs(userdir, exist_ok=True)
+
+    _log(logger, f"Iniciando Playwright (async) | Perfil: {userdir}")
+    _log(logger, f"Modo de execução: {modo_execucao}")
+    proprio = pw is None
+    if proprio:
+        pw = await async_playwright().start()
+    is_auto = modo_execucao in ['auto', 'background']
+
+    _log(logger, f"is_auto = {is_auto}")
+    browser_args = argumentos_navegador(is_auto)
+
+    chromium_path = get_chrome_path()
+    _log(logger, f"Chrome path: {chromium_path}")
+    _log(logger, f"Browser args: {browser_args}")
+
+    try:
+        # Cópia do perfil em RAM (config.json -> "perfil_em_ram"); desligado = o próprio userdir
+        with linha_do_tempo.fase("preparar_perfil"):
+            dir_chrome, copia = preparar_perfil(userdir, logger)
+    except Exception as e:
+        _log(logger, f"❌ {e}")
+        if proprio: await pw.stop()
+        raise e
+
+    try:
+        with linha_do_tempo.fase("abrir_navegador"):
+            browser_context = await pw.chromium.launch_persistent_context(
+                executable_path=str(chromium_path),
+                user_data_dir=dir_chrome,
+                args=browser_args,
+                **OPCOES_CONTEXTO
+            )
+    except Exception as e:
+        _log(logger, "❌ Erro ao lançar navegador. Verifique se já não há uma janela aberta.")
+        if copia: copia.descartar()
+        if proprio: await pw.stop()
+        raise e
+    if copia:
+        _copias_perfil[browser_context] = copia
+
+    # Bloqueio opcional de avatares/mídias/fontes (config.json -> "filtro_rede")
+    await instalar_filtro(browser_context, logger)
+
+    page = browser_context.pages[0]
+    page.set_default_timeout(120000)
+    try:
+        with linha_do_tempo.fase("carregar_whatsapp"):
+            await page.goto("https://web.whatsapp.com")
+            await page.wait_for_selector('div[data-tab="3"]', timeout=120000)
+        _log(logger, "✓ WhatsApp carregado.")
+    except Exception as e:
+        if is_auto:
+            try: await page.screenshot(path="erro_login.png")
+            except: pass
+        await fechar_contexto(browser_context)
+        if proprio: await pw.stop()
+        raise e
+    return pw, browser_context, page
+
+async def fechar_contexto(context):
+    """
+    Fecha o navegador. Com perfil em RAM, devolve a sessão ao perfil real
+    só DEPOIS do Chrome fechar (nunca com arquivos ainda abertos).
+    """
+    with linha_do_tempo.fase("fechar_navegador"):
+        try:
+            await context.close()
+        except Exception:
+            pass
+        copia = _copias_perfil.pop(context, None)
+        if copia:
+            await asyncio.get_running_loop().run_in_executor(None, copia.sincronizar)
+
+async def enviar_grupo_de_anexos(page, lista_arquivos, is_media, message, logger=None):
+    """
+    Envia UMA mensagem com os arquivos (todos do mesmo tipo) e a legenda opcional.
+
+    Returns:
+        dict {'status', 'latencia_s'} da confirmação do envio
+    """
+    total_bytes = upload.tamanho_total(lista_arquivos)
+
+    # 1. Botão Anexar
+    btn_anexo = await page.wait_for_selector(XPATH_BOTAO_ANEXO, state="visible", timeout=120000)
+    await btn_anexo.click()
+    await aguardar_fase(
+        logger, "menu_anexo",
+        lambda t: page.wait_for_selector(XPATH_MENU_ANEXO, state="visible", timeout=t),
+        espera_antiga=4, obrigatoria=False
+    )
+
+    # 2. Tipo (mídia ou documento) e seleção dos arquivos
+    seletores_tipo = SELETORES_TIPO_MIDIA if is_media else SELETORES_TIPO_DOCUMENTO
+    etapa_tipo = "tipo_midia" if is_media else "tipo_documento"
+
+    async def abrir_seletor_de_arquivos(item_menu):
+        async with page.expect_file_chooser(timeout=2000) as fc_info:
+            await item_menu.click(force=True, timeout=1000)
+        seletor_arquivos = await fc_info.value
+        await seletor_arquivos.set_files(lista_arquivos)
+
+    with linha_do_tempo.fase("selecionar_arquivos"):
+        sel_tipo = await acionar_primeiro_disponivel(page, seletores_tipo, abrir_seletor_de_arquivos, etapa=etapa_tipo, logger=logger)
+    if not sel_tipo:
+        raise Exception("Nenhum seletor de tipo de arquivo funcionou.")
+    _log(logger, f"✅ Arquivo(s) carregados via: {sel_tipo}")
+
+    _log(logger, f"⏳ Processando {len(lista_arquivos)} arquivo(s) ({upload.formatar_mb(total_bytes)}). Aguardando o WhatsApp carregar...")
+    baloes_antes = await contar_baloes_saida(page)
+    limite_preview = upload.prazo_preview_ms(total_bytes, _timeout("preview_anexo"))
+    try:
+        await aguardar_fase(
+            logger, "preview_anexo",
+            lambda t: page.wait_for_selector(XPATH_BOTAO_ENVIAR_PREVIEW, state="visible", timeout=t),
+            limite=limite_preview
+        )
+        _log(logger, "✅ Arquivos carregados com sucesso.")
+    except Exception as e:
+        _log(logger, f"❌ Timeout: a tela de envio não abriu em {limite_preview / 1000:.0f}s ou houve erro ao carregar os arquivos.")
+        raise e
+
+    # 3. Legenda
+    if message:
+        _log(logger, "✍️ Inserindo legenda...")
+
+        async def colar_legenda(campo):
+            await campo.scroll_into_view_if_needed()
+            await campo.click(force=True)
+            await aguardar_editor_focado(page, logger, espera_antiga=2)
+            await inserir_texto(page, message, logger)
+
+        with linha_do_tempo.fase("legenda"):
+            inserida = await acionar_primeiro_disponivel(page, SELETORES_LEGENDA, colar_legenda, etapa="legenda", logger=logger)
+        if inserida:
+            _log(logger, "✅ Legenda inserida.")
+        else:
+            _log(logger, "❌ Não foi possível encontrar o campo de legenda pelos seletores.")
+
+    # 4. Enviar
+    _log(logger, "🚀 Enviando...")
+    async def clicar_enviar(botao):
+        await botao.scroll_into_view_if_needed()
+        await botao.click(force=True)
+
+    if not await acionar_primeiro_disponivel(page, SELETORES_ENVIAR, clicar_enviar, etapa="enviar", logger=logger):
+        _log(logger, "Botão não encontrado visualmente, apertando ENTER...")
+        await page.keyboard.press("Enter")
+
+    return await aguardar_upload_concluido(page, baloes_antes, total_bytes, logger)
+
+async def _fechar_preview(page):
+    """Depois de um grupo com falha: fecha a tela de preview (se ficou aberta) sem sair da conversa."""
+    try:
+        if await page.locator(XPATH_BOTAO_ENVIAR_PREVIEW).count() > 0:
+            await page.keyboard.press("Escape")
+            await page.wait_for_selector(XPATH_BOTAO_ENVIAR_PREVIEW, state="detached", timeout=3000)
+    except Exception:
+        pass
+
+async def enviar_arquivo_com_mensagem(page, file_path, message, logger=None, ja_enviados=None):
+    """
+    Envia os anexos na conversa aberta, divididos em grupos por tipo e pelo limite
+    de arquivos por mensagem (automation.agrupar_anexos). A legenda vai no primeiro
+    grupo enviado com sucesso. Uma falha não impede os grupos seguintes.
+
+    Args:
+        ja_enviados: caminhos originais que saíram numa tentativa anterior
+            (FalhaParcialAnexos.enviados); não são enviados de novo, nem a legenda
+
+    Returns:
+        list[dict]: um por grupo {'grupo', 'tipo', 'arquivos', 'caminhos', 'ok', 'erro', 'status', 'latencia_s'}
+        ('pulado': True nos grupos que já tinham saído)
+
+    Raises:
+        FalhaParcialAnexos: algum grupo falhou (a mensagem resume quais; o
+            resultado por grupo e os arquivos já enviados vão junto)
+    """
+    _log(logger, "📎 Preparando anexos...")
+    lista_arquivos = separar_arquivos(file_path)
+    chave = lambda c: os.path.normcase(os.path.abspath(c))
+    ja = {chave(c) for c in ja_enviados or []}
+    enviados = [c for c in lista_arquivos if chave(c) in ja]
+
+    # Tipo (mídia/documento) decidido pelos nomes ORIGINAIS: um .webp/.bmp enviado
+    # como documento continua documento
+    grupos = agrupar_anexos(lista_arquivos)
+    # Opcional: versões reduzidas das imagens/vídeos, reaproveitadas entre envios
+    # (core/cache_midia.py). Só os grupos de mídia passam pelo pré-processamento.
+    midias = [c for is_media, grupo in grupos if is_media for c in grupo if chave(c) not in ja]
+    troca = {}
+    if midias:
+        with linha_do_tempo.fase("preprocessar_midia"):
+            preparados = await asyncio.get_running_loop().run_in_executor(
+                None, cache_midia.preparar_arquivos, midias, logger
+            )
+        troca = dict(zip(midias, preparados))
+    if len(grupos) > 1:
+        _log(logger, f"📦 {len(lista_arquivos)} arquivo(s) divididos em {len(grupos)} mensagens.")
+
+    # Se algo já saiu antes, a legenda saiu junto
+    resultados, legenda = [], (None if enviados else message)
+    for n, (is_media, grupo) in enumerate(grupos, start=1):
+        tipo = "mídia" if is_media else "documento"
+        faltam = [c for c in grupo if chave(c) not in ja]
+        base = {"grupo": n, "tipo": tipo, "arquivos": len(faltam), "caminhos": faltam}
+        if not faltam:
+            _log(logger, f"⏭️ Grupo {n}/{len(grupos)} já enviado numa tentativa anterior, pulando.")
+            resultados.append({**base, "ok": True, "erro": None, "pulado": True, "status": None, "latencia_s": 0})
+            continue
+        if len(grupos) > 1:
+            _log(logger, f"📎 Grupo {n}/{len(grupos)}: {len(faltam)} {tipo}(s)")
+        try:
+            confirmacao = await enviar_grupo_de_anexos(
+                page, [troca.get(c, c) for c in faltam], is_media, legenda, logger
+            )
+            resultados.append({**base, "ok": True, "erro": None, **confirmacao})
+            enviados.extend(faltam)
+            legenda = None
+        except Exception as e:
+            _log(logger, f"❌ Grupo {n}/{len(grupos)} falhou: {e}")
+            resultados.append({**base, "ok": False, "erro": str(e)})
+            await _fechar_preview(page)
+
+    falhas = [r for r in resultados if not r["ok"]]
+    if len(grupos) > 1:
+        _log(logger, f"📊 Anexos: {len(grupos) - len(falhas)}/{len(grupos)} grupo(s) enviados.")
+    if falhas:
+        if len(grupos) == 1:
+            raise FalhaParcialAnexos(falhas[0]["erro"], resultados, enviados)
+        detalhes = "; ".join(f"grupo {r['grupo']} ({r['arquivos']} {r['tipo']}): {r['erro']}" for r in falhas)
+        raise FalhaParcialAnexos(
+            f"{len(falhas)} de {len(grupos)} grupo(s) de anexos falharam: {detalhes}", resultados, enviados
+        )
+    _log(logger, "🚀 Concluído!")
+    return resultados
+
+async def abrir_conversa_por_numero(page, numero, logger=None):
+    """
+    Abre a conversa direto pela rota de telefone do WhatsApp Web, sem usar a pesquisa.
+
+    Returns:
+        bool: True se a caixa de mensagem da conversa apareceu
+    """
+    _log(logger, f"⚡ Abrindo conversa direto pelo número {numero}...")
+    caminho = f"/send?phone={numero}"
+    try:
+        titulo_anterior = await page.evaluate(JS_MARCAR_CONVERSA)
+        await page.evaluate(JS_ABRIR_ROTA_INTERNA, caminho)
+    except Exception as e:
+        _log(logger, f"⚠️ Link direto falhou: {e}")
+        return False
+
+    # O app reagiu: conversa, aviso (passageiro ou de número inválido) ou recarga da página
+    reagiu = await aguardar_fase(
+        logger, "rota_interna",
+        lambda t: page.wait_for_function(
+            f"(a) => !window.__botSemRecarga || ({JS_NOVA_CONVERSA})(a) || !!document.querySelector('{SELETOR_POPUP}')",
+            arg=titulo_anterior, timeout=t
+        ),
+        obrigatoria=False
+    )
+    try:
+        recarregou = await page.evaluate("() => window.__botSemRecarga !== true")
+    except Exception:
+        recarregou = True  # contexto destruído no meio da avaliação: navegação em andamento
+    try:
+        if recarregou:
+            _log(logger, "⚠️ A rota interna recarregou o WhatsApp, aguardando carregar de novo.")
+            await page.wait_for_selector('div[data-tab="3"]', timeout=120000)
+        elif not reagiu:
+            # Roteador ignorou o popstate: navegação completa (mais lenta, mas sempre funciona)
+            _log(logger, "⚠️ Rota interna ignorada, abrindo pelo link completo (recarrega a página).")
+            await page.goto(f"https://web.whatsapp.com{caminho}")
+            await page.wait_for_selector('div[data-tab="3"]', timeout=120000)
+    except Exception as e:
+        _log(logger, f"⚠️ Link direto falhou: {e}")
+        return False
+
+    # O aviso "Iniciando conversa" não encerra a espera; só a conversa ou o popup de inválido
+    abriu = await aguardar_fase(
+        logger, "conversa_direta",
+        lambda t: page.wait_for_function(
+            f"(a) => ({JS_NOVA_CONVERSA})(a) || ({JS_POPUP_NUMERO_INVALIDO})()",
+            arg=titulo_anterior, timeout=t
+        ),
+        espera_antiga=10, obrigatoria=False
+    )
+    invalido = abriu and await page.evaluate(JS_POPUP_NUMERO_INVALIDO)
+    if not abriu or invalido:
+        motivo = "número inválido / sem WhatsApp" if invalido else "a conversa não abriu"
+        _log(logger, f"⚠️ WhatsApp não abriu a conversa pelo número ({motivo}), usando a pesquisa.")
+        await resetar_tela(page)
+        return False
+    return True
+
+async def identificar_conversa(page):
+    """Lê a identidade da conversa aberta (ver automation.identidade_de_conversa)."""
+    try:
+        info = await page.evaluate(JS_IDENTIDADE_CONVERSA)
+    except Exception:
+        info = {}
+    return identidade_de_conversa(info)
+
+async def abrir_conversa(page, target, logger=None, contatos=None):
+    """
+    Abre a conversa do contato.
+    Números de telefone vão direto pelo link; nomes (ou falha do link) usam a caixa de pesquisa.
+
+    Args:
+        contatos: índice opcional (SchedulerDB) com obter_contato/salvar_contato/invalidar_contato.
+    """
+    numero = extrair_numero(target)
+    do_indice = False
+    if not numero and contatos:
+        try:
+            entrada = contatos.obter_contato(target)
+        except Exception as e:
+            entrada = None
+            _log(logger, f"⚠️ Índice de contatos indisponível: {e}")
+        if entrada and entrada.get("numero"):
+            numero, do_indice = entrada["numero"], True
+            _log(logger, f"📇 '{target}' encontrado no índice: {numero}")
+
+    if numero and await abrir_conversa_por_numero(page, numero, logger):
+        confere = await _conferir_cabecalho(page, target, logger)
+        if do_indice:
+            if confere:
+                await _atualizar_indice(contatos, target, page, logger)
+            elif confere is False:
+                # O número guardado abriu outra pessoa: a próxima vez resolve pela pesquisa
+                _log(logger, f"📇 Entrada do índice para '{target}' descartada.")
+                try: contatos.invalidar_contato(target)
+                except Exception: pass
+        return
+
+    if do_indice:
+        # Entrada desatualizada: descarta e resolve de novo pela pesquisa
+        try: contatos.invalidar_contato(target)
+        except Exception: pass
+
+    titulo_anterior = await page.evaluate(JS_MARCAR_CONVERSA)
+    await page.locator(SELETOR_CAIXA_PESQUISA).fill(target)
+    await aguardar_fase(
+        logger, "resultado_pesquisa",
+        lambda t: page.wait_for_function(JS_RESULTADO_PESQUISA, arg=target, timeout=t),
+        espera_antiga=5, obrigatoria=False
+    )
+    await page.keyboard.press("Enter")
+    nova = await aguardar_fase(
+        logger, "conversa_aberta",
+        lambda t: page.wait_for_function(JS_NOVA_CONVERSA, arg=titulo_anterior, timeout=t),
+        espera_antiga=5, obrigatoria=False
+    )
+    if not nova:
+        # Mesmo contato do envio anterior (cabeçalho igual): basta a caixa estar pronta
+        await page.locator(SELETOR_CAIXA_MENSAGEM).wait_for(state="visible", timeout=5000)
+    # Só grava no índice o que a pesquisa abriu se o cabeçalho confirmar o contato:
+    # um acerto aproximado errado iria direto para o número errado nos próximos envios
+    confere = await _conferir_cabecalho(page, target, logger)
+    if contatos and confere and not extrair_numero(target):
+        await _atualizar_indice(contatos, target, page, logger)
+
+async def _atualizar_indice(contatos, target, page, logger=None):
+    """Grava/renova no índice a conversa que acabou de ser aberta para o target."""
+    ident = await identificar_conversa(page)
+    if not ident["jid"] and not ident["nome_exibicao"]:
+        return
+    try:
+        contatos.salvar_contato(target, ident["numero"], ident["jid"], ident["nome_exibicao"])
+    except Exception as e:
+        _log(logger, f"⚠️ Não foi possível atualizar o índice de contatos: {e}")
+
+async def _conferir_cabecalho(page, target, logger=None):
+    """
+    Confere se o cabeçalho da conversa aberta corresponde ao target (e avisa no log se não).
+
+    Returns:
+        bool | None: titulo_corresponde(target, titulo), ou None se o cabeçalho não pôde ser lido
+    """
+    try:
+        titulo = await page.locator('#main header span[title]').first.get_attribute("title", timeout=1000) or ""
+    except Exception:
+        return None
+    if titulo_corresponde(target, titulo):
+        _log(logger, f"✓ Conversa aberta: {titulo}")
+        return True
+    _log(logger, f"⚠️ Conversa aberta ('{titulo}') não corresponde exatamente a '{target}'")
+    return False
+
+async def enviar_na_pagina(page, target, mode, message=None, file_path=None, logger=None, contatos=None, ja_enviados=None):
+    """
+    Executa um envio completo em uma página do WhatsApp JÁ carregada.
+    Não abre nem fecha o navegador.
+
+    Returns:
+        dict {'status', 'latencia_s'}: status confirmado pelo ícone do balão
+        (vários grupos de anexos: o pior status e a soma das latências)
+
+    Raises:
+        FalhaParcialAnexos: ver enviar_arquivo_com_mensagem (ja_enviados vai para lá)
+    """
+    with linha_do_tempo.fase("abrir_conversa"):
+        await abrir_conversa(page, target, logger, contatos)
+
+    if mode == "text":
+        chat_box = page.locator(SELETOR_CAIXA_MENSAGEM)
+        await chat_box.wait_for(state="visible")
+        await chat_box.click(force=True)
+        await aguardar_editor_focado(page, logger)
+        baloes_antes = await contar_baloes_saida(page)
+        with linha_do_tempo.fase("digitar"):
+            await inserir_texto(page, message, logger)
+        await page.keyboard.press("Enter")
+        return await aguardar_envio_concluido(page, baloes_antes, logger, espera_antiga=5)
+
+    grupos = await enviar_arquivo_com_mensagem(page, file_path, message, logger, ja_enviados)
+    return {
+        "status": pior_status([g["status"] for g in grupos]),
+        "latencia_s": round(sum(g["latencia_s"] for g in grupos), 3),
+    }
+
+def _anexos_enviados(erro):
+    """{'anexos_enviados': [...]} de uma FalhaParcialAnexos (para o resultado por item), senão {}."""
+    enviados = getattr(erro, "enviados", None)
+    return {"anexos_enviados": enviados} if enviados else {}
+
+async def resetar_tela(page):
+    """Fecha popups/conversa aberta para o próximo envio começar limpo."""
+    try:
+        await page.keyboard.press("Escape")
+        await page.keyboard.press("Escape")
+    except Exception:
+        pass
+
+async def enviar_lote_na_pagina(page, jobs, logger=None, contatos=None):
+    """
+    Envia vários jobs na MESMA página, um após o outro.
+    Uma falha em um item não interrompe os demais.
+
+    Returns:
+        list[dict]: um resultado por item {'target', 'ok', 'erro', 'status', 'latencia_s'}
+    """
+    resultados = []
+    for i, job in enumerate(jobs, start=1):
+        target = job.get("target")
+        _log(logger, f"📨 [{i}] Enviando para: {target}")
+        try:
+            confirmacao = await enviar_na_pagina(
+                page, target, job.get("mode"), job.get("message"), job.get("file_path"), logger, contatos,
+                ja_enviados=job.get("anexos_enviados")
+            )
+            resultados.append({"target": target, "ok": True, "erro": None, **confirmacao})
+        except Exception as e:
+            _log(logger, f"❌ [{i}] Falha para {target}: {e}")
+            resultados.append({"target": target, "ok": False, "erro": str(e), **_anexos_enviados(e)})
+        finally:
+            await resetar_tela(page)
+    return resultados
+
+async def _fechar(pw, context, proprio=True):
+    if context: await fechar_contexto(context)
+    try:
+        if pw and proprio: await pw.stop()
+    except Exception: pass
+
+async def executar_envio_em_lote(userdir, jobs, logger=None, modo_execucao='manual', contatos=None, pw=None):
+    """
+    Abre o navegador UMA vez e envia todos os jobs do lote.
+
+    Returns:
+        list[dict]: um resultado por item (ver enviar_lote_na_pagina)
+    """
+    context = None
+    proprio = pw is None
+    try:
+        pw, context, page = await iniciar_driver(userdir, modo_execucao, logger, pw)
+        return await enviar_lote_na_pagina(page, jobs, logger, contatos)
+    except Exception as e:
+        _log(logger, f"❌ Falha no lote: {str(e)}")
+        raise e
+    finally:
+        await _fechar(pw, context, proprio)
+
+async def executar_envio(userdir, target, mode, message=None, file_path=None, logger=None, modo_execucao='manual', contatos=None, pw=None, ja_enviados=None):
+    context = None
+    proprio = pw is None
+    try:
+        pw, context, page = await iniciar_driver(userdir, modo_execucao, logger, pw)
+        return await enviar_na_pagina(page, target, mode, message, file_path, logger, contatos, ja_enviados)
+    except Exception as e:
+        _log(logger, f"❌ Falha no processo: {str(e)}")
+        raise e
+    finally:
+        await _fechar(pw, context, proprio)
+
+async def executar_contas_em_paralelo(lotes, logger=None, modo_execucao='auto', contatos=None):
+    """
+    Dirige várias contas AO MESMO TEMPO em um único processo/event loop:
+    um contexto persistente (perfil) por conta, todos sobre o mesmo Playwright.
+
+    Args:
+        lotes: dict {userdir: [jobs]} - cada perfil envia o seu lote em sequência
+
+    Returns:
+        dict {userdir: list[dict]} com os resultados de cada conta. Se a conta
+        nem abriu, todos os itens dela voltam com ok=False e o erro da abertura.
+    """
+    from playwright.async_api import async_playwright
+
+    if get_config("modo_insercao_texto", "direto") == "area_transferencia":
+        _log(logger, "⚠️ modo_insercao_texto='area_transferencia' não é seguro com várias contas em paralelo.")
+
+    async with async_playwright() as pw:
+        async def conta(userdir, jobs):
+            try:
+                return await executar_envio_em_lote(userdir, jobs, logger, modo_execucao, contatos, pw=pw)
+            except Exception as e:
+                return [{"target": j.get("target"), "ok": False, "erro": str(e)} for j in jobs]
+
+        perfis = list(lotes)
+        resultados = await asyncio.gather(*(conta(u, list(lotes[u])) for u in perfis))
+    return dict(zip(perfis, resultados))
@@ -0,0 +1,426 @@
+"""
+CONSTANTES E AUXILIARES DA AUTOMAÇÃO
+
+Seletores, scripts JS, timeouts e funções puras (sem Playwright) usados pelo
+núcleo assíncrono (core/automation_async.py) e pela API síncrona
+(core/automation.py). Módulo leve: pode ser importado sem o navegador.
+"""
+
+import os
+import re
+from core.config import get_config
+
+# Limites máximos (ms) de cada espera. Podem ser sobrescritos em
+# user_data/config.json -> {"timeouts": {"conversa_aberta": 20000, ...}}
+TIMEOUTS_PADRAO = {
+    "resultado_pesquisa": 5000,     # lista de resultados mostra o contato
+    "conversa_aberta": 15000,       # cabeçalho/caixa de mensagem da conversa
+    "conversa_direta": 20000,       # conversa aberta pelo link de telefone
+    "rota_interna": 3000,           # app reagiu à rota /send?phone= (conversa, aviso ou recarga)
+    "caixa_focada": 5000,           # editor (mensagem/legenda) com foco
+    "menu_anexo": 5000,             # menu do clipe aberto
+    "preview_anexo": 300000,        # tela de legenda/preview (teto: o prazo real vem do tamanho, core/upload.py)
+    "resolver_seletor": 5000,       # corrida entre listas de seletores alternativos
+    "mensagem_enviada": 60000,      # balão de saída apareceu e saiu do relógio
+}
+
+SELETOR_CAIXA_PESQUISA = 'div[contenteditable="true"][data-tab="3"]'
+SELETOR_CAIXA_MENSAGEM = 'div[contenteditable="true"][data-tab="10"]'
+SELETOR_BALAO_SAIDA = '#main div.message-out'
+SELETOR_POPUP = 'div[role="dialog"]'
+
+# Marca o painel da conversa atual e devolve o título do cabeçalho, para
+# distinguir a conversa que será aberta da que já estava na tela
+JS_MARCAR_CONVERSA = """() => {
+    const main = document.querySelector('#main');
+    if (!main) return null;
+    main.setAttribute('data-bot-anterior', '1');
+    const t = main.querySelector('header span[title]');
+    return t ? t.getAttribute('title') : null;
+}"""
+
+# Uma conversa NOVA está aberta com a caixa de mensagem pronta
+JS_NOVA_CONVERSA = """(tituloAnterior) => {
+    const main = document.querySelector('#main');
+    if (!main || !main.querySelector('div[contenteditable="true"][data-tab="10"]')) return false;
+    if (!main.hasAttribute('data-bot-anterior')) return true;
+    const t = main.querySelector('header span[title]');
+    return !!(t && tituloAnterior !== null && t.getAttribute('title') !== tituloAnterior);
+}"""
+
+# data-id de uma mensagem da conversa aberta (contém o JID) + título do cabeçalho
+JS_IDENTIDADE_CONVERSA = """() => {
+    const main = document.querySelector('#main');
+    if (!main) return {};
+    const msg = main.querySelector('[data-id*="@"]');
+    const t = main.querySelector('header span[title]');
+    return {
+        dataId: msg ? msg.getAttribute('data-id') : null,
+        titulo: t ? t.getAttribute('title') : null
+    };
+}"""
+
+# Troca a rota pelo History API e avisa o roteador do app (popstate), sem recarregar
+# a página. window.__botSemRecarga marca a página atual: se sumir, houve recarga completa.
+JS_ABRIR_ROTA_INTERNA = """(caminho) => {
+    window.__botSemRecarga = true;
+    history.pushState(null, '', caminho);
+    window.dispatchEvent(new PopStateEvent('popstate', {state: null}));
+}"""
+
+# Popup de número inválido ("O número de telefone compartilhado por url é inválido"):
+# tem o texto de inválido ou um único botão OK. O aviso passageiro "Iniciando conversa"
+# também é um role="dialog", mas não tem nenhum dos dois.
+JS_POPUP_NUMERO_INVALIDO = """() => {
+    for (const d of document.querySelectorAll('div[role="dialog"]')) {
+        if (/inv[aá]lid/i.test(d.innerText || '')) return true;
+        const botoes = d.querySelectorAll('button, div[role="button"]');
+        if (botoes.length === 1 && /^\\s*ok\\s*$/i.test(botoes[0].innerText || '')) return true;
+    }
+    return false;
+}"""
+
+# Algum resultado da pesquisa contém o texto procurado (nome ou dígitos do número)
+JS_RESULTADO_PESQUISA = """(alvo) => {
+    const norm = s => (s || '').toLowerCase();
+    const digitos = s => (s || '').replace(/\\D/g, '');
+    const a = norm(alvo), d = digitos(alvo);
+    const titulos = document.querySelectorAll('#pane-side span[title]');
+    for (const t of titulos) {
+        const titulo = t.getAttribute('title');
+        if (norm(titulo).includes(a)) return true;
+        if (d.length >= 8 && digitos(titulo).includes(d)) return true;
+    }
+    return false;
+}"""
+
+# O foco do teclado está dentro de um editor (contenteditable)
+JS_EDITOR_FOCADO = """() => {
+    const el = document.activeElement;
+    return !!(el && (el.isContentEditable || el.closest('[contenteditable="true"]')));
+}"""
+
+# Cola o texto no editor focado disparando um 'paste' sintético (não toca na
+# área de transferência do sistema). Retorna o tamanho do texto antes, ou -1.
+JS_COLAR_SINTETICO = """(texto) => {
+    const el = document.activeElement;
+    const editor = el && (el.isContentEditable ? el : el.closest('[contenteditable="true"]'));
+    if (!editor) return -1;
+    const antes = (editor.innerText || '').length;
+    const dados = new DataTransfer();
+    dados.setData('text/plain', texto);
+    editor.dispatchEvent(new ClipboardEvent('paste', {clipboardData: dados, bubbles: true, cancelable: true}));
+    return antes;
+}"""
+
+JS_EDITOR_CRESCEU = """(antes) => {
+    const el = document.activeElement;
+    const editor = el && (el.isContentEditable ? el : el.closest('[contenteditable="true"]'));
+    return !!editor && (editor.innerText || '').length > antes;
+}"""
+
+# Primeiro candidato (na ordem da lista) com algum elemento visível.
+# Retorna {i: índice do seletor, k: índice do último elemento visível}.
+JS_PRIMEIRO_VISIVEL = """(candidatos) => {
+    const visivel = el => {
+        if (!el || !el.getBoundingClientRect) return false;
+        const r = el.getBoundingClientRect();
+        if (r.width <= 0 || r.height <= 0) return false;
+        const st = getComputedStyle(el);
+        return st.visibility !== 'hidden' && st.display !== 'none';
+    };
+    const buscar = ([tipo, expr]) => {
+        if (tipo === 'xpath') {
+            const r = document.evaluate(expr, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            const lista = [];
+            for (let j = 0; j < r.snapshotLength; j++) lista.push(r.snapshotItem(j));
+            return lista;
+        }
+        return Array.from(document.querySelectorAll(expr));
+    };
+    for (let i = 0; i < candidatos.length; i++) {
+        let elementos;
+        try { elementos = buscar(candidatos[i]); } catch (e) { continue; }
+        for (let k = elementos.length - 1; k >= 0; k--) {
+            if (visivel(elementos[k])) return {i: i, k: k};
+        }
+    }
+    return null;
+}"""
+
+# Status do último balão de saída criado depois de 'antes', pelo ícone do WhatsApp:
+# msg-time = relógio (pendente), msg-check = enviada, msg-dblcheck = entregue
+# (azul/"-ack" = lida). Sem balão novo: null. Balão sem ícone: 'desconhecido'.
+JS_STATUS_BALAO = """(antes) => {
+    const baloes = document.querySelectorAll('#main div.message-out');
+    if (baloes.length <= antes) return null;
+    const ultimo = baloes[baloes.length - 1];
+    const icone = ultimo.querySelector('[data-icon^="msg-"]');
+    if (!icone) return 'desconhecido';
+    const nome = icone.getAttribute('data-icon');
+    if (nome === 'msg-time') return 'pendente';
+    if (nome.startsWith('msg-dblcheck')) {
+        const lida = nome.endsWith('-ack') || /lid|read/i.test(icone.getAttribute('aria-label') || '');
+        return lida ? 'lida' : 'entregue';
+    }
+    if (nome.startsWith('msg-check')) return 'enviada';
+    return 'desconhecido';
+}"""
+
+# Do pior para o melhor; 'desconhecido' = saiu do relógio, mas o ícone não foi reconhecido
+ORDEM_STATUS_ENVIO = ("pendente", "desconhecido", "enviada", "entregue", "lida")
+
+# Estado dos balões de saída criados depois de 'antes' (envio de anexos):
+# pendente = relógio ou barra/anel de progresso; progresso = maior aria-valuenow (0-100)
+JS_ESTADO_UPLOAD = """(antes) => {
+    const baloes = Array.from(document.querySelectorAll('#main div.message-out')).slice(antes);
+    let pendentes = 0, progresso = null;
+    for (const b of baloes) {
+        const barras = b.querySelectorAll('[role="progressbar"], progress, [data-icon="media-cancel"]');
+        if (b.querySelector('[data-icon="msg-time"]') || barras.length) pendentes++;
+        for (const p of barras) {
+            const v = parseFloat(p.getAttribute('aria-valuenow') ?? p.getAttribute('value'));
+            if (!isNaN(v)) progresso = Math.max(progresso ?? 0, v);
+        }
+    }
+    return {novos: baloes.length, pendentes: pendentes, progresso: progresso};
+}"""
+
+def _log(logger, msg):
+    if logger:
+        try: logger.info(msg) if hasattr(logger, 'info') else logger(msg)
+        except: pass
+    else: print(f"[LOG] {msg}")
+
+def _timeout(fase):
+    """Limite (ms) configurado para a fase."""
+    personalizados = get_config("timeouts", {}) or {}
+    return int(personalizados.get(fase, TIMEOUTS_PADRAO[fase]))
+
+class FalhaParcialAnexos(Exception):
+    """
+    Algum grupo de anexos não foi enviado. 'resultados' traz um item por grupo (ver
+    automation_async.enviar_arquivo_com_mensagem) e 'enviados' os caminhos ORIGINAIS
+    que já saíram: passe-os em ja_enviados ao tentar de novo, para não duplicar.
+    """
+    def __init__(self, mensagem, resultados=None, enviados=None):
+        super().__init__(mensagem)
+        self.resultados = resultados or []
+        self.enviados = enviados or []
+
+def pior_status(status):
+    """Status de envio menos avançado da lista (ex.: vários grupos de anexos), ou None."""
+    conhecidos = [st for st in status if st in ORDEM_STATUS_ENVIO]
+    return min(conhecidos, key=ORDEM_STATUS_ENVIO.index) if conhecidos else None
+
+def _separar_seletor(seletor):
+    """Converte um seletor no formato do Playwright em [tipo, expressão] para o JS."""
+    if seletor.startswith("xpath="):
+        return ["xpath", seletor[len("xpath="):]]
+    if seletor.startswith("css="):
+        return ["css", seletor[len("css="):]]
+    if seletor.startswith("//") or seletor.startswith(".."):
+        return ["xpath", seletor]
+    return ["css", seletor]
+
+# Argumentos do Chrome (iguais para o núcleo síncrono e o assíncrono)
+def argumentos_navegador(is_auto):
+    browser_args = [
+        '--disable-blink-features=AutomationControlled',
+        '--disable-notifications', 
+        '--no-sandbox', 
+        '--disable-setuid-sandbox',
+        '--start-maximized', 
+        '--force-device-scale-factor=0.90', 
+        '--high-dpi-support=1', 
+        '--lang=pt-BR'
+    ]
+    
+    if is_auto:
+        browser_args.extend(['--window-position=-2400,-2400', '--force-device-scale-factor=0.90','--window-size=1366,768', '--high-dpi-support=1'])
+    return browser_args
+
+# Opções do launch_persistent_context (além de executable_path, user_data_dir e args)
+OPCOES_CONTEXTO = {
+    "headless": False,
+    "locale": "pt-BR",
+    "timezone_id": "America/Sao_Paulo",
+    "viewport": None,
+    "no_viewport": True,
+    # User agent comum para evitar bloqueios
+    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
+}
+
+# Itens do menu de anexo: Fotos e vídeos
+SELETORES_TIPO_MIDIA = [
+    "xpath=//span[contains(text(), 'Fotos')]",    # PT
+    "xpath=//span[contains(text(), 'Photos')]",   # EN
+    "xpath=//div[@aria-label='Fotos e vídeos']",
+    "xpath=//div[@aria-label='Photos & videos']",
+    "css=[data-icon='image']", 
+    "css=[data-testid='mi-attach-media']",
+    "xpath=//div[@aria-label='Fotos e vídeos']",
+    "css=#app > div > div > span:nth-child(8) > div > ul > div > div > div:nth-child(2) > li > div > span",
+    "xpath=//*[@id='app']/div/div/span[6]/div/ul/div/div/div[2]/li/div/span",
+    "xpath=/html/body/div[1]/div/div/div/div/span[6]/div/ul/div/div/div[2]/li/div/span",
+    'css=#app > div > div > div:nth-child(11) > div > div > div.xu96u03.xm80bdy.x10l6tqk.x13vifvy.xoz0ns6.x1gslohp > div.html-div.xdj266r.x14z9mp.xat24cr.x1lziwak.xexx8yu.xyri2b.x18d9i69.x1c1uobl > div > div > div > div > div.x78zum5.xdt5ytf.x1iyjqo2.x1n2onr6 > div:nth-child(2) > div.x6s0dn4.xlr9sxt.xvvg52n.xwd4zgb.xq8v1ta.x78zum5.xu0aao5.xh8yej3 > div.x78zum5.xdt5ytf.x1iyjqo2.xeuugli.x6ikm8r.x10wlt62.xde1mab > span',
+    'xpath=//*[@id="app"]/div/div/div[4]/div/div/div[1]/div[1]/div/div/div/div/div[1]/div[2]/div[1]/div[2]/span',
+    'xpath=/html/body/div[1]/div/div/div/div/div[4]/div/div/div[1]/div[1]/div/div/div/div/div[1]/div[2]/div[1]/div[2]/span'
+]
+
+# Itens do menu de anexo: Documento
+SELETORES_TIPO_DOCUMENTO = [
+    "xpath=//span[contains(text(), 'Documento')]", # PT
+    "xpath=//span[contains(text(), 'Document')]",  # EN
+    "xpath=//div[@aria-label='Documento']",
+    "xpath=//div[@aria-label='Document']",
+    "css=[data-icon='document']",
+    "css=[data-testid='mi-attach-document']",
+    "xpath=//div[@aria-label='Documento']",
+    "css=#app > div > div > span:nth-child(8) > div > ul > div > div > div:nth-child(1) > li > div > span",
+    'css=#app > div > div > div:nth-child(11) > div > div > div.xu96u03.xm80bdy.x10l6tqk.x13vifvy.xoz0ns6.x1gslohp > div.html-div.xdj266r.x14z9mp.xat24cr.x1lziwak.xexx8yu.xyri2b.x18d9i69.x1c1uobl > div > div > div > div > div.x78zum5.xdt5ytf.x1iyjqo2.x1n2onr6 > div:nth-child(1) > div.x6s0dn4.xlr9sxt.xvvg52n.xwd4zgb.xq8v1ta.x78zum5.xu0aao5.xh8yej3 > div.x78zum5.xdt5ytf.x1iyjqo2.xeuugli.x6ikm8r.x10wlt62.xde1mab > span',
+    'xpath=//*[@id="app"]/div/div/div[4]/div/div/div[1]/div[1]/div/div/div/div/div[1]/div[1]/div[1]/div[2]/span',
+    'xpath=/html/body/div[1]/div/div/div/div/div[4]/div/div/div[1]/div[1]/div/div/div/div/div[1]/div[1]/div[1]/div[2]/span',
+    "xpath=//*[@id='app']/div/div/span[6]/div/ul/div/div/div[1]/li/div/span",
+    "xpath=/html/body/div[1]/div/div/div/div/span[6]/div/ul/div/div/div[1]/li/div/span"
+]
+
+# Campo de legenda na tela de preview
+SELETORES_LEGENDA = [
+    "css=#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div.x10l6tqk.x13vifvy.x1o0tod.x78zum5.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x47corl > div.x9f619.x1n2onr6.x5yr21d.x6ikm8r.x10wlt62.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.xyyilfv.x1iyjqo2.xpilrb4.x1t7ytsu.x1vb5itz.x12xzwr > div > span > div > div > div > div.x1n2onr6.xupqr0c.x78zum5.x1r8uery.x1iyjqo2.xdt5ytf.x1hc1fzr.x6ikm8r.x10wlt62.x1anedsm > div > div.x1n2onr6.x78zum5.x98rzlu.xdt5ytf.x1qughib.x6ikm8r.x10wlt62 > div.x1n2onr6.x78zum5.x6s0dn4.xl56j7k.xbktkl8.x16ovd2e.xvtqlqk.x12xbjc7.xdx6fka > div > div > div.x1n2onr6.xh8yej3.x1k70j0n.x14z9mp.xzueoph.x1lziwak.xisnujt.x14ug900.x1vvkbs.x126k92a.x1hx0egp.lexical-rich-text-input > div.x1hx0egp.x6ikm8r.x1odjw0f.x1k6rcq7.x1lkfr7t > p",
+    "xpath=//*[@id='app']/div/div/div[3]/div/div[3]/div[2]/div/span/div/div/div/div[2]/div/div[1]/div[3]/div/div/div[1]/div[1]/p",
+    "xpath=/html/body/div[1]/div/div/div/div/div[3]/div/div[3]/div[2]/div/span/div/div/div/div[2]/div/div[1]/div[3]/div/div/div[1]/div[1]/p",
+    "xpath=//*[@id='app']/div/div/div[3]/div/div[3]/div[2]/div/span/div/div/div/div[2]/div/div[1]/div[3]/div/div/div[1]/div[1]/div[1]/p",
+    "css=#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div.x10l6tqk.x13vifvy.x1o0tod.x78zum5.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x47corl > div.x9f619.x1n2onr6.x5yr21d.x6ikm8r.x10wlt62.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.xyyilfv.x1iyjqo2.xpilrb4.x1t7ytsu.x1vb5itz.x12xzwr > div > span > div > div > div > div.x1n2onr6.xupqr0c.x78zum5.x1r8uery.x1iyjqo2.xdt5ytf.x1hc1fzr.x6ikm8r.x10wlt62.x1anedsm > div > div.x78zum5.x1iyjqo2.xs83m0k.x1r8uery.xdt5ytf.x1qughib.x6ikm8r.x10wlt62 > div.x1c4vz4f.xs83m0k.xdl72j9.x1g77sc7.x78zum5.xozqiw3.x1oa3qoh.x12fk4p8.xeuugli.x2lwn1j.xl56j7k.x1q0g3np.x6s0dn4.x1n2onr6.xo8q3i6.x1y1aw1k.xwib8y2.x1c1uobl.xyri2b > div > div > div.x1c4vz4f.xs83m0k.xdl72j9.x1g77sc7.x78zum5.xozqiw3.x1oa3qoh.x12fk4p8.xeuugli.x2lwn1j.x1nhvcw1.x1q0g3np.x1cy8zhl.x9f619.xh8yej3.x1ba4aug.x1tiyuxx.xvtqlqk.x1nbhmlj.xdx6fka.x1od0jb8.xyi3aci.xwf5gio.x1p453bz.x1suzm8a > div.x1n2onr6.xh8yej3.x1k70j0n.x14z9mp.xzueoph.x1lziwak.xisnujt.x14ug900.x1vvkbs.x126k92a.x1hx0egp.lexical-rich-text-input > div.x1hx0egp.x6ikm8r.x1odjw0f.x1k6rcq7.x1lkfr7t > p",
+    "xpath=//div[contains(@aria-label, 'legenda')]",
+    "css=div.lexical-rich-text-input div[contenteditable='true']",
+    'css=#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div.x10l6tqk.x13vifvy.x1o0tod.x78zum5.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x47corl > div.x9f619.x1n2onr6.x5yr21d.x6ikm8r.x10wlt62.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.xyyilfv.x1iyjqo2.xpilrb4.x1t7ytsu.x1vb5itz.x12xzxwr > div > span > div > div > div > div.x1n2onr6.xupqr0c.x78zum5.x1r8uery.x1iyjqo2.xdt5ytf.x1hc1fzr.x6ikm8r.x10wlt62.x1anedsm > div > div.x78zum5.x1iyjqo2.xs83m0k.x1r8uery.xdt5ytf.x1qughib.x6ikm8r.x10wlt62 > div.x1c4vz4f.xs83m0k.xdl72j9.x1g77sc7.x78zum5.xozqiw3.x1oa3qoh.x12fk4p8.xeuugli.x2lwn1j.xl56j7k.x1q0g3np.x6s0dn4.x1n2onr6.xo8q3i6.x1y1aw1k.xwib8y2.x1c1uobl.xyri2b > div > div > div > div.x1n2onr6.xh8yej3.x1k70j0n.x14z9mp.xzueoph.x1lziwak.xisnujt.x14ug900.x1vvkbs.x126k92a.x1hx0egp.lexical-rich-text-input > div.x1hx0egp.x6ikm8r.x1odjw0f.x1k6rcq7.x1lkfr7t > p',
+    'xpath=//*[@id="app"]/div/div/div[3]/div/div[3]/div[2]/div/span/div/div/div/div[2]/div/div[1]/div[3]/div/div/div/div[1]/div[1]/p',
+    'xpath=/html/body/div[1]/div/div/div/div/div[3]/div/div[3]/div[2]/div/span/div/div/div/div[2]/div/div[1]/div[3]/div/div/div/div[1]/div[1]/p',
+    "xpath=//div[contains(@aria-label, 'legenda')]", # Português
+    "xpath=//div[contains(@aria-label, 'caption')]", # Inglês
+    "css=div[contenteditable='true'][role='textbox']", # Genérico funcional
+    "css=.lexical-rich-text-input [contenteditable='true']", # Estrutura técnica
+    "xpath=//footer//div[@contenteditable='true']" # Posição na tela
+]
+
+# Botão de enviar na tela de preview
+SELETORES_ENVIAR = [
+    "css=#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div.x10l6tqk.x13vifvy.x1o0tod.x78zum5.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x47corl > div.x9f619.x1n2onr6.x5yr21d.x6ikm8r.x10wlt62.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.xyyilfv.x1iyjqo2.xpilrb4.x1t7ytsu.x1vb5itz.x12xzxwr > div > span > div > div > div > div.x1n2onr6.xupqr0c.x78zum5.x1r8uery.x1iyjqo2.xdt5ytf.x1hc1fzr.x6ikm8r.x10wlt62.x1anedsm > div > div.x78zum5.x1c4vz4f.x2lah0s.x1helyrv.x6s0dn4.x1qughib.x178xt8z.x13fuv20.xx42vgk.x1y1aw1k.xwib8y2.xf7dkkf.xv54qhq > div.x1247r65.xng8ra > span > div > div.x78zum5.x6s0dn4.xl56j7k.xexx8yu.xyri2b.x18d9i69.x1c1uobl.x1f6kntn.xk50ysn.xtvhhri.x1c9tyrk.xeusxvb.x1pahc9y.x1ertn4p.xu306ak.x12s1jxh.xkdsq27.xwwtwea.x1gfkgh9.x1247r65.xng8ra.x1pse0pq.xfn3atn > span",
+    "xpath=//span[@data-icon='send']",
+    "xpath=//div[@role='button' and @aria-label='Enviar']",
+    "xpath=//*[@id='app']/div/div/div[3]/div/div[3]/div[2]/div/span/div/div/div/div[2]/div/div[2]/div[2]/span/div/div/span",
+    "xpath=/html/body/div[1]/div/div/div/div/div[3]/div/div[3]/div[2]/div/span/div/div/div/div[2]/div/div[2]/div[2]/span/div/div/span",
+    "css=div[aria-label='Enviar'] span[data-icon='send']",
+    "css=#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div.x10l6tqk.x13vifvy.x1o0tod.x78zum5.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x47corl > div.x9f619.x1n2onr6.x5yr21d.x6ikm8r.x10wlt62.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.xyyilfv.x1iyjqo2.xpilrb4.x1t7ytsu.x1vb5itz.x12xzwr > div > span > div > div > div > div.x1n2onr6.xupqr0c.x78zum5.x1r8uery.x1iyjqo2.xdt5ytf.x1hc1fzr.x6ikm8r.x10wlt62.x1anedsm > div > div.x78zum5.x1c4vz4f.x2lah0s.x1helyrv.x6s0dn4.x1qughib.x178xt8z.x13fuv20.xx42vgk.x1y1aw1k.xwib8y2.xf7dkkf.xv54qhq > div.x1247r65.xng8ra > span > div > div > span",
+    "css=#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div.x10l6tqk.x13vifvy.x1o0tod.x78zum5.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x47corl > div.x9f619.x1n2onr6.x5yr21d.x6ikm8r.x10wlt62.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.xyyilfv.x1iyjqo2.xpilrb4.x1t7ytsu.x1vb5itz.x12xzxwr > div > span > div > div > div > div.x1n2onr6.xupqr0c.x78zum5.x1r8uery.x1iyjqo2.xdt5ytf.x1hc1fzr.x6ikm8r.x10wlt62.x1anedsm > div > div.x78zum5.x1c4vz4f.x2lah0s.x1helyrv.x6s0dn4.x1qughib.x178xt8z.x13fuv20.xx42vgk.x1y1aw1k.xwib8y2.xf7dkkf.xv54qhq > div.x1247r65.xng8ra > span > div > div > span",
+    "xpath=//*[@id='app']/div/div/div[3]/div/div[3]/div[2]/div/span/div/div/div/div[2]/div/div[2]/div[2]/span/div/div/span",
+]
+
+# Algum item do menu de anexo (Documento / Fotos e vídeos) visível
+XPATH_MENU_ANEXO = (
+    "xpath=//span[contains(text(), 'Documento') or contains(text(), 'Document') "
+    "or contains(text(), 'Fotos') or contains(text(), 'Photos')] "
+    "| //*[@data-icon='document' or @data-icon='image']"
+)
+
+
+# Botão do clipe (Anexar)
+XPATH_BOTAO_ANEXO = '//div[@aria-label="Anexar"] | //span[@data-icon="plus"] | //span[@data-icon="plus-rounded"] | //span[@data-icon="clip"] | //div[@aria-label="Attach"]'
+
+# Botão de enviar da tela de preview (só aparece quando o arquivo está pronto para legenda)
+XPATH_BOTAO_ENVIAR_PREVIEW = '//*[@data-icon="send"] | //div[@aria-label="Enviar"] | //span[@data-icon="send"] | //*[@id="app"]/div/div/div[3]/div/div[3]/div[2]/div/span/div/div/div/div[2]/div/div[2]/div[2]/span/div/div[1]/span'
+
+EXTENSOES_MIDIA = ('.jpg', '.jpeg', '.png', '.gif', '.mp4', '.avi')
+
+# Limites de anexos por mensagem. Podem ser sobrescritos em
+# user_data/config.json -> {"anexos": {"max_arquivos": 30, "max_mb": 0}}  (0 = sem limite)
+LIMITES_ANEXOS_PADRAO = {
+    "max_arquivos": 30,
+    "max_mb": 0,
+}
+
+def _limite_anexos(chave):
+    personalizados = get_config("anexos", {}) or {}
+    return float(personalizados.get(chave, LIMITES_ANEXOS_PADRAO[chave]))
+
+def agrupar_anexos(lista_arquivos, max_arquivos=None, max_bytes=None):
+    """
+    Divide os anexos em grupos que cabem em UMA mensagem do WhatsApp.
+
+    Mídia (foto/vídeo) e documento vão por itens diferentes do menu de anexo, então
+    nunca se misturam; dentro de cada tipo a ordem original é mantida. O tipo que
+    aparece primeiro na lista é enviado primeiro (e leva a legenda).
+
+    Returns:
+        list[tuple]: (is_media, [caminhos]) na ordem de envio
+    """
+    max_arquivos = int(max_arquivos or _limite_anexos("max_arquivos"))
+    if max_bytes is None:
+        max_bytes = _limite_anexos("max_mb") * 1024 * 1024
+
+    por_tipo = {}
+    for caminho in lista_arquivos:
+        is_media = os.path.splitext(caminho.lower())[1] in EXTENSOES_MIDIA
+        por_tipo.setdefault(is_media, []).append(caminho)
+
+    grupos = []
+    for is_media, arquivos in por_tipo.items():
+        atual, bytes_atual = [], 0
+        for caminho in arquivos:
+            try:
+                tamanho = os.path.getsize(caminho)
+            except OSError:
+                tamanho = 0
+            estoura = len(atual) >= max_arquivos or (max_bytes and bytes_atual + tamanho > max_bytes)
+            if atual and estoura:
+                grupos.append((is_media, atual))
+                atual, bytes_atual = [], 0
+            atual.append(caminho)
+            bytes_atual += tamanho
+        if atual:
+            grupos.append((is_media, atual))
+    return grupos
+
+def separar_arquivos(file_path):
+    """Converte o file_path da tarefa (um caminho ou vários, um por linha) em lista de caminhos absolutos."""
+    if isinstance(file_path, str):
+        clean_path = file_path.replace('nC:\\', '\nC:\\').replace('"', '')
+        return [os.path.abspath(p.strip()) for p in clean_path.split('\n') if p.strip()]
+    return [os.path.abspath(str(file_path).strip())]
+
+def extrair_numero(target):
+    """
+    Se o target for um número de telefone, retorna só os dígitos com DDI.
+    Aceita formatos como '+55 (11) 99999-9999', '5511999999999' ou '11999999999'
+    (sem DDI usa 'ddi_padrao' do config.json, padrão 55). Nomes retornam None.
+    """
+    if not target:
+        return None
+    bruto = target.strip()
+    if not re.fullmatch(r"\+?[\d\s().-]+", bruto):
+        return None
+    digitos = re.sub(r"\D", "", bruto)
+    if len(digitos) in (10, 11) and not bruto.startswith("+"):
+        digitos = str(get_config("ddi_padrao", "55")) + digitos
+    if not 10 <= len(digitos) <= 15:
+        return None
+    return digitos
+
+def identidade_de_conversa(info):
+    """
+    Monta a identidade da conversa a partir do resultado de JS_IDENTIDADE_CONVERSA:
+    JID (pelo data-id das mensagens), número e nome do cabeçalho. Campos não encontrados voltam como None.
+    """
+    info = info or {}
+    jid = None
+    m = re.search(r"(\d+@(?:c\.us|g\.us|s\.whatsapp\.net))", info.get("dataId") or "")
+    if m:
+        jid = m.group(1)
+    numero = jid.split("@")[0] if jid and not jid.endswith("@g.us") else None
+    return {"jid": jid, "numero": numero, "nome_exibicao": info.get("titulo")}
+
+def titulo_corresponde(target, titulo):
+    """True se o título do cabeçalho corresponde ao target (nome ou dígitos do número)."""
+    digitos = "".join(c for c in target if c.isdigit())
+    return target.lower() in titulo.lower() or (len(digitos) >= 8 and digitos in "".join(c for c in titulo if c.isdigit()))
@@ -0,0 +1,251 @@
+"""
+BENCHMARK DO BANCO (core/db.py)
+
+Roda num banco temporário: o user_data/scheduler.db não é tocado.
+
+Uso:
+    python app.py --benchmark-db
+    python app.py --benchmark-db --repeticoes 1000
+
+Conexões: compara a latência por chamada abrindo uma conexão nova a cada
+método (comportamento antigo, reutilizar_conexao=False) com a conexão
+reaproveitada por thread (padrão).
+
+Lote: adicionar/atualizar_status um a um contra adicionar_em_lote/
+atualizar_status_em_lote (uma transação) em cada perfil.
+
+Perfis de durabilidade (db.PERFIS_DURABILIDADE):
+- vazão de inserções e de atualizações de status em cada perfil;
+- teste de queda: um processo grava sem parar e é morto (kill) no meio.
+  Depois confere quantos commits já confirmados ao processo pai sobreviveram:
+    * queda do processo: o banco é aberto normalmente (com o WAL);
+    * pior caso de queda de energia: só o arquivo principal, sem o WAL
+      (o que não foi copiado do WAL para o banco ainda não estava garantido).
+"""
+
+import io
+import time
+import queue
+import shutil
+import sqlite3
+import tempfile
+import datetime
+import contextlib
+import multiprocessing
+from pathlib import Path
+
+def _silencioso():
+    # SchedulerDB imprime cada operação; no benchmark isso só atrapalha a leitura
+    return contextlib.redirect_stdout(io.StringIO())
+
+def medir(funcao, repeticoes):
+    """
+    Executa a função 'repeticoes' vezes.
+
+    Returns:
+        dict {'media', 'p50', 'p99'} em ms por chamada
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {
+        "media": sum(tempos) / len(tempos),
+        "p50": tempos[len(tempos) // 2],
+        "p99": tempos[min(len(tempos) - 1, int(len(tempos) * 0.99))],
+    }
+
+def popular(db, linhas):
+    """Cria 'linhas' agendamentos de teste. Returns: lista de ids."""
+    base = datetime.datetime.now() + datetime.timedelta(days=1)
+    ids = []
+    with _silencioso():
+        for i in range(linhas):
+            ids.append(db.adicionar(
+                task_name=f"bench_{i}", target=f"Contato {i}", mode="text",
+                scheduled_time=base + datetime.timedelta(minutes=i), message="teste"
+            ))
+    return ids
+
+def comparar_conexoes(repeticoes=300, linhas=200):
+    """
+    Latência por chamada das leituras mais frequentes (a GUI confere revisao_atual a cada 2s).
+
+    Returns:
+        dict {operação: {'antes': medida, 'depois': medida}}
+    """
+    from core.db import SchedulerDB
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        for rotulo, reutilizar in (("antes", False), ("depois", True)):
+            with _silencioso():
+                db = SchedulerDB(Path(pasta) / f"conexoes_{rotulo}.db", reutilizar_conexao=reutilizar)
+            ids = popular(db, linhas)
+            operacoes = {
+                "obter_por_id": lambda: db.obter_por_id(ids[len(ids) // 2]),
+                "listar_todos": db.listar_todos,
+                "listar_pagina": lambda: db.listar_pagina(limite=50),
+                "revisao_atual": db.revisao_atual,
+                "contar_por_status": db.contar_por_status,
+                "obter_contato": lambda: db.obter_contato("Contato 1"),
+            }
+            for nome, funcao in operacoes.items():
+                resultados.setdefault(nome, {})[rotulo] = medir(funcao, repeticoes)
+            db.fechar_conexao()
+    return resultados
+
+def comparar_perfis(operacoes=200):
+    """
+    Vazão de escrita em cada perfil de durabilidade.
+
+    Returns:
+        dict {perfil: {'insercoes_s', 'status_s'}} em operações por segundo
+    """
+    from core.db import SchedulerDB, PERFIS_DURABILIDADE
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        for perfil in PERFIS_DURABILIDADE:
+            with _silencioso():
+                db = SchedulerDB(Path(pasta) / f"perfil_{perfil}.db", durabilidade=perfil)
+            inicio = time.perf_counter()
+            ids = popular(db, operacoes)
+            insercoes = operacoes / (time.perf_counter() - inicio)
+            inicio = time.perf_counter()
+            with _silencioso():
+                for task_id in ids:
+                    db.atualizar_status(task_id, "completed")
+            status = operacoes / (time.perf_counter() - inicio)
+            resultados[perfil] = {"insercoes_s": insercoes, "status_s": status}
+            db.fechar_conexao()
+    return resultados
+
+def comparar_lote(linhas=2000):
+    """
+    Tempo para criar e depois concluir 'linhas' agendamentos, um a um e em lote.
+
+    Returns:
+        dict {perfil: {'um_a_um_s', 'lote_s'}} em segundos (criar + atualizar status)
+    """
+    from core.db import SchedulerDB, PERFIS_DURABILIDADE
+
+    base = datetime.datetime.now() + datetime.timedelta(days=1)
+    resultados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        for perfil in PERFIS_DURABILIDADE:
+            with _silencioso():
+                um_a_um = SchedulerDB(Path(pasta) / f"um_a_um_{perfil}.db", durabilidade=perfil)
+                lote = SchedulerDB(Path(pasta) / f"lote_{perfil}.db", durabilidade=perfil)
+
+            inicio = time.perf_counter()
+            ids = popular(um_a_um, linhas)
+            with _silencioso():
+                for task_id in ids:
+                    um_a_um.atualizar_status(task_id, "completed")
+            tempo_um_a_um = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            with _silencioso():
+                ids, _ = lote.adicionar_em_lote([
+                    {"task_name": f"bench_{i}", "target": f"Contato {i}", "mode": "text",
+                     "scheduled_time": base + datetime.timedelta(minutes=i), "message": "teste"}
+                    for i in range(linhas)
+                ])
+                lote.atualizar_status_em_lote([(task_id, "completed") for task_id in ids])
+            tempo_lote = time.perf_counter() - inicio
+
+            resultados[perfil] = {"um_a_um_s": tempo_um_a_um, "lote_s": tempo_lote}
+            um_a_um.fechar_conexao()
+            lote.fechar_conexao()
+    return resultados
+
+def _escritor_ate_morrer(caminho, perfil, fila):
+    """Processo filho do teste de queda: insere sem parar e avisa cada commit concluído."""
+    from core.db import SchedulerDB
+    with _silencioso():
+        db = SchedulerDB(Path(caminho), durabilidade=perfil)
+        base = datetime.datetime.now()
+        i = 0
+        while True:
+            task_id = db.adicionar(task_name=f"queda_{i}", target="x", mode="text", scheduled_time=base)
+            fila.put(task_id)
+            i += 1
+
+def _ids_presentes(caminho):
+    conn = sqlite3.connect(str(caminho))
+    try:
+        integro = conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        return {r[0] for r in conn.execute("SELECT id FROM agendamentos")}, integro
+    finally:
+        conn.close()
+
+def testar_queda(perfil, confirmados_antes_de_matar=300):
+    """
+    Mata o processo escritor depois de N commits confirmados.
+
+    Returns:
+        dict {'confirmados', 'apos_queda_processo', 'sem_wal', 'integro'}:
+        quantos dos commits confirmados continuam no banco em cada cenário
+    """
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = Path(pasta) / f"queda_{perfil}.db"
+        fila = ctx.Queue()
+        proc = ctx.Process(target=_escritor_ate_morrer, args=(str(caminho), perfil, fila), daemon=True)
+        proc.start()
+
+        confirmados = set()
+        try:
+            while len(confirmados) < confirmados_antes_de_matar:
+                confirmados.add(fila.get(timeout=60))
+        finally:
+            proc.kill()
+            proc.join()
+        # O que já estava na fila também foi confirmado antes da morte
+        while True:
+            try:
+                confirmados.add(fila.get(timeout=0.5))
+            except queue.Empty:
+                break
+
+        copia_sem_wal = Path(pasta) / "sem_wal.db"
+        shutil.copyfile(caminho, copia_sem_wal)
+        presentes, integro = _ids_presentes(caminho)
+        presentes_sem_wal, integro_sem_wal = _ids_presentes(copia_sem_wal)
+
+    return {
+        "confirmados": len(confirmados),
+        "apos_queda_processo": len(confirmados & presentes),
+        "sem_wal": len(confirmados & presentes_sem_wal),
+        "integro": integro and integro_sem_wal,
+    }
+
+def main(repeticoes=300):
+    """Ponto de entrada do CLI."""
+    print(f"Latência por chamada (ms) | {repeticoes} repetições | banco temporário com 200 agendamentos")
+    print(f"{'operação':<20}{'antes p50':>12}{'antes p99':>12}{'depois p50':>12}{'depois p99':>12}{'ganho':>9}")
+    for nome, r in comparar_conexoes(repeticoes).items():
+        a, d = r["antes"], r["depois"]
+        ganho = a["media"] / d["media"] if d["media"] else 0
+        print(f"{nome:<20}{a['p50']:>12.3f}{a['p99']:>12.3f}{d['p50']:>12.3f}{d['p99']:>12.3f}{ganho:>8.1f}x")
+
+    print(f"\nVazão de escrita por perfil de durabilidade (operações/s)")
+    print(f"{'perfil':<14}{'inserções':>12}{'status':>12}")
+    for perfil, r in comparar_perfis().items():
+        print(f"{perfil:<14}{r['insercoes_s']:>12.0f}{r['status_s']:>12.0f}")
+
+    print(f"\nCriar + concluir 2000 agendamentos (s): um a um vs em lote (uma transação)")
+    print(f"{'perfil':<14}{'um a um':>12}{'lote':>12}{'ganho':>9}")
+    for perfil, r in comparar_lote().items():
+        print(f"{perfil:<14}{r['um_a_um_s']:>12.2f}{r['lote_s']:>12.2f}{r['um_a_um_s'] / r['lote_s']:>8.1f}x")
+
+    print(f"\nTeste de queda: commits confirmados que sobreviveram ao kill do processo escritor")
+    print(f"{'perfil':<14}{'confirmados':>12}{'queda processo':>16}{'sem WAL (energia)':>19}{'íntegro':>9}")
+    from core.db import PERFIS_DURABILIDADE
+    for perfil in PERFIS_DURABILIDADE:
+        r = testar_queda(perfil)
+        print(f"{perfil:<14}{r['confirmados']:>12}{r['apos_queda_processo']:>16}{r['sem_wal']:>19}{'sim' if r['integro'] else 'NÃO':>9}")
+    return 0
@@ -0,0 +1,241 @@
+"""
+PRÉ-PROCESSAMENTO DE MÍDIA COM CACHE POR CONTEÚDO (OPCIONAL)
+
+Antes de entregar os arquivos ao seletor do WhatsApp, imagens grandes são
+reduzidas/recomprimidas (Pillow) e, se configurado, vídeos são recodificados
+(ffmpeg no PATH). O resultado fica em user_data/cache_midia/<hash>/<nome>,
+onde <hash> = SHA-256 do conteúdo original + parâmetros usados. O mesmo
+panfleto enviado para centenas de contatos é processado uma única vez.
+
+Só recebe arquivos já classificados como mídia (automation.agrupar_anexos, pelo
+nome original). O arquivo enviado leva o nome do próprio original (com a extensão
+do resultado): dois arquivos de mesmo conteúdo e nomes diferentes dividem o item
+do cache, mas cada um sai com o seu nome (link físico, ou cópia, na pasta do item).
+
+O cache tem tamanho máximo: os itens menos usados recentemente (mtime da
+pasta, renovado a cada uso) são apagados primeiro.
+
+Ativação em user_data/config.json:
+    "preprocessar_midia": true
+    "preprocessar_midia": {"lado_maximo": 1600, "qualidade_jpeg": 82,
+                           "limite_cache_mb": 500, "video": false, "altura_video": 720}
+"""
+
+import os
+import time
+import json
+import shutil
+import hashlib
+import subprocess
+from core.config import get_config
+from core.paths import get_user_data_dir
+from core.manutencao_perfil import tamanho_pasta, formatar_tamanho
+
+CACHE_DIR = os.path.join(get_user_data_dir(), "cache_midia")
+
+PADROES = {
+    "lado_maximo": 1600,
+    "qualidade_jpeg": 82,
+    "limite_cache_mb": 500,
+    "video": False,
+    "altura_video": 720,
+}
+
+EXTENSOES_IMAGEM = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+EXTENSOES_VIDEO = {".mp4", ".mov", ".avi", ".mkv", ".3gp"}
+
+# Marca um item cujo resultado não ficou menor: usa-se o original
+MARCADOR_ORIGINAL = ".usar_original"
+
+# Hash já calculado por (caminho, tamanho, mtime): evita reler arquivos grandes no mesmo processo
+_hashes = {}
+
+def _log(logger, msg):
+    from core.automation_base import _log as log_automacao
+    log_automacao(logger, msg)
+
+def opcoes():
+    """Opções efetivas, ou None se o pré-processamento estiver desligado."""
+    bruto = get_config("preprocessar_midia", False)
+    if not bruto:
+        return None
+    efetivas = dict(PADROES)
+    if isinstance(bruto, dict):
+        efetivas.update({k: v for k, v in bruto.items() if k in PADROES})
+    return efetivas
+
+def hash_conteudo(caminho):
+    st = os.stat(caminho)
+    chave = (os.path.abspath(caminho), st.st_size, st.st_mtime_ns)
+    if chave not in _hashes:
+        h = hashlib.sha256()
+        with open(caminho, 'rb') as f:
+            for bloco in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(bloco)
+        _hashes[chave] = h.hexdigest()
+    return _hashes[chave]
+
+def _chave(caminho, tipo, op):
+    if tipo == "imagem":
+        parametros = {"lado": op["lado_maximo"], "q": op["qualidade_jpeg"]}
+    else:
+        parametros = {"altura": op["altura_video"]}
+    assinatura = json.dumps(parametros, sort_keys=True).encode()
+    return hashlib.sha256(hash_conteudo(caminho).encode() + assinatura).hexdigest()[:32]
+
+def _tipo(caminho, op):
+    ext = os.path.splitext(caminho.lower())[1]
+    if ext in EXTENSOES_IMAGEM:
+        return "imagem"
+    if ext in EXTENSOES_VIDEO and op.get("video") and shutil.which("ffmpeg"):
+        return "video"
+    return None
+
+def _processar_imagem(origem, pasta, op):
+    """Reduz para lado_maximo e recomprime. PNG com transparência continua PNG."""
+    from PIL import Image, ImageOps
+
+    with Image.open(origem) as img:
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((op["lado_maximo"], op["lado_maximo"]), Image.LANCZOS)
+        base = os.path.splitext(os.path.basename(origem))[0]
+        transparente = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        if transparente:
+            destino = os.path.join(pasta, base + ".png")
+            img.save(destino, "PNG", optimize=True)
+        else:
+            destino = os.path.join(pasta, base + ".jpg")
+            img.convert("RGB").save(destino, "JPEG", quality=int(op["qualidade_jpeg"]), optimize=True, progressive=True)
+    return destino
+
+def _processar_video(origem, pasta, op):
+    destino = os.path.join(pasta, os.path.splitext(os.path.basename(origem))[0] + ".mp4")
+    altura = int(op["altura_video"])
+    subprocess.run(
+        ["ffmpeg", "-y", "-loglevel", "error", "-i", origem,
+         "-vf", f"scale=-2:'min({altura},ih)'", "-c:v", "libx264", "-preset", "veryfast",
+         "-crf", "26", "-c:a", "aac", "-b:a", "128k", "-movflags", "+faststart", destino],
+        check=True, timeout=1800, capture_output=True
+    )
+    return destino
+
+def _item_em_cache(pasta):
+    """Caminho do arquivo pronto, MARCADOR_ORIGINAL, ou None se não houver item válido."""
+    try:
+        nomes = os.listdir(pasta)
+    except OSError:
+        return None
+    if MARCADOR_ORIGINAL in nomes:
+        return MARCADOR_ORIGINAL
+    arquivos = sorted(n for n in nomes if not n.startswith(".") and not n.endswith(".tmp"))
+    return os.path.join(pasta, arquivos[0]) if arquivos else None
+
+def _com_nome_do_original(caminho, pronto):
+    """Caminho na pasta do item com o nome do original e a extensão do resultado."""
+    nome = os.path.splitext(os.path.basename(caminho))[0] + os.path.splitext(pronto)[1]
+    destino = os.path.join(os.path.dirname(pronto), nome)
+    if os.path.exists(destino):
+        return destino
+    try:
+        os.link(pronto, destino)
+    except OSError:
+        if os.path.exists(destino):
+            return destino  # outro processo criou primeiro
+        try:
+            temporario = f"{destino}.{os.getpid()}.tmp"
+            shutil.copyfile(pronto, temporario)
+            os.replace(temporario, destino)
+        except OSError:
+            return pronto
+    return destino
+
+def _tocar(pasta):
+    try:
+        os.utime(pasta, None)
+    except OSError:
+        pass
+
+def preparar_arquivo(caminho, op, logger=None):
+    """
+    Devolve o caminho a enviar: a versão processada (do cache ou recém-criada)
+    ou o próprio original quando não há ganho ou o tipo não é tratado.
+    """
+    tipo = _tipo(caminho, op)
+    if not tipo or not os.path.isfile(caminho):
+        return caminho
+
+    chave = _chave(caminho, tipo, op)
+    pasta = os.path.join(CACHE_DIR, chave)
+    pronto = _item_em_cache(pasta)
+    if pronto:
+        _tocar(pasta)
+        return caminho if pronto == MARCADOR_ORIGINAL else _com_nome_do_original(caminho, pronto)
+
+    # Processa numa pasta temporária e publica com rename: outro processo (pool) pode fazer o mesmo
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    temporaria = f"{pasta}.{os.getpid()}.tmp"
+    shutil.rmtree(temporaria, ignore_errors=True)
+    os.makedirs(temporaria)
+    inicio = time.monotonic()
+    try:
+        destino = (_processar_imagem if tipo == "imagem" else _processar_video)(caminho, temporaria, op)
+        original, novo = os.path.getsize(caminho), os.path.getsize(destino)
+        if novo >= original:
+            os.remove(destino)
+            open(os.path.join(temporaria, MARCADOR_ORIGINAL), 'w').close()
+            _log(logger, f"🗜️ {os.path.basename(caminho)}: já está otimizado, enviando o original.")
+        else:
+            _log(logger, f"🗜️ {os.path.basename(caminho)}: {formatar_tamanho(original)} → {formatar_tamanho(novo)} "
+                         f"({time.monotonic() - inicio:.1f}s)")
+        try:
+            os.rename(temporaria, pasta)
+        except OSError:
+            shutil.rmtree(temporaria, ignore_errors=True)  # outro processo publicou primeiro
+    except Exception as e:
+        shutil.rmtree(temporaria, ignore_errors=True)
+        _log(logger, f"⚠️ Pré-processamento de {os.path.basename(caminho)} falhou ({e}), enviando o original.")
+        return caminho
+
+    pronto = _item_em_cache(pasta)
+    return caminho if pronto in (None, MARCADOR_ORIGINAL) else _com_nome_do_original(caminho, pronto)
+
+def limitar_cache(limite_bytes, protegidos=(), logger=None):
+    """
+    Apaga os itens menos usados até o cache caber em limite_bytes.
+    Itens em 'protegidos' (os que vão ser enviados agora) nunca são apagados.
+
+    Returns:
+        int: bytes liberados
+    """
+    try:
+        itens = [os.path.join(CACHE_DIR, n) for n in os.listdir(CACHE_DIR) if not n.endswith(".tmp")]
+    except OSError:
+        return 0
+    itens = [(p, os.path.getmtime(p), tamanho_pasta(p)) for p in itens if os.path.isdir(p)]
+    total = sum(t for _, _, t in itens)
+    liberado = 0
+    for pasta, _, tamanho in sorted(itens, key=lambda i: i[1]):
+        if total - liberado <= limite_bytes:
+            break
+        if os.path.normcase(pasta) in protegidos:
+            continue
+        shutil.rmtree(pasta, ignore_errors=True)
+        liberado += tamanho
+    if liberado:
+        _log(logger, f"🧹 Cache de mídia: {formatar_tamanho(liberado)} liberados (itens menos usados).")
+    return liberado
+
+def preparar_arquivos(lista_arquivos, logger=None):
+    """
+    Ponto de entrada usado antes do set_files. Com o recurso desligado devolve a lista intacta.
+
+    Returns:
+        list[str]: caminhos a enviar, na mesma ordem
+    """
+    op = opcoes()
+    if not op:
+        return lista_arquivos
+    preparados = [preparar_arquivo(c, op, logger) for c in lista_arquivos]
+    protegidos = {os.path.normcase(os.path.dirname(p)) for p in preparados}
+    limitar_cache(float(op["limite_cache_mb"]) * 1024 * 1024, protegidos, logger)
+    return preparados
@@ -0,0 +1,33 @@
+import os
+import json
+from core.paths import get_user_data_dir
+
+CONFIG_FILE = os.path.join(get_user_data_dir(), "config.json")
+
+_cache = {"mtime": None, "dados": {}}
+
+def carregar_config():
+    """
+    Lê user_data/config.json (opcional). Arquivo ausente ou inválido = {}.
+    Recarrega automaticamente se o arquivo for alterado.
+    """
+    try:
+        mtime = os.path.getmtime(CONFIG_FILE)
+    except OSError:
+        _cache["mtime"], _cache["dados"] = None, {}
+        return _cache["dados"]
+
+    if mtime != _cache["mtime"]:
+        try:
+            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+            _cache["dados"] = dados if isinstance(dados, dict) else {}
+        except Exception as e:
+            print(f"[CONFIG] Aviso: config.json inválido ({e}), usando padrões")
+            _cache["dados"] = {}
+        _cache["mtime"] = mtime
+    return _cache["dados"]
+
+def get_config(chave, padrao=None):
+    """Retorna uma chave do config.json ou o padrão."""
+    return carregar_config().get(chave, padrao)
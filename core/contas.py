@@ -0,0 +1,127 @@
+"""
+REGISTRO DE CONTAS (PERFIS DO WHATSAPP)
+
+Cada conta é um perfil persistente do Chrome com o seu próprio login (QR Code).
+A conta "principal" sempre existe e usa a pasta antiga perfil_bot_whatsapp.
+
+Arquivo user_data/contas.json:
+{
+    "contas": [
+        {"nome": "vendas", "perfil": "perfil_bot_whatsapp_vendas"},
+        ...
+    ]
+}
+Caminhos relativos são resolvidos a partir da pasta do app.
+"""
+
+import os
+import json
+import threading
+from core.paths import get_app_base_dir, get_user_data_dir
+
+CONTAS_FILE = os.path.join(get_user_data_dir(), "contas.json")
+STATS_FILE = os.path.join(get_user_data_dir(), "contas_stats.json")
+
+CONTA_PADRAO = "principal"
+PERFIL_PADRAO = "perfil_bot_whatsapp"
+
+_lock = threading.Lock()
+
+def _ler_json(caminho, padrao):
+    if not os.path.exists(caminho):
+        return padrao
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return padrao
+
+def _gravar_json(caminho, dados):
+    """Grava de forma atômica (arquivo temporário + replace)."""
+    tmp = f"{caminho}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(dados, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, caminho)
+
+def listar_contas():
+    """
+    Contas registradas, com a principal sempre em primeiro.
+
+    Returns:
+        list[dict]: [{'nome', 'perfil'}, ...]
+    """
+    dados = _ler_json(CONTAS_FILE, {})
+    contas = [{"nome": CONTA_PADRAO, "perfil": PERFIL_PADRAO}]
+    for c in (dados.get("contas") if isinstance(dados, dict) else None) or []:
+        nome = str(c.get("nome") or "").strip()
+        if nome and nome != CONTA_PADRAO and all(nome != x["nome"] for x in contas):
+            contas.append({"nome": nome, "perfil": c.get("perfil") or f"{PERFIL_PADRAO}_{nome}"})
+    return contas
+
+def obter_conta(nome):
+    """Conta registrada com esse nome (None = principal)."""
+    nome = nome or CONTA_PADRAO
+    return next((c for c in listar_contas() if c["nome"] == nome), None)
+
+def perfil_da_conta(nome=None):
+    """
+    Pasta absoluta do perfil da conta (criada se não existir).
+
+    Raises:
+        KeyError: conta não registrada
+    """
+    conta = obter_conta(nome)
+    if conta is None:
+        raise KeyError(f"Conta não registrada: {nome}")
+    perfil = conta["perfil"]
+    if not os.path.isabs(perfil):
+        perfil = os.path.join(get_app_base_dir(), perfil)
+    os.makedirs(perfil, exist_ok=True)
+    return perfil
+
+def adicionar_conta(nome, perfil=None):
+    """Registra uma conta nova (ou atualiza a pasta de uma existente)."""
+    nome = (nome or "").strip()
+    if not nome or nome == CONTA_PADRAO:
+        raise ValueError(f"Nome de conta inválido: '{nome}'")
+    with _lock:
+        dados = _ler_json(CONTAS_FILE, {})
+        contas = [c for c in dados.get("contas", []) if c.get("nome") != nome]
+        contas.append({"nome": nome, "perfil": perfil or f"{PERFIL_PADRAO}_{nome}"})
+        _gravar_json(CONTAS_FILE, {"contas": contas})
+    return obter_conta(nome)
+
+def remover_conta(nome):
+    """Remove a conta do registro (a pasta do perfil NÃO é apagada)."""
+    with _lock:
+        dados = _ler_json(CONTAS_FILE, {})
+        contas = [c for c in dados.get("contas", []) if c.get("nome") != nome]
+        _gravar_json(CONTAS_FILE, {"contas": contas})
+
+# =============================
+# ESTATÍSTICAS POR CONTA
+# =============================
+def ler_estatisticas():
+    """
+    Totais acumulados por conta.
+
+    Returns:
+        dict {conta: {'enviados', 'falhas', 'segundos'}}
+    """
+    dados = _ler_json(STATS_FILE, {})
+    return dados if isinstance(dados, dict) else {}
+
+def acumular_estatisticas(parciais):
+    """Soma as estatísticas de uma execução do pool aos totais salvos."""
+    with _lock:
+        totais = ler_estatisticas()
+        for conta, s in parciais.items():
+            t = totais.setdefault(conta, {"enviados": 0, "falhas": 0, "segundos": 0.0})
+            t["enviados"] += s.get("enviados", 0)
+            t["falhas"] += s.get("falhas", 0)
+            t["segundos"] = round(t["segundos"] + s.get("segundos", 0.0), 2)
+        try:
+            _gravar_json(STATS_FILE, totais)
+        except Exception as e:
+            print(f"[CONTAS] Aviso: não foi possível salvar as estatísticas: {e}")
+    return totais
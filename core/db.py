@@ -1,15 +1,56 @@
 import sqlite3
 import os
 import sys
+import threading
 import datetime
-from typing import List, Tuple, Optional
+import json
+from typing import List, Tuple, Optional, Union
 from pathlib import Path
 from core.paths import get_user_data_dir
+from core.config import get_config
 
 # CONFIGURAÇÃO DE CAMINHOS
 
 DATA_DIR = Path(get_user_data_dir())
 DB_PATH = DATA_DIR / "scheduler.db"
+
+# =============================
+# PERFIS DE DURABILIDADE
+# =============================
+# user_data/config.json -> {"durabilidade_db": "equilibrado"}
+#
+# paranoico (padrão): cada commit vai ao disco (FULL) e já é copiado do WAL para o
+#   banco principal; depois de atualizar_status o registro é relido para conferência.
+#   Sobrevive a queda do processo E a queda de energia/SO.
+# equilibrado: synchronous=NORMAL e checkpoint automático do SQLite (a cada ~1000
+#   páginas). Sobrevive a queda do processo sem perder nada; numa queda de energia/SO
+#   os últimos commits podem voltar atrás, mas o banco nunca corrompe.
+PERFIS_DURABILIDADE = {
+    "paranoico": {
+        "synchronous": "FULL",
+        "wal_autocheckpoint": 1,
+        "checkpoint_por_escrita": True,
+        "verificar_escrita": True,
+    },
+    "equilibrado": {
+        "synchronous": "NORMAL",
+        "wal_autocheckpoint": 1000,
+        "checkpoint_por_escrita": False,
+        "verificar_escrita": False,
+    },
+}
+PERFIL_DURABILIDADE_PADRAO = "paranoico"
+_APELIDOS_PERFIL = {"paranoid": "paranoico", "balanced": "equilibrado"}
+
+def perfil_durabilidade(nome=None):
+    """Nome do perfil efetivo (argumento, config.json ou padrão). Nome inválido = padrão."""
+    nome = nome or get_config("durabilidade_db", PERFIL_DURABILIDADE_PADRAO)
+    nome = _APELIDOS_PERFIL.get(str(nome).lower(), str(nome).lower())
+    if nome not in PERFIS_DURABILIDADE:
+        print(f"[DB] Aviso: perfil de durabilidade '{nome}' desconhecido, usando '{PERFIL_DURABILIDADE_PADRAO}'")
+        return PERFIL_DURABILIDADE_PADRAO
+    return nome
+
 class SchedulerDB:
     """
     Gerenciador do banco de dados SQLite para agendamentos.
@@ -22,18 +63,70 @@ class SchedulerDB:
     - message: Texto da mensagem (opcional)
     - file_path: Caminho do arquivo (opcional)
     - scheduled_time: Data/hora agendada (ISO format)
+    - scheduled_ts: A mesma data em segundos epoch (ordenação/filtros por data)
     - created_at: Data/hora de criação
     - status: Estado atual ('pending', 'running', 'completed', 'failed')
     - json_path: Caminho do JSON de instrução
     - executed_at: Data/hora de execução
     - error_message: Mensagem de erro
+    - jobs_json: Lista de envios (JSON) quando a tarefa é um LOTE; NULL para envio único
+    - resultado_json: Resultado por item do lote (JSON); envio único que falhou: um item só
+    - envio_status: Status confirmado pelo ícone do WhatsApp ('enviada', 'entregue', 'lida', 'desconhecido')
+    - envio_latencia_ms: Tempo entre o Enter/clique em enviar e a confirmação
     """
 
-    def __init__(self, db_path: Path = DB_PATH):
+    def __init__(self, db_path: Path = DB_PATH, reutilizar_conexao: bool = True, durabilidade: Optional[str] = None):
+        """
+        Args:
+            reutilizar_conexao: True = uma conexão por thread, aberta uma vez e
+                reaproveitada; False = conexão nova a cada chamada (comportamento antigo)
+            durabilidade: chave de PERFIS_DURABILIDADE (None = config.json / padrão)
+        """
         self.db_path = db_path
+        self.reutilizar_conexao = reutilizar_conexao
+        self.durabilidade = perfil_durabilidade(durabilidade)
+        self._perfil = PERFIS_DURABILIDADE[self.durabilidade]
+        self._local = threading.local()
         self._init_db()
 
     def _get_conn(self):
+        """
+        Conexão da thread atual (criada e configurada só na primeira chamada).
+
+        sqlite3 não permite usar a mesma conexão em threads diferentes, então
+        cada thread (GUI, threads de trabalho) tem a sua. Depois de usar,
+        os métodos devolvem a conexão com _liberar().
+        """
+        if not self.reutilizar_conexao:
+            return self._abrir_conexao()
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = self._abrir_conexao()
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _liberar(self, conn):
+        """Fim do uso: desfaz transação esquecida aberta (ex.: após erro) e restaura o row_factory."""
+        if not self.reutilizar_conexao:
+            conn.close()
+            return
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        finally:
+            conn.row_factory = None
+
+    def fechar_conexao(self):
+        """Fecha a conexão da thread atual. Threads de trabalho chamam ao terminar."""
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _abrir_conexao(self):
         """
         Conexão com SQLite em modo WAL (Write-Ahead Logging).
 
@@ -54,11 +147,9 @@ class SchedulerDB:
         # ===== CONFIGURA CACHE =====
         conn.execute("PRAGMA cache_size=10000")  # 10MB cache
 
-        # ===== FORÇA SINCRONIZAÇÃO =====
-        conn.execute("PRAGMA synchronous=FULL")  # SEGURANÇA MÁXIMA
-        
-        # ===== CHECKPOINT AUTOMÁTICO =====
-        conn.execute("PRAGMA wal_autocheckpoint=1")  # Merge a cada operação
+        # ===== SINCRONIZAÇÃO E CHECKPOINT (perfil de durabilidade) =====
+        conn.execute(f"PRAGMA synchronous={self._perfil['synchronous']}")
+        conn.execute(f"PRAGMA wal_autocheckpoint={int(self._perfil['wal_autocheckpoint'])}")
         
         # ===== FORÇA LEITURA ATUALIZADA =====
         conn.execute("PRAGMA read_uncommitted=0")  # Garante leitura de dados commitados
@@ -67,8 +158,10 @@ class SchedulerDB:
 
     def _force_sync(self, conn):
         """
-        Força sincronização do banco de dados WAL
+        Força sincronização do banco de dados WAL (só no perfil que exige checkpoint por escrita)
         """
+        if not self._perfil["checkpoint_por_escrita"]:
+            return
         try:
             # PASSIVE é suficiente e não bloqueia
             conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
@@ -76,11 +169,53 @@ class SchedulerDB:
             # Se falhar, apenas loga mas não quebra a execução
             print(f"[DB] Aviso: Checkpoint falhou: {e}")
 
+    # Valores aceitos pelos CHECK de agendamentos (migração 1). As operações em
+    # lote conferem antes de gravar para apontar a linha exata do conflito.
+    MODOS_VALIDOS = ('text', 'file', 'file_text')
+    STATUS_VALIDOS = ('pending', 'running', 'completed', 'failed', 'cancelled')
+
+    # Migrações do esquema, em ordem. PRAGMA user_version guarda a última aplicada.
+    # Nunca altere uma migração já publicada: acrescente outra com o próximo número.
+    MIGRACOES = [
+        (1, "tabelas base e colunas de lote/confirmação", "_migracao_1_esquema_base"),
+        (2, "scheduled_ts (epoch) e índices por status/data", "_migracao_2_epoch_e_indices"),
+        (3, "registro de alterações do histórico (revisões)", "_migracao_3_registro_alteracoes"),
+    ]
+
     def _init_db(self):
-        """Cria tabela se não existir"""
+        """Cria/atualiza o esquema aplicando as migrações pendentes."""
         conn = self._get_conn()
-        cur = conn.cursor()
+        try:
+            self._migrar(conn)
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            self._liberar(conn)
+
+        print(f"✓ Database inicializado: {self.db_path} (durabilidade: {self.durabilidade})")
 
+    def _migrar(self, conn):
+        """
+        Aplica cada migração com número maior que o user_version, uma transação por
+        migração. BEGIN IMMEDIATE serializa GUI e executor abrindo o banco juntos:
+        quem chega depois espera e relê a versão.
+        """
+        for numero, descricao, metodo in self.MIGRACOES:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                versao = conn.execute("PRAGMA user_version").fetchone()[0]
+                if versao >= numero:
+                    conn.rollback()
+                    continue
+                getattr(self, metodo)(conn.cursor())
+                conn.execute(f"PRAGMA user_version = {int(numero)}")
+                conn.commit()
+                print(f"[DB] Migração {numero} aplicada: {descricao}")
+            except Exception:
+                conn.rollback()
+                raise
+
+    def _migracao_1_esquema_base(self, cur):
+        """Esquema anterior ao controle de versão (idempotente: bancos antigos já têm parte dele)."""
         cur.execute("""
         CREATE TABLE IF NOT EXISTS agendamentos (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -99,10 +234,99 @@ class SchedulerDB:
         )
         """)
 
-        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
-        conn.close()
+        # Índice de contatos: target usado no envio -> conversa resolvida
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS contatos (
+            target TEXT PRIMARY KEY,
+            numero TEXT,
+            jid TEXT,
+            nome_exibicao TEXT,
+            verificado_em TEXT NOT NULL
+        )
+        """)
+
+        # Linha do tempo por fase de cada execução (core/linha_do_tempo.py)
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS tempos_fases (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id INTEGER NOT NULL,
+            item INTEGER,
+            fase TEXT NOT NULL,
+            inicio_ms INTEGER NOT NULL,
+            duracao_ms INTEGER NOT NULL,
+            ok INTEGER NOT NULL DEFAULT 1
+        )
+        """)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_tempos_fases_task ON tempos_fases(task_id)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_tempos_fases_inicio ON tempos_fases(inicio_ms)")
+
+        # Colunas acrescentadas antes das migrações numeradas
+        cur.execute("PRAGMA table_info(agendamentos)")
+        existentes = {row[1] for row in cur.fetchall()}
+        novas = {
+            "jobs_json": "TEXT",
+            "resultado_json": "TEXT",
+            "envio_status": "TEXT",
+            "envio_latencia_ms": "INTEGER",
+        }
+        for coluna, tipo in novas.items():
+            if coluna not in existentes:
+                cur.execute(f"ALTER TABLE agendamentos ADD COLUMN {coluna} {tipo}")
+
+    def _migracao_2_epoch_e_indices(self, cur):
+        """
+        scheduled_ts: scheduled_time em segundos epoch (INTEGER), para ordenar e
+        filtrar por data sem comparar textos ISO. Índices para listar_pendentes
+        (status + data), listar_todos (data) e contar_por_status.
+        """
+        cur.execute("ALTER TABLE agendamentos ADD COLUMN scheduled_ts INTEGER")
+        linhas = cur.execute("SELECT id, scheduled_time FROM agendamentos").fetchall()
+        cur.executemany(
+            "UPDATE agendamentos SET scheduled_ts = ? WHERE id = ?",
+            [(self._epoch(texto), task_id) for task_id, texto in linhas]
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_agendamentos_status_ts ON agendamentos(status, scheduled_ts)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_agendamentos_ts ON agendamentos(scheduled_ts)")
 
-        print(f"✓ Database inicializado: {self.db_path}")
+    def _migracao_3_registro_alteracoes(self, cur):
+        """
+        alteracoes_agendamentos: uma linha por agendamento com a revisão da sua
+        última alteração, mantida por triggers (valem para qualquer processo que
+        grave no banco). Exclusões ficam como excluido=1. Só as colunas exibidas
+        no histórico (as de listar_todos) geram revisão nova.
+        """
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS alteracoes_agendamentos (
+            revisao INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id INTEGER NOT NULL UNIQUE,
+            excluido INTEGER NOT NULL DEFAULT 0
+        )
+        """)
+        # DELETE + INSERT em vez de INSERT OR REPLACE: o ON CONFLICT do comando
+        # externo (ex.: INSERT OR IGNORE) substituiria o do trigger
+        eventos = {
+            "insercao": ("AFTER INSERT", "NEW", 0),
+            "alteracao": ("AFTER UPDATE OF task_name, target, mode, scheduled_time, scheduled_ts, status, created_at", "NEW", 0),
+            "exclusao": ("AFTER DELETE", "OLD", 1),
+        }
+        for nome, (quando, linha, excluido) in eventos.items():
+            cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_agendamentos_{nome} {quando} ON agendamentos
+            BEGIN
+                DELETE FROM alteracoes_agendamentos WHERE task_id = {linha}.id;
+                INSERT INTO alteracoes_agendamentos (task_id, excluido) VALUES ({linha}.id, {excluido});
+            END
+            """)
+
+    @staticmethod
+    def _epoch(valor) -> Optional[int]:
+        """datetime ou texto ISO -> segundos epoch (None se não der para interpretar)."""
+        try:
+            if isinstance(valor, str):
+                valor = datetime.datetime.fromisoformat(valor)
+            return int(valor.timestamp())
+        except (TypeError, ValueError, OverflowError, OSError):
+            return None
 
     # =============================
     # CREATE
@@ -115,11 +339,16 @@ class SchedulerDB:
         scheduled_time: datetime.datetime,
         message: Optional[str] = None,
         file_path: Optional[str] = None,
-        json_path: Optional[str] = None
+        json_path: Optional[str] = None,
+        jobs: Optional[List[dict]] = None
     ) -> int:
         """
         Adiciona novo agendamento.
 
+        Args:
+            jobs: Lista de envios {'target', 'mode', 'message', 'file_path'}
+                  quando a tarefa é um lote (target/mode viram um resumo)
+
         Returns:
             int: ID do agendamento criado, ou -1 se task_name já existe
         """
@@ -130,9 +359,9 @@ class SchedulerDB:
             cur.execute("""
                 INSERT INTO agendamentos (
                     task_name, target, mode, message, file_path,
-                    scheduled_time, created_at, json_path, status
+                    scheduled_time, scheduled_ts, created_at, json_path, jobs_json, status
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'pending')
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'pending')
             """, (
                 task_name,
                 target,
@@ -140,8 +369,10 @@ class SchedulerDB:
                 message,
                 file_path,
                 scheduled_time.isoformat(),
+                self._epoch(scheduled_time),
                 datetime.datetime.now().isoformat(),
-                json_path
+                json_path,
+                json.dumps(jobs, ensure_ascii=False) if jobs is not None else None
             ))
 
             conn.commit()
@@ -156,7 +387,102 @@ class SchedulerDB:
             return -1
 
         finally:
-            conn.close()
+            self._liberar(conn)
+
+    # Máximo de parâmetros por IN (...) (SQLite antigo aceita 999 por comando)
+    _LOTE_IN = 500
+
+    def adicionar_em_lote(self, agendamentos: List[dict]) -> Tuple[List[int], List[dict]]:
+        """
+        Adiciona vários agendamentos numa única transação (executemany), com um
+        commit e uma sincronização no fim, em vez de uma por linha.
+
+        Linha com conflito (task_name repetido, mode inválido, campo obrigatório
+        vazio) é pulada e informada; as demais são gravadas normalmente. Com
+        task_name repetido no lote, vale a primeira ocorrência válida.
+
+        Args:
+            agendamentos: dicts com os mesmos campos de adicionar()
+                (task_name, target, mode, scheduled_time, message, file_path, json_path, jobs)
+
+        Returns:
+            (ids, conflitos): ids na ordem da entrada (-1 nas linhas não gravadas);
+            conflitos = [{'indice', 'task_name', 'erro'}]
+        """
+        agora = datetime.datetime.now().isoformat()
+        parametros, indices, conflitos, nomes_no_lote = [], [], [], set()
+        for i, a in enumerate(agendamentos):
+            try:
+                jobs = a.get("jobs")
+                linha = (
+                    a["task_name"], a["target"], a["mode"], a.get("message"), a.get("file_path"),
+                    a["scheduled_time"].isoformat(), self._epoch(a["scheduled_time"]), agora,
+                    a.get("json_path"), json.dumps(jobs, ensure_ascii=False) if jobs is not None else None
+                )
+            except (KeyError, AttributeError, TypeError) as e:
+                conflitos.append({"indice": i, "task_name": a.get("task_name") if isinstance(a, dict) else None,
+                                  "erro": f"dados inválidos: {e!r}"})
+                continue
+            # Conferido antes do INSERT: assim cada task_name aparece uma vez só no
+            # executemany e o id gravado pode ser achado pelo nome sem ambiguidade
+            if linha[0] is None or linha[1] is None or linha[2] not in self.MODOS_VALIDOS:
+                erro = "restrição violada (mode inválido ou campo obrigatório vazio)"
+            elif linha[0] in nomes_no_lote:
+                erro = "task_name repetido no lote"
+            else:
+                nomes_no_lote.add(linha[0])
+                parametros.append(linha)
+                indices.append(i)
+                continue
+            conflitos.append({"indice": i, "task_name": linha[0], "erro": erro})
+
+        ids = [-1] * len(agendamentos)
+        conn = self._get_conn()
+        try:
+            # IMMEDIATE: ninguém mais grava até o commit, então as linhas novas
+            # são exatamente as de id acima do maior id atual (AUTOINCREMENT)
+            conn.execute("BEGIN IMMEDIATE")
+            ultimo_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM agendamentos").fetchone()[0]
+            # OR IGNORE: task_name que já existia no banco pula só aquela linha
+            conn.executemany("""
+                INSERT OR IGNORE INTO agendamentos (
+                    task_name, target, mode, message, file_path,
+                    scheduled_time, scheduled_ts, created_at, json_path, jobs_json, status
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'pending')
+            """, parametros)
+            criados = dict(
+                (nome, task_id) for task_id, nome in
+                conn.execute("SELECT id, task_name FROM agendamentos WHERE id > ?", (ultimo_id,))
+            )
+
+            rejeitados = []
+            for i, p in zip(indices, parametros):
+                if p[0] in criados:
+                    ids[i] = criados[p[0]]
+                else:
+                    rejeitados.append((i, p[0]))
+
+            # Motivo de cada rejeição (consulta só sobre as rejeitadas, em geral poucas)
+            ja_existiam = set()
+            nomes = [n for _, n in rejeitados]
+            for inicio in range(0, len(nomes), self._LOTE_IN):
+                bloco = nomes[inicio:inicio + self._LOTE_IN]
+                ja_existiam.update(r[0] for r in conn.execute(
+                    f"SELECT task_name FROM agendamentos WHERE task_name IN ({', '.join('?' * len(bloco))})", bloco
+                ))
+            for i, nome in rejeitados:
+                erro = "task_name já existe" if nome in ja_existiam else "restrição violada"
+                conflitos.append({"indice": i, "task_name": nome, "erro": erro})
+
+            conn.commit()
+            self._force_sync(conn)
+        finally:
+            self._liberar(conn)
+
+        conflitos.sort(key=lambda c: c["indice"])
+        print(f"✓ Agendamentos criados em lote: {len(agendamentos) - len(conflitos)} ({len(conflitos)} conflito(s))")
+        return ids, conflitos
 
     # =============================
     # READ
@@ -166,7 +492,8 @@ class SchedulerDB:
         Lista TODOS os agendamentos (qualquer status).
 
         Returns:
-            List[Tuple]: Lista de tuplas com dados resumidos
+            List[Tuple]: Lista de tuplas com dados resumidos; o último campo
+            (total_envios) é o número de envios de uma tarefa em LOTE, None no envio único
         """
         conn = self._get_conn()
         cur = conn.cursor()
@@ -174,16 +501,140 @@ class SchedulerDB:
         cur.execute("""
             SELECT 
                 id, task_name, target, mode, 
-                scheduled_time, status, created_at
+                scheduled_time, status, created_at, json_array_length(jobs_json)
             FROM agendamentos
-            ORDER BY scheduled_time DESC
+            ORDER BY scheduled_ts DESC
         """)
 
         rows = cur.fetchall()
-        conn.close()
+        self._liberar(conn)
 
         return rows
 
+    def listar_pagina(
+        self,
+        limite: int = 50,
+        cursor: Optional[Tuple[Optional[int], int]] = None,
+        status: Optional[Union[str, List[str]]] = None,
+        desde: Optional[datetime.datetime] = None,
+        ate: Optional[datetime.datetime] = None
+    ) -> Tuple[List[Tuple], Optional[Tuple[Optional[int], int]]]:
+        """
+        Uma página do histórico, mais recentes primeiro (paginação por chave).
+
+        Em vez de OFFSET, continua depois da chave (scheduled_ts, id) da última
+        linha da página anterior: cada página custa o mesmo que a primeira
+        (idx_agendamentos_ts / idx_agendamentos_status_ts, o id vem junto no
+        índice) e inserções/exclusões no meio não repetem nem pulam linhas.
+
+        Args:
+            limite: Linhas por página
+            cursor: Chave devolvida pela página anterior (None = primeira página)
+            status: Um status ou lista de status (None = todos)
+            desde: Só agendamentos a partir desta data (inclusive)
+            ate: Só agendamentos antes desta data (exclusive)
+
+        Returns:
+            (linhas, proximo_cursor): linhas no formato de listar_todos;
+            proximo_cursor é None na última página
+        """
+        filtros, params = [], []
+        if isinstance(status, str):
+            filtros.append("status = ?")
+            params.append(status)
+        elif status:
+            filtros.append(f"status IN ({', '.join('?' * len(status))})")
+            params.extend(status)
+        if desde is not None:
+            filtros.append("scheduled_ts >= ?")
+            params.append(self._epoch(desde))
+        if ate is not None:
+            filtros.append("scheduled_ts < ?")
+            params.append(self._epoch(ate))
+
+        # Cada parte vira uma busca no índice a partir do cursor. scheduled_ts NULL
+        # (data ilegível em bancos antigos) ordena por último e tem parte própria:
+        # um "OR scheduled_ts IS NULL" faria o SQLite varrer o índice desde o início.
+        if cursor is None:
+            partes = [(filtros, params)]
+        elif cursor[0] is None:
+            partes = [(filtros + ["scheduled_ts IS NULL", "id < ?"], params + [cursor[1]])]
+        else:
+            partes = [
+                (filtros + ["(scheduled_ts, id) < (?, ?)"], params + list(cursor)),
+                (filtros + ["scheduled_ts IS NULL"], params),
+            ]
+        selects, valores = [], []
+        for condicoes, p in partes:
+            where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+            selects.append(f"""
+                SELECT
+                    id, task_name, target, mode,
+                    scheduled_time, status, created_at, json_array_length(jobs_json), scheduled_ts
+                FROM agendamentos
+                {where}""")
+            valores.extend(p)
+
+        conn = self._get_conn()
+        try:
+            # Uma linha a mais só para saber se existe próxima página
+            rows = conn.execute(
+                f"{' UNION ALL '.join(selects)} ORDER BY scheduled_ts DESC, id DESC LIMIT ?",
+                (*valores, int(limite) + 1)
+            ).fetchall()
+        finally:
+            self._liberar(conn)
+
+        proximo = None
+        if len(rows) > limite:
+            rows = rows[:limite]
+            proximo = (rows[-1][8], rows[-1][0])
+        return [row[:8] for row in rows], proximo
+
+    def revisao_atual(self) -> int:
+        """
+        Revisão mais recente do histórico (0 = nada alterado desde a migração 3).
+        Consulta de uma linha pelo índice: comparar com a última revisão vista
+        diz se algo mudou sem reler os agendamentos.
+        """
+        conn = self._get_conn()
+        try:
+            return conn.execute("SELECT COALESCE(MAX(revisao), 0) FROM alteracoes_agendamentos").fetchone()[0]
+        finally:
+            self._liberar(conn)
+
+    def alteracoes_desde(self, revisao: int) -> Tuple[int, List[Tuple], List[int]]:
+        """
+        Agendamentos alterados depois da revisão informada (uma consulta só, então
+        linhas e nova revisão vêm do mesmo instante).
+
+        Returns:
+            (nova_revisao, linhas, ids_excluidos): linhas no formato de listar_todos;
+            nova_revisao é a que deve ser passada na próxima chamada
+        """
+        conn = self._get_conn()
+        try:
+            registros = conn.execute("""
+                SELECT
+                    a.revisao, a.task_id, a.excluido,
+                    g.id, g.task_name, g.target, g.mode,
+                    g.scheduled_time, g.status, g.created_at, json_array_length(g.jobs_json)
+                FROM alteracoes_agendamentos a
+                LEFT JOIN agendamentos g ON g.id = a.task_id
+                WHERE a.revisao > ?
+                ORDER BY a.revisao
+            """, (revisao,)).fetchall()
+        finally:
+            self._liberar(conn)
+
+        linhas, excluidos = [], []
+        for r in registros:
+            if r[2] or r[3] is None:
+                excluidos.append(r[1])
+            else:
+                linhas.append(r[3:])
+        return (registros[-1][0] if registros else revisao), linhas, excluidos
+
     def listar_pendentes(self) -> List[Tuple]:
         """
         Lista apenas agendamentos PENDENTES.
@@ -200,11 +651,11 @@ class SchedulerDB:
                 file_path, scheduled_time, json_path
             FROM agendamentos
             WHERE status = 'pending'
-            ORDER BY scheduled_time ASC
+            ORDER BY scheduled_ts ASC
         """)
 
         rows = cur.fetchall()
-        conn.close()
+        self._liberar(conn)
 
         return rows
 
@@ -219,7 +670,7 @@ class SchedulerDB:
             row = cur.fetchone()
             return dict(row) if row else None
         finally:
-            conn.close()
+            self._liberar(conn)
 
     def atualizar_agendamento_completo(self, task_id, target, mode, message, file_path, scheduled_time):
         """Método para permitir a edição de um agendamento existente"""
@@ -228,9 +679,11 @@ class SchedulerDB:
         try:
             cur.execute("""
                 UPDATE agendamentos 
-                SET target = ?, mode = ?, message = ?, file_path = ?, scheduled_time = ?, status = 'pending'
+                SET target = ?, mode = ?, message = ?, file_path = ?,
+                    scheduled_time = ?, scheduled_ts = ?, status = 'pending',
+                    resultado_json = NULL
                 WHERE id = ?
-            """, (target, mode, message, file_path, scheduled_time.isoformat(), task_id))
+            """, (target, mode, message, file_path, scheduled_time.isoformat(), self._epoch(scheduled_time), task_id))
             conn.commit()
             conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
             return True
@@ -238,7 +691,19 @@ class SchedulerDB:
             print(f"Erro ao editar DB: {e}")
             return False
         finally:
-            conn.close()
+            self._liberar(conn)
+
+    def obter_jobs(self, task_id: int) -> Optional[List[dict]]:
+        """Lista de envios de uma tarefa em LOTE (jobs_json), ou None se for envio único."""
+        conn = self._get_conn()
+        try:
+            row = conn.execute("SELECT jobs_json FROM agendamentos WHERE id = ?", (int(task_id),)).fetchone()
+        finally:
+            self._liberar(conn)
+        if not row or row[0] is None:
+            return None
+        jobs = json.loads(row[0])
+        return jobs if isinstance(jobs, list) else None
 
     def obter_detalhes(self, identificador) -> Optional[dict]:
         """
@@ -262,7 +727,7 @@ class SchedulerDB:
                 "SELECT * FROM agendamentos WHERE task_name = ?", (identificador,))
 
         row = cur.fetchone()
-        conn.close()
+        self._liberar(conn)
 
         return dict(row) if row else None
 
@@ -317,10 +782,14 @@ class SchedulerDB:
         # ✅ Commit e sincronização
         conn.commit()
         self._force_sync(conn)
-        conn.close()
+        self._liberar(conn)
+
+        if not self._perfil["verificar_escrita"]:
+            print(f"✓ Status atualizado: {identificador} → {status}")
+            return
 
         # ===== VERIFICAÇÃO PÓS-SYNC =====
-        # Re-abre conexão para verificar se realmente salvou
+        # Relê o registro para confirmar que o commit foi gravado
         conn_verify = self._get_conn()
         cur_verify = conn_verify.cursor()
         
@@ -330,7 +799,7 @@ class SchedulerDB:
             cur_verify.execute("SELECT status FROM agendamentos WHERE task_name = ?", (identificador,))
         
         row = cur_verify.fetchone()
-        conn_verify.close()
+        self._liberar(conn_verify)
         
         if row:
             status_verificado = row[0]
@@ -343,6 +812,126 @@ class SchedulerDB:
 
         print(f"✓ Status atualizado: {identificador} → {status}")
 
+    def atualizar_status_em_lote(self, atualizacoes: List[tuple]) -> Tuple[List[int], List[dict]]:
+        """
+        Atualiza o status de vários agendamentos numa única transação (executemany).
+
+        Cada linha com conflito (status inválido, agendamento inexistente) é pulada
+        e informada; as demais são gravadas na ordem da entrada, então se o mesmo
+        agendamento aparece mais de uma vez (por ID ou task_name), vale a última.
+
+        Args:
+            atualizacoes: tuplas (identificador, status) ou (identificador, status, error_message);
+                identificador = ID ou task_name, como em atualizar_status()
+
+        Returns:
+            (ids, conflitos): ID de cada linha na ordem da entrada (-1 nas não gravadas);
+            conflitos = [{'indice', 'identificador', 'erro'}]
+        """
+        agora = datetime.datetime.now().isoformat()
+        ids, conflitos, linhas, finais = [-1] * len(atualizacoes), [], [], {}
+
+        conn = self._get_conn()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # task_name -> id antes de gravar: todas as linhas vão por id, na ordem da entrada
+            atuais = self._status_atuais(conn, [a[0] for a in atualizacoes])
+            for i, (identificador, status, *resto) in enumerate(atualizacoes):
+                if identificador not in atuais:
+                    erro = "agendamento não encontrado"
+                elif status not in self.STATUS_VALIDOS:
+                    erro = f"status inválido: {status!r}"
+                else:
+                    ids[i] = atuais[identificador][0]
+                    linhas.append((status, agora, resto[0] if resto else None, ids[i]))
+                    finais[ids[i]] = status
+                    continue
+                conflitos.append({"indice": i, "identificador": identificador, "erro": erro})
+
+            conn.executemany("""
+                UPDATE agendamentos
+                SET status = ?, executed_at = ?, error_message = ?
+                WHERE id = ?
+            """, linhas)
+            conn.commit()
+            self._force_sync(conn)
+        finally:
+            self._liberar(conn)
+
+        if conflitos:
+            print(f"[DB] ⚠️ {len(conflitos)} atualização(ões) de status não gravada(s)")
+
+        if self._perfil["verificar_escrita"]:
+            # Relê o que foi gravado para confirmar o commit (como atualizar_status)
+            conn_verify = self._get_conn()
+            try:
+                gravados = self._status_atuais(conn_verify, list(finais))
+            finally:
+                self._liberar(conn_verify)
+            divergentes = [t for t, status in finais.items() if gravados.get(t, (t, None))[1] != status]
+            if not divergentes:
+                print(f"[DB] ✓✓ VERIFICAÇÃO OK: {len(finais)} status confirmado(s)")
+            else:
+                print(f"[DB] ❌ ERRO: {len(divergentes)} status divergente(s) após o commit")
+
+        print(f"✓ Status atualizados em lote: {len(atualizacoes) - len(conflitos)} ({len(conflitos)} conflito(s))")
+        return ids, conflitos
+
+    def _status_atuais(self, conn, identificadores) -> dict:
+        """{identificador: (id, status)} para IDs e task_names, consultando em blocos."""
+        atuais = {}
+        for coluna, valores in (
+            ("id", list({i for i in identificadores if isinstance(i, int)})),
+            ("task_name", list({i for i in identificadores if not isinstance(i, int)})),
+        ):
+            for inicio in range(0, len(valores), self._LOTE_IN):
+                bloco = valores[inicio:inicio + self._LOTE_IN]
+                for task_id, nome, status in conn.execute(
+                    f"SELECT id, task_name, status FROM agendamentos WHERE {coluna} IN ({', '.join('?' * len(bloco))})",
+                    bloco
+                ):
+                    atuais[task_id if coluna == "id" else nome] = (task_id, status)
+        return atuais
+
+    def registrar_resultado_lote(self, task_id: int, resultados: List[dict]):
+        """Grava o resultado por item de uma tarefa em lote."""
+        conn = self._get_conn()
+        try:
+            conn.execute(
+                "UPDATE agendamentos SET resultado_json = ? WHERE id = ?",
+                (json.dumps(resultados, ensure_ascii=False), task_id)
+            )
+            conn.commit()
+            self._force_sync(conn)
+        finally:
+            self._liberar(conn)
+
+    def obter_resultado_lote(self, task_id: int) -> List[dict]:
+        """Resultado por item gravado pela última execução da tarefa ([] se não houver)."""
+        conn = self._get_conn()
+        try:
+            row = conn.execute("SELECT resultado_json FROM agendamentos WHERE id = ?", (task_id,)).fetchone()
+        finally:
+            self._liberar(conn)
+        try:
+            resultados = json.loads(row[0]) if row and row[0] else []
+        except ValueError:
+            return []
+        return resultados if isinstance(resultados, list) else []
+
+    def registrar_confirmacao(self, task_id: int, status: Optional[str], latencia_s: Optional[float]):
+        """Grava o status confirmado do envio e a latência até a confirmação."""
+        conn = self._get_conn()
+        try:
+            conn.execute(
+                "UPDATE agendamentos SET envio_status = ?, envio_latencia_ms = ? WHERE id = ?",
+                (status, int(latencia_s * 1000) if latencia_s is not None else None, task_id)
+            )
+            conn.commit()
+            self._force_sync(conn)
+        finally:
+            self._liberar(conn)
+
     # =============================
     # DELETE
     # =============================
@@ -365,7 +954,7 @@ class SchedulerDB:
 
         conn.commit()
         self._force_sync(conn)
-        conn.close()
+        self._liberar(conn)
 
         print(f"✓ Agendamento deletado: {identificador}")
 
@@ -393,10 +982,143 @@ class SchedulerDB:
         """)
 
         rows = cur.fetchall()
-        conn.close()
+        self._liberar(conn)
 
         return {status: count for status, count in rows}
 
+    # =============================
+    # LINHA DO TEMPO POR FASE
+    # =============================
+    def registrar_fases(self, task_id: int, fases: List[dict]):
+        """Grava as fases de uma execução (ver core/linha_do_tempo.py)."""
+        if not fases:
+            return
+        conn = self._get_conn()
+        try:
+            conn.executemany("""
+                INSERT INTO tempos_fases (task_id, item, fase, inicio_ms, duracao_ms, ok)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [
+                (task_id, f.get("item"), f["fase"], f["inicio_ms"], f["duracao_ms"], 1 if f.get("ok", True) else 0)
+                for f in fases
+            ])
+            conn.commit()
+            self._force_sync(conn)
+        finally:
+            self._liberar(conn)
+
+    def listar_tempos_fases(self, desde_ms: Optional[int] = None, ate_ms: Optional[int] = None) -> List[Tuple]:
+        """
+        Fases registradas com início no intervalo [desde_ms, ate_ms) (epoch ms; None = sem limite).
+
+        Returns:
+            List[Tuple]: (fase, duracao_ms, ok)
+        """
+        conn = self._get_conn()
+        try:
+            return conn.execute("""
+                SELECT fase, duracao_ms, ok
+                FROM tempos_fases
+                WHERE (? IS NULL OR inicio_ms >= ?) AND (? IS NULL OR inicio_ms < ?)
+            """, (desde_ms, desde_ms, ate_ms, ate_ms)).fetchall()
+        finally:
+            self._liberar(conn)
+
+    def obter_fases(self, task_id: int) -> List[Tuple]:
+        """Linha do tempo de uma tarefa: (item, fase, inicio_ms, duracao_ms, ok) em ordem de início."""
+        conn = self._get_conn()
+        try:
+            return conn.execute("""
+                SELECT item, fase, inicio_ms, duracao_ms, ok
+                FROM tempos_fases
+                WHERE task_id = ?
+                ORDER BY inicio_ms, id
+            """, (task_id,)).fetchall()
+        finally:
+            self._liberar(conn)
+
+    # =============================
+    # ÍNDICE DE CONTATOS
+    # =============================
+    @staticmethod
+    def _chave_contato(target: str) -> str:
+        return (target or "").strip().lower()
+
+    def obter_contato(self, target: str) -> Optional[dict]:
+        """
+        Busca a conversa já resolvida para um target.
+
+        Returns:
+            dict {'target', 'numero', 'jid', 'nome_exibicao', 'verificado_em'} ou None
+        """
+        conn = self._get_conn()
+        conn.row_factory = sqlite3.Row
+        try:
+            row = conn.execute(
+                "SELECT * FROM contatos WHERE target = ?", (self._chave_contato(target),)
+            ).fetchone()
+            return dict(row) if row else None
+        finally:
+            self._liberar(conn)
+
+    def salvar_contato(
+        self,
+        target: str,
+        numero: Optional[str] = None,
+        jid: Optional[str] = None,
+        nome_exibicao: Optional[str] = None
+    ):
+        """Cria/atualiza a entrada do target e marca como verificada agora."""
+        conn = self._get_conn()
+        try:
+            conn.execute("""
+                INSERT INTO contatos (target, numero, jid, nome_exibicao, verificado_em)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(target) DO UPDATE SET
+                    numero = COALESCE(excluded.numero, contatos.numero),
+                    jid = COALESCE(excluded.jid, contatos.jid),
+                    nome_exibicao = COALESCE(excluded.nome_exibicao, contatos.nome_exibicao),
+                    verificado_em = excluded.verificado_em
+            """, (
+                self._chave_contato(target), numero, jid, nome_exibicao,
+                datetime.datetime.now().isoformat()
+            ))
+            conn.commit()
+        finally:
+            self._liberar(conn)
+
+    def invalidar_contato(self, target: str):
+        """Remove a entrada (ex.: o número salvo não abriu mais a conversa)."""
+        conn = self._get_conn()
+        try:
+            conn.execute("DELETE FROM contatos WHERE target = ?", (self._chave_contato(target),))
+            conn.commit()
+        finally:
+            self._liberar(conn)
+
+    def buscar_contatos(self, prefixo: str, limite: int = 5) -> List[Tuple]:
+        """
+        Sugestões para autocompletar: targets ou nomes que começam com o prefixo.
+
+        Returns:
+            List[Tuple]: (target, nome_exibicao, numero), mais recentes primeiro
+        """
+        chave = self._chave_contato(prefixo)
+        if not chave:
+            return []
+        padrao = chave.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        conn = self._get_conn()
+        try:
+            return conn.execute("""
+                SELECT target, nome_exibicao, numero
+                FROM contatos
+                WHERE target LIKE ? ESCAPE '\\' OR lower(nome_exibicao) LIKE ? ESCAPE '\\'
+                ORDER BY verificado_em DESC
+                LIMIT ?
+            """, (padrao, padrao, limite)).fetchall()
+        finally:
+            self._liberar(conn)
+
 
 # =============================
 # INSTÂNCIA GLOBAL
@@ -408,10 +1130,9 @@ _db_instance = None
 
 
 def get_db():
+    """Instância única do banco, aberta no primeiro uso (não na importação do módulo)."""
     global _db_instance
     if _db_instance is None:
         _db_instance = SchedulerDB()
     return _db_instance
 
-
-db = get_db()
@@ -0,0 +1,192 @@
+"""
+FILTRO DE REDE (OPCIONAL) PARA AS SESSÕES DE AUTOMAÇÃO
+
+Bloqueia no contexto do navegador o que um envio automático não usa:
+fotos de perfil, miniaturas, figurinhas, mídias recebidas e fontes.
+O que o fluxo de envio precisa passa sempre: documento, scripts, CSS,
+websocket, XHR/fetch do app e qualquer requisição que não seja GET
+(o upload de anexos é POST).
+
+Ativação em user_data/config.json:
+    "filtro_rede": true
+ou, com ajustes:
+    "filtro_rede": {
+        "modo": "bloquear",            # "bloquear" ou "medir" (só observa e aprende tamanhos)
+        "tipos": ["image", "media", "font"],
+        "padroes": ["^https://pps\\\\.whatsapp\\\\.net/"]
+    }
+
+Ao fechar o contexto, o resumo da sessão (requisições e bytes evitados) vai
+para o log e é acumulado em user_data/filtro_rede.json. Os bytes evitados são
+ESTIMADOS pelo tamanho médio de cada tipo, aprendido no modo "medir".
+"""
+
+import os
+import re
+import json
+import time
+from core.config import get_config
+from core.paths import get_user_data_dir
+
+STATS_FILE = os.path.join(get_user_data_dir(), "filtro_rede.json")
+
+# Tipos de recurso do Playwright bloqueados por padrão
+TIPOS_BLOQUEADOS = ["image", "media", "font"]
+
+# URLs bloqueadas (só GET): fotos de perfil e download de mídias recebidas
+PADROES_BLOQUEADOS = [
+    r"^https://pps\.whatsapp\.net/",
+    r"^https://[^/]*\.whatsapp\.net/v/t\d+",
+]
+
+# Nunca bloqueados, mesmo se algum padrão casar
+TIPOS_ESSENCIAIS = {"document", "script", "stylesheet", "websocket"}
+
+# Tamanho médio (bytes) usado na estimativa enquanto o modo "medir" não rodou
+TAMANHO_MEDIO_PADRAO = {"image": 12000, "media": 250000, "font": 40000, "fetch": 30000, "xhr": 30000}
+
+# GIF transparente 1x1: a imagem "carrega" e o app não fica tentando de novo
+GIF_VAZIO = bytes.fromhex("47494638396101000100800000000000ffffff21f90401000000002c00000000010001000002024401003b")
+
+def _ler_stats():
+    if not os.path.exists(STATS_FILE):
+        return {}
+    try:
+        with open(STATS_FILE, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+        return dados if isinstance(dados, dict) else {}
+    except Exception:
+        return {}
+
+def _gravar_stats(dados):
+    tmp = f"{STATS_FILE}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, STATS_FILE)
+    except Exception as e:
+        print(f"[FILTRO] Aviso: não foi possível salvar as estatísticas: {e}")
+
+def carregar_politica():
+    """
+    Lê a política do config.json.
+
+    Returns:
+        dict {'modo', 'tipos', 'padroes'} ou None se o filtro estiver desligado
+    """
+    bruto = get_config("filtro_rede", False)
+    if not bruto:
+        return None
+    politica = bruto if isinstance(bruto, dict) else {}
+    return {
+        "modo": politica.get("modo", "bloquear"),
+        "tipos": set(politica.get("tipos", TIPOS_BLOQUEADOS)),
+        "padroes": [re.compile(p) for p in politica.get("padroes", PADROES_BLOQUEADOS)],
+    }
+
+class FiltroRede:
+    """Intercepta as requisições de um contexto e contabiliza o que foi evitado."""
+
+    def __init__(self, politica, logger=None):
+        self.politica = politica
+        self.logger = logger
+        self.bloqueadas = {}       # tipo -> quantidade
+        self.permitidas = 0
+        self.medidos = {}          # tipo -> [bytes, quantidade] (modo "medir")
+        self.inicio = time.monotonic()
+        self.medias = _ler_stats().get("tamanho_medio", {})
+
+    def deve_bloquear(self, request):
+        tipo = request.resource_type
+        if tipo in TIPOS_ESSENCIAIS or request.method != "GET":
+            return False
+        if tipo in self.politica["tipos"]:
+            return True
+        return any(p.search(request.url) for p in self.politica["padroes"])
+
+    async def _interceptar(self, route):
+        request = route.request
+        if not self.deve_bloquear(request):
+            self.permitidas += 1
+            await route.continue_()
+            return
+        tipo = request.resource_type
+        self.bloqueadas[tipo] = self.bloqueadas.get(tipo, 0) + 1
+        if tipo == "image":
+            await route.fulfill(status=200, content_type="image/gif", body=GIF_VAZIO)
+        else:
+            await route.abort("blockedbyclient")
+
+    def _medir(self, response):
+        """Modo "medir": guarda o tamanho do que SERIA bloqueado para estimar a economia."""
+        try:
+            if not self.deve_bloquear(response.request):
+                return
+            tamanho = int(response.headers.get("content-length") or 0)
+        except Exception:
+            return
+        if tamanho > 0:
+            m = self.medidos.setdefault(response.request.resource_type, [0, 0])
+            m[0] += tamanho
+            m[1] += 1
+
+    async def instalar(self, context):
+        if self.politica["modo"] == "medir":
+            context.on("response", self._medir)
+            _log(self.logger, "🌐 Filtro de rede em modo MEDIR (nada é bloqueado).")
+        else:
+            await context.route("**/*", self._interceptar)
+            _log(self.logger, f"🌐 Filtro de rede ativo: tipos {sorted(self.politica['tipos'])}, {len(self.politica['padroes'])} padrão(ões) de URL.")
+        context.on("close", lambda _: self.finalizar())
+
+    def bytes_evitados(self):
+        """Estimativa: quantidade bloqueada x tamanho médio do tipo."""
+        total = 0
+        for tipo, n in self.bloqueadas.items():
+            total += n * self.medias.get(tipo, TAMANHO_MEDIO_PADRAO.get(tipo, 0))
+        return int(total)
+
+    def resumo(self):
+        return {
+            "requisicoes_bloqueadas": sum(self.bloqueadas.values()),
+            "por_tipo": dict(self.bloqueadas),
+            "requisicoes_permitidas": self.permitidas,
+            "bytes_evitados_estimados": self.bytes_evitados(),
+            "duracao_s": round(time.monotonic() - self.inicio, 1),
+        }
+
+    def finalizar(self):
+        """Loga o resumo da sessão e acumula em user_data/filtro_rede.json."""
+        dados = _ler_stats()
+        if self.medidos:
+            medias = dados.setdefault("tamanho_medio", {})
+            for tipo, (soma, n) in self.medidos.items():
+                medias[tipo] = int(soma / n)
+            _log(self.logger, f"🌐 Tamanhos médios medidos: {medias}")
+        if self.politica["modo"] != "medir":
+            r = self.resumo()
+            _log(self.logger, f"🌐 Filtro de rede: {r['requisicoes_bloqueadas']} requisição(ões) evitadas "
+                              f"(~{r['bytes_evitados_estimados'] / 1024:.0f} KB) | {r['por_tipo']}")
+            total = dados.setdefault("total", {"sessoes": 0, "requisicoes_bloqueadas": 0, "bytes_evitados_estimados": 0})
+            total["sessoes"] += 1
+            total["requisicoes_bloqueadas"] += r["requisicoes_bloqueadas"]
+            total["bytes_evitados_estimados"] += r["bytes_evitados_estimados"]
+            dados["ultima_sessao"] = r
+        _gravar_stats(dados)
+
+def _log(logger, msg):
+    from core.automation_base import _log as log_automacao
+    log_automacao(logger, msg)
+
+async def instalar_filtro(context, logger=None):
+    """Instala o filtro se estiver ativo no config.json. Retorna o FiltroRede ou None."""
+    politica = carregar_politica()
+    if not politica:
+        return None
+    filtro = FiltroRede(politica, logger)
+    try:
+        await filtro.instalar(context)
+    except Exception as e:
+        _log(logger, f"⚠️ Não foi possível instalar o filtro de rede: {e}")
+        return None
+    return filtro
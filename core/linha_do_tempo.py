@@ -0,0 +1,127 @@
+"""
+LINHA DO TEMPO POR FASE DE CADA TAREFA
+
+O executor abre uma linha do tempo por tarefa; o código da automação marca as
+fases com:
+
+    with linha_do_tempo.fase("abrir_conversa"):
+        ...
+
+Cada fase guarda início (epoch ms, comparável entre processos) e duração
+(relógio monotônico). As fases vividas em outros processos (pool de contas,
+serviço de sessão) voltam junto com o resultado e são incorporadas. No fim, o
+executor grava tudo na tabela tempos_fases (core/db.py).
+
+Relatório:
+    python app.py --relatorio-fases [--desde 2026-01-01] [--ate 2026-01-31]
+"""
+
+import time
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# contextvars: cada tarefa asyncio (uma por conta em paralelo) enxerga a mesma
+# linha do tempo do executor, e threads/processos sem linha ativa não gravam nada
+_atual = contextvars.ContextVar("linha_do_tempo", default=None)
+
+class LinhaDoTempo:
+    def __init__(self):
+        self.fases = []
+        self._inicio_epoch, self._inicio = time.time(), time.monotonic()
+
+    def encerrar(self, nome="total", ok=True):
+        """Registra uma fase do início da linha do tempo até agora (ex.: a tarefa inteira)."""
+        self.adicionar(nome, self._inicio_epoch, time.monotonic() - self._inicio, ok)
+
+    def adicionar(self, nome, inicio_epoch, duracao_s, ok=True, item=None):
+        self.fases.append({
+            "fase": nome,
+            "inicio_ms": int(inicio_epoch * 1000),
+            "duracao_ms": int(duracao_s * 1000),
+            "ok": bool(ok),
+            "item": item,
+        })
+
+    def incorporar(self, fases, item=None):
+        """Acrescenta fases medidas em outro processo (ex.: resultado do pool)."""
+        for f in fases or []:
+            self.fases.append({**f, "item": item if item is not None else f.get("item")})
+
+def iniciar():
+    """Abre uma linha do tempo nova e a torna a atual deste contexto."""
+    linha = LinhaDoTempo()
+    _atual.set(linha)
+    return linha
+
+def atual():
+    return _atual.get()
+
+@contextmanager
+def fase(nome):
+    """Mede o bloco como a fase 'nome' da linha do tempo atual (sem linha ativa: não faz nada)."""
+    linha = _atual.get()
+    inicio_epoch, inicio = time.time(), time.monotonic()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        if linha is not None:
+            linha.adicionar(nome, inicio_epoch, time.monotonic() - inicio, ok)
+
+def percentil(valores, p):
+    """Percentil p (0-100) pelo método do posto mais próximo. valores já ordenados."""
+    if not valores:
+        return None
+    posto = max(1, -(-len(valores) * p // 100))  # teto
+    return valores[int(posto) - 1]
+
+def relatorio(desde=None, ate=None, db=None):
+    """
+    Estatísticas por fase entre as datas (inclusivas, 'AAAA-MM-DD').
+
+    Returns:
+        list[dict]: {'fase', 'n', 'falhas', 'p50', 'p90', 'p99', 'max'} em ms, fases mais lentas (p90) primeiro
+    """
+    if db is None:
+        from core.db import get_db
+        db = get_db()
+    inicio = datetime.strptime(desde, "%Y-%m-%d") if desde else None
+    fim = datetime.strptime(ate, "%Y-%m-%d") + timedelta(days=1) if ate else None
+
+    por_fase = {}
+    for nome, duracao, ok in db.listar_tempos_fases(
+        int(inicio.timestamp() * 1000) if inicio else None,
+        int(fim.timestamp() * 1000) if fim else None
+    ):
+        d = por_fase.setdefault(nome, {"duracoes": [], "falhas": 0})
+        d["duracoes"].append(duracao)
+        d["falhas"] += 0 if ok else 1
+
+    linhas = []
+    for nome, d in por_fase.items():
+        valores = sorted(d["duracoes"])
+        linhas.append({
+            "fase": nome, "n": len(valores), "falhas": d["falhas"],
+            "p50": percentil(valores, 50), "p90": percentil(valores, 90),
+            "p99": percentil(valores, 99), "max": valores[-1],
+        })
+    return sorted(linhas, key=lambda l: -l["p90"])
+
+def main(desde=None, ate=None):
+    """Ponto de entrada do CLI: imprime a tabela de percentis por fase."""
+    try:
+        linhas = relatorio(desde, ate)
+    except ValueError as e:
+        print(f"❌ Data inválida (use AAAA-MM-DD): {e}")
+        return 1
+    periodo = f"{desde or 'início'} até {ate or 'hoje'}"
+    if not linhas:
+        print(f"Nenhuma fase registrada de {periodo}.")
+        return 0
+    print(f"Tempo por fase (ms) | {periodo}")
+    print(f"{'fase':<24}{'n':>7}{'falhas':>8}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}")
+    for l in linhas:
+        print(f"{l['fase']:<24}{l['n']:>7}{l['falhas']:>8}{l['p50']:>10}{l['p90']:>10}{l['p99']:>10}{l['max']:>10}")
+    return 0
@@ -0,0 +1,217 @@
+"""
+MANUTENÇÃO DO PERFIL DO WHATSAPP (perfil_bot_whatsapp)
+
+O perfil persistente do Chrome cresce sem limite (Cache, Code Cache, GPUCache,
+Cache Storage do service worker...) e a abertura do navegador fica mais lenta
+com o tempo. Aqui ficam o relatório de tamanhos e a limpeza das pastas que o
+Chrome recria sozinho.
+
+NUNCA apagados (sessão logada): Local Storage, IndexedDB (*.leveldb),
+Cookies, Preferences, Service Worker/Database e o restante do perfil.
+
+Uso:
+    python app.py --manutencao-perfil                        (relatório + limpeza)
+    python app.py --manutencao-perfil --somente-relatorio
+    python app.py --manutencao-perfil --medir-inicializacao  (mede antes/depois)
+    python app.py --agendar-manutencao 03:00                 (toda semana, domingo)
+"""
+
+import os
+import sys
+import shutil
+import time
+
+# Caches que o Chrome recria: apagar só custa um novo download/compilação
+CACHES_SEGUROS = [
+    os.path.join("Default", "Cache"),
+    os.path.join("Default", "Code Cache"),
+    os.path.join("Default", "GPUCache"),
+    os.path.join("Default", "DawnCache"),
+    os.path.join("Default", "DawnGraphiteCache"),
+    os.path.join("Default", "DawnWebGPUCache"),
+    os.path.join("Default", "Service Worker", "CacheStorage"),
+    os.path.join("Default", "Service Worker", "ScriptCache"),
+    os.path.join("Default", "blob_storage"),
+    "GrShaderCache",
+    "GraphiteDawnCache",
+    "ShaderCache",
+    "component_crx_cache",
+    os.path.join("Crashpad", "reports"),
+]
+
+# Mídias já recebidas guardadas no IndexedDB. O login fica no .leveldb (mantido),
+# mas o app pode precisar baixar de novo as mídias antigas: só com --agressivo.
+CACHES_AGRESSIVOS = [
+    os.path.join("Default", "IndexedDB", "https_web.whatsapp.com_0.indexeddb.blob"),
+]
+
+def _log(logger, msg):
+    from core.automation_base import _log as log_automacao
+    log_automacao(logger, msg)
+
+def tamanho_pasta(caminho):
+    """Soma (bytes) de todos os arquivos abaixo de caminho."""
+    total = 0
+    for raiz, _, arquivos in os.walk(caminho):
+        for a in arquivos:
+            try:
+                total += os.lstat(os.path.join(raiz, a)).st_size
+            except OSError:
+                pass
+    return total
+
+def formatar_tamanho(n):
+    for unidade in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unidade == "GB":
+            return f"{n:.0f} {unidade}" if unidade == "B" else f"{n:.1f} {unidade}"
+        n /= 1024
+
+def relatorio_perfil(perfil):
+    """
+    Tamanho de cada subpasta do perfil (1º nível e dentro de Default/).
+
+    Returns:
+        list[tuple]: (pasta relativa, bytes), maiores primeiro
+    """
+    linhas = []
+    for base in ("", "Default"):
+        pasta = os.path.join(perfil, base)
+        if not os.path.isdir(pasta):
+            continue
+        for nome in os.listdir(pasta):
+            caminho = os.path.join(pasta, nome)
+            if os.path.isdir(caminho) and not (base == "" and nome == "Default"):
+                linhas.append((os.path.join(base, nome), tamanho_pasta(caminho)))
+    return sorted(linhas, key=lambda l: -l[1])
+
+def perfil_em_uso(perfil):
+    """
+    True se algum Chrome está usando o perfil (limpar agora corromperia a sessão).
+    Windows: 'lockfile' fica preso pelo processo. Linux/macOS: link SingletonLock -> host-PID.
+    """
+    lockfile = os.path.join(perfil, "lockfile")
+    if os.path.exists(lockfile):
+        try:
+            os.remove(lockfile)  # órfão de um Chrome que já fechou
+        except OSError:
+            return True
+    singleton = os.path.join(perfil, "SingletonLock")
+    if sys.platform != "win32" and os.path.islink(singleton):
+        try:
+            pid = int(os.readlink(singleton).rsplit("-", 1)[1])
+            os.kill(pid, 0)
+            return True
+        except (ValueError, IndexError, ProcessLookupError):
+            return False
+        except OSError:
+            return True
+    return False
+
+def limpar_perfil(perfil, agressivo=False, logger=None):
+    """
+    Apaga os caches seguros do perfil.
+
+    Returns:
+        int: bytes liberados
+
+    Raises:
+        RuntimeError: perfil em uso por um navegador aberto
+    """
+    if perfil_em_uso(perfil):
+        raise RuntimeError("O perfil está em uso (navegador ou serviço de sessão aberto). Feche-o e tente de novo.")
+
+    liberado = 0
+    for relativo in CACHES_SEGUROS + (CACHES_AGRESSIVOS if agressivo else []):
+        caminho = os.path.join(perfil, relativo)
+        if not os.path.isdir(caminho):
+            continue
+        tamanho = tamanho_pasta(caminho)
+        shutil.rmtree(caminho, ignore_errors=True)
+        restante = tamanho_pasta(caminho) if os.path.exists(caminho) else 0
+        liberado += tamanho - restante
+        _log(logger, f"🧹 {relativo}: {formatar_tamanho(tamanho - restante)} liberados")
+    return liberado
+
+def medir_inicializacao(perfil, logger=None):
+    """
+    Abre o navegador no perfil (modo auto, fora da tela) e mede até o WhatsApp carregar.
+
+    Returns:
+        float: segundos, ou None se não carregou
+    """
+    import asyncio
+    from core import automation_async
+
+    async def medir():
+        inicio = time.monotonic()
+        pw, context = None, None
+        try:
+            pw, context, _ = await automation_async.iniciar_driver(perfil, 'auto', logger)
+            return time.monotonic() - inicio
+        except Exception as e:
+            _log(logger, f"⚠️ Medição de inicialização falhou: {e}")
+            return None
+        finally:
+            try:
+                if context: await automation_async.fechar_contexto(context)
+                if pw: await pw.stop()
+            except Exception:
+                pass
+
+    return asyncio.run(medir())
+
+def executar_manutencao(perfil, limpar=True, agressivo=False, medir=False, logger=None):
+    """
+    Relatório de tamanhos, limpeza opcional e medição antes/depois.
+
+    Returns:
+        dict {'antes', 'depois', 'liberado', 'inicio_antes_s', 'inicio_depois_s'}
+    """
+    resultado = {"inicio_antes_s": None, "inicio_depois_s": None, "liberado": 0}
+
+    _log(logger, f"📁 Perfil: {perfil}")
+    relatorio = relatorio_perfil(perfil)
+    resultado["antes"] = tamanho_pasta(perfil)
+    _log(logger, f"📊 Tamanho total: {formatar_tamanho(resultado['antes'])}")
+    for pasta, tamanho in relatorio[:25]:
+        marca = " (cache)" if pasta in CACHES_SEGUROS else ""
+        _log(logger, f"   {formatar_tamanho(tamanho):>10}  {pasta}{marca}")
+
+    if not limpar:
+        resultado["depois"] = resultado["antes"]
+        return resultado
+
+    if medir:
+        resultado["inicio_antes_s"] = medir_inicializacao(perfil, logger)
+
+    resultado["liberado"] = limpar_perfil(perfil, agressivo, logger)
+    resultado["depois"] = tamanho_pasta(perfil)
+    _log(logger, f"✓ Limpeza: {formatar_tamanho(resultado['liberado'])} liberados "
+                 f"({formatar_tamanho(resultado['antes'])} → {formatar_tamanho(resultado['depois'])})")
+
+    if medir:
+        resultado["inicio_depois_s"] = medir_inicializacao(perfil, logger)
+        a, d = resultado["inicio_antes_s"], resultado["inicio_depois_s"]
+        if a is not None and d is not None:
+            _log(logger, f"⏱️ Abertura do WhatsApp: antes {a:.1f}s | depois {d:.1f}s ({d - a:+.1f}s)")
+    return resultado
+
+def main(limpar=True, agressivo=False, medir=False, conta=None):
+    """Ponto de entrada do CLI (log em logs/<data>/manutencao_perfil.log)."""
+    from datetime import datetime
+    from core.logger import get_logger
+    from core.paths import get_app_base_dir, get_whatsapp_profile_dir
+
+    log_file = os.path.join(get_app_base_dir(), "logs", datetime.now().strftime("%Y-%m-%d"), "manutencao_perfil.log")
+    registro = get_logger("manutencao_perfil", log_file)
+
+    def logger(msg):
+        print(msg)
+        registro.info(msg)
+
+    try:
+        executar_manutencao(get_whatsapp_profile_dir(conta=conta), limpar, agressivo, medir, logger)
+    except Exception as e:
+        logger(f"❌ Manutenção não executada: {e}")
+        return 1
+    return 0
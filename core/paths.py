@@ -22,20 +22,22 @@ def get_user_data_dir():
     os.makedirs(path, exist_ok=True)
     return path
 
-def get_whatsapp_profile_dir(modo='gui'):
+def get_whatsapp_profile_dir(modo='gui', conta=None):
     """
-    Retorna perfil SEPARADO para GUI e agendador.
+    Retorna a pasta do perfil do WhatsApp.
     
     Args:
-        modo: 'gui' ou 'scheduler'
+        modo: 'gui' ou 'scheduler' (os dois usam o mesmo perfil para
+              precisar de um único QR Code)
+        conta: nome de uma conta de core/contas.py. None = conta principal
+               (perfil_bot_whatsapp)
     
     Returns:
         Path absoluto do perfil
-    
-    IMPORTANTE: Cada modo tem seu próprio QR Code.
-    - GUI: Login uma vez, mantém sessão
-    - Scheduler: Login separado (não conflita)
     """
+    if conta:
+        from core.contas import perfil_da_conta
+        return perfil_da_conta(conta)
     base = get_app_base_dir()
     profile = os.path.join(base, "perfil_bot_whatsapp")
     os.makedirs(profile, exist_ok=True)
@@ -0,0 +1,275 @@
+"""
+PERFIL EM RAM (OPCIONAL)
+
+Copia as partes do perfil que guardam a sessão para um diretório rápido
+(tmpfs / RAM disk) e o Chrome roda a partir dessa cópia. Os caches que o
+Chrome recria (ver manutencao_perfil.CACHES_SEGUROS) não são copiados.
+
+Ativação em user_data/config.json:
+    "perfil_em_ram": true                               (Linux: /dev/shm)
+    "perfil_em_ram": {"diretorio": "R:\\\\wa_staging"}   (RAM disk no Windows)
+    "perfil_em_ram": {"limpar_caches": true}             (descarta os caches ao sincronizar)
+
+Segurança do perfil real:
+- Durante a execução o perfil real NÃO é tocado.
+- No fechamento limpo, perfil.novo é montado com hard links para os arquivos que
+  não mudaram (mesmo tamanho e data) e cópia só dos alterados; os caches do perfil
+  real entram do mesmo jeito, a não ser com "limpar_caches". Depois, duas renomeações:
+      perfil -> perfil.antigo, depois perfil.novo (completo, com marcador) -> perfil
+- Se o processo morrer no meio, recuperar() na próxima abertura termina
+  ou desfaz a troca. Se morrer durante o envio, o perfil real fica como estava
+  e a cópia órfã é apagada depois.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+from core.config import get_config
+
+SUFIXO_NOVO = ".novo"
+SUFIXO_ANTIGO = ".antigo"
+MARCADOR_COMPLETO = ".copia_completa"
+TRAVA = ".perfil_ram.lock"
+PREFIXO_COPIA = "wa_perfil_"
+
+def _log(logger, msg):
+    from core.automation_base import _log as log_automacao
+    log_automacao(logger, msg)
+
+def diretorio_rapido():
+    """Diretório configurado para as cópias, ou None se o modo estiver desligado."""
+    bruto = get_config("perfil_em_ram", False)
+    if not bruto:
+        return None
+    if isinstance(bruto, dict) and bruto.get("diretorio"):
+        return bruto["diretorio"]
+    if sys.platform.startswith("linux") and os.path.isdir("/dev/shm"):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+def limpar_caches_ao_sincronizar():
+    """True se a config pede para descartar os caches do perfil na volta da cópia."""
+    bruto = get_config("perfil_em_ram", False)
+    return isinstance(bruto, dict) and bool(bruto.get("limpar_caches"))
+
+def _linkar(origem, destino):
+    """Hard link (instantâneo, sem copiar bytes); cópia se o sistema de arquivos não permitir."""
+    try:
+        os.link(origem, destino)
+    except OSError:
+        shutil.copy2(origem, destino)
+
+def _pid_vivo(pid):
+    # No Windows os.kill(pid, 0) ENCERRA o processo: consulta pela API do sistema
+    if sys.platform == "win32":
+        return _pid_vivo_windows(pid)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+def _pid_vivo_windows(pid):
+    try:
+        import ctypes
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)  # QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    except Exception:
+        return True
+
+def _ignorar_caches(origem_raiz):
+    """Filtro do copytree: pula caches recriáveis e as travas do Chrome."""
+    from core.manutencao_perfil import CACHES_SEGUROS
+    ignorados = {os.path.normcase(os.path.join(origem_raiz, c)) for c in CACHES_SEGUROS}
+
+    def ignorar(pasta, nomes):
+        fora = []
+        for n in nomes:
+            if os.path.normcase(os.path.join(pasta, n)) in ignorados:
+                fora.append(n)
+            elif n in ("SingletonLock", "SingletonCookie", "SingletonSocket", "lockfile", TRAVA, MARCADOR_COMPLETO):
+                fora.append(n)
+        return fora
+    return ignorar
+
+def recuperar(perfil, logger=None):
+    """Termina ou desfaz uma troca interrompida do perfil (chamada antes de cada uso)."""
+    perfil = os.path.abspath(perfil)
+    novo, antigo = perfil + SUFIXO_NOVO, perfil + SUFIXO_ANTIGO
+    novo_completo = os.path.exists(os.path.join(novo, MARCADOR_COMPLETO))
+
+    if not os.path.isdir(perfil):
+        if novo_completo:
+            os.replace(novo, perfil)
+            _log(logger, "♻️ Perfil: troca interrompida concluída (cópia nova aplicada).")
+        elif os.path.isdir(antigo):
+            os.replace(antigo, perfil)
+            _log(logger, "♻️ Perfil: troca interrompida desfeita (perfil anterior restaurado).")
+    elif novo_completo and not os.path.isdir(antigo):
+        # Morreu antes da primeira renomeação: aplica a cópia que já estava pronta
+        os.replace(perfil, antigo)
+        os.replace(novo, perfil)
+        _log(logger, "♻️ Perfil: sincronização pendente aplicada.")
+
+    if os.path.isdir(novo) and not os.path.exists(os.path.join(novo, MARCADOR_COMPLETO)):
+        shutil.rmtree(novo, ignore_errors=True)
+    if os.path.isdir(antigo) and os.path.isdir(perfil):
+        shutil.rmtree(antigo, ignore_errors=True)
+    marcador = os.path.join(perfil, MARCADOR_COMPLETO)
+    if os.path.exists(marcador):
+        os.remove(marcador)
+
+def limpar_copias_orfas(base):
+    """Apaga cópias de processos que já morreram (executor encerrado à força)."""
+    try:
+        nomes = os.listdir(base)
+    except OSError:
+        return
+    for nome in nomes:
+        if not nome.startswith(PREFIXO_COPIA):
+            continue
+        try:
+            pid = int(nome.rsplit("_", 1)[1])
+        except (ValueError, IndexError):
+            continue
+        if pid != os.getpid() and not _pid_vivo(pid):
+            shutil.rmtree(os.path.join(base, nome), ignore_errors=True)
+
+class PerfilEmRam:
+    """Cópia de trabalho de um perfil em diretório rápido."""
+
+    def __init__(self, perfil, base, logger=None):
+        self.perfil = os.path.abspath(perfil)
+        self.logger = logger
+        nome = os.path.basename(self.perfil.rstrip(os.sep))
+        self.caminho = os.path.join(base, f"{PREFIXO_COPIA}{nome}_{os.getpid()}")
+        self.trava = os.path.join(self.perfil, TRAVA)
+
+    def _travar(self):
+        """Impede duas cópias do mesmo perfil ao mesmo tempo (a última sobrescreveria a outra)."""
+        if os.path.exists(self.trava):
+            try:
+                with open(self.trava, 'r', encoding='utf-8') as f:
+                    pid = int(f.read().strip() or 0)
+            except (OSError, ValueError):
+                pid = 0
+            if pid and (pid == os.getpid() or _pid_vivo(pid)):
+                raise RuntimeError(f"Perfil já está em uso por outro processo (PID {pid}).")
+        with open(self.trava, 'w', encoding='utf-8') as f:
+            f.write(str(os.getpid()))
+
+    def _destravar(self):
+        try: os.remove(self.trava)
+        except OSError: pass
+
+    def preparar(self):
+        """Copia o perfil para o diretório rápido. Retorna o caminho da cópia."""
+        import time
+        inicio = time.monotonic()
+        from core.manutencao_perfil import perfil_em_uso
+        recuperar(self.perfil, self.logger)
+        os.makedirs(self.perfil, exist_ok=True)
+        if perfil_em_uso(self.perfil):
+            raise RuntimeError("Perfil já está aberto em outro navegador.")
+        self._travar()
+        try:
+            limpar_copias_orfas(os.path.dirname(self.caminho))
+            shutil.rmtree(self.caminho, ignore_errors=True)
+            shutil.copytree(self.perfil, self.caminho, ignore=_ignorar_caches(self.perfil), symlinks=True)
+        except Exception:
+            shutil.rmtree(self.caminho, ignore_errors=True)
+            self._destravar()
+            raise
+        _log(self.logger, f"⚡ Perfil copiado para {self.caminho} em {time.monotonic() - inicio:.2f}s")
+        return self.caminho
+
+    def sincronizar(self):
+        """
+        Devolve a cópia ao perfil real (chamar SÓ depois do navegador fechar).
+        A troca é feita por renomeação; o perfil real nunca fica pela metade.
+        """
+        import time
+        inicio = time.monotonic()
+        novo, antigo = self.perfil + SUFIXO_NOVO, self.perfil + SUFIXO_ANTIGO
+        try:
+            shutil.rmtree(novo, ignore_errors=True)
+            copiados = self._montar_novo(novo)
+            with open(os.path.join(novo, MARCADOR_COMPLETO), 'w') as f:
+                f.write("ok")
+            os.replace(self.perfil, antigo)
+            os.replace(novo, self.perfil)
+            os.remove(os.path.join(self.perfil, MARCADOR_COMPLETO))
+            shutil.rmtree(antigo, ignore_errors=True)
+            _log(self.logger, f"💾 Sessão sincronizada de volta ao perfil em {time.monotonic() - inicio:.2f}s "
+                              f"({copiados} arquivo(s) alterado(s) copiado(s))")
+        except Exception as e:
+            _log(self.logger, f"⚠️ Não foi possível sincronizar o perfil (o anterior foi mantido): {e}")
+            recuperar(self.perfil, self.logger)
+        finally:
+            self.descartar()
+
+    def _montar_novo(self, novo):
+        """
+        Monta perfil.novo a partir da cópia: arquivo igual ao do perfil real (tamanho e
+        data de modificação, preservada pelo copy2 do preparar) vira hard link para o
+        real; só os alterados são copiados. Retorna quantos foram copiados.
+        """
+        copiados = []
+
+        def copiar_se_mudou(origem, destino):
+            real = os.path.join(self.perfil, os.path.relpath(origem, self.caminho))
+            try:
+                a, b = os.stat(origem), os.stat(real)
+                igual = a.st_size == b.st_size and a.st_mtime_ns == b.st_mtime_ns
+            except OSError:
+                igual = False
+            if igual:
+                _linkar(real, destino)
+            else:
+                shutil.copy2(origem, destino)
+                copiados.append(origem)
+
+        shutil.copytree(self.caminho, novo, ignore=_ignorar_caches(self.caminho), symlinks=True,
+                        copy_function=copiar_se_mudou)
+
+        if limpar_caches_ao_sincronizar():
+            _log(self.logger, "🧹 Caches do perfil descartados na sincronização (limpar_caches).")
+        else:
+            # A cópia não leva os caches: os do perfil real continuam valendo
+            from core.manutencao_perfil import CACHES_SEGUROS
+            for cache in CACHES_SEGUROS:
+                origem = os.path.join(self.perfil, cache)
+                if os.path.isdir(origem) and not os.path.islink(origem):
+                    shutil.copytree(origem, os.path.join(novo, cache), symlinks=True,
+                                    copy_function=_linkar, dirs_exist_ok=True)
+        return len(copiados)
+
+    def descartar(self):
+        """Apaga a cópia sem sincronizar (ex.: navegador não abriu)."""
+        shutil.rmtree(self.caminho, ignore_errors=True)
+        self._destravar()
+
+def preparar_perfil(userdir, logger=None):
+    """
+    Se o modo estiver ativo, copia o perfil e devolve (caminho_para_o_chrome, PerfilEmRam).
+    Desligado ou com erro na cópia: (userdir, None) e o Chrome usa o perfil real.
+    """
+    base = diretorio_rapido()
+    if not base:
+        recuperar(userdir, logger)
+        return userdir, None
+    try:
+        os.makedirs(base, exist_ok=True)
+        copia = PerfilEmRam(userdir, base, logger)
+        return copia.preparar(), copia
+    except RuntimeError:
+        raise
+    except Exception as e:
+        _log(logger, f"⚠️ Perfil em RAM indisponível ({e}), usando o perfil normal.")
+        return userdir, None
@@ -0,0 +1,267 @@
+"""
+POOL DE CONTAS (VÁRIOS WHATSAPP EM PARALELO)
+
+Um processo por conta, cada um com o SEU Chrome e o SEU perfil (core/contas.py).
+O despachante mantém a fila de envios e entrega o próximo item à primeira conta
+que ficar livre. Itens com 'conta' definida só vão para aquela conta.
+
+A conta principal usa o perfil do serviço de sessão (core/session_service.py):
+com o serviço rodando, os envios dela vão para ele em vez de abrir outro Chrome;
+com o perfil aberto em outro navegador, ela fica fora do pool.
+
+Uso:
+    from core.pool_contas import PoolContas
+    resultados, estatisticas = PoolContas(logger=logger).executar(jobs)
+"""
+
+import os
+import time
+import queue
+import asyncio
+import threading
+import multiprocessing
+from collections import deque
+
+from core.contas import listar_contas, perfil_da_conta, acumular_estatisticas, CONTA_PADRAO
+
+# Tempo máximo esperando os processos fecharem o navegador (e sincronizarem o perfil) no final
+TIMEOUT_ENCERRAR = 60
+
+def _worker(nome, perfil, modo_execucao, log_file, fila_tarefas, fila_eventos):
+    """Ponto de entrada do processo de uma conta (precisa ser global para o spawn)."""
+    asyncio.run(_worker_async(nome, perfil, modo_execucao, log_file, fila_tarefas, fila_eventos))
+
+async def _worker_async(nome, perfil, modo_execucao, log_file, fila_tarefas, fila_eventos):
+    from core import automation_async, linha_do_tempo
+    from core.logger import get_logger
+
+    logger = get_logger(f"conta_{nome}", log_file) if log_file else None
+    try:
+        from core.db import get_db
+        contatos = get_db()
+    except Exception:
+        contatos = None
+
+    # Fases medidas aqui voltam no resultado (a abertura do navegador vai com o 1º envio)
+    linha = linha_do_tempo.iniciar()
+    try:
+        pw, context, page = await automation_async.iniciar_driver(perfil, modo_execucao, logger)
+    except Exception as e:
+        fila_eventos.put(("falha_abertura", nome, str(e)))
+        return
+
+    loop = asyncio.get_running_loop()
+    fila_eventos.put(("livre", nome, None))
+    try:
+        while True:
+            tarefa = await loop.run_in_executor(None, fila_tarefas.get)
+            if tarefa is None:
+                break
+            indice, job = tarefa
+            inicio = time.monotonic()
+            try:
+                confirmacao = await automation_async.enviar_na_pagina(
+                    page, job.get("target"), job.get("mode"), job.get("message"),
+                    job.get("file_path"), logger, contatos, ja_enviados=job.get("anexos_enviados")
+                )
+                resultado = {"target": job.get("target"), "ok": True, "erro": None, **confirmacao}
+            except Exception as e:
+                resultado = {"target": job.get("target"), "ok": False, "erro": str(e),
+                             **automation_async._anexos_enviados(e)}
+            finally:
+                await automation_async.resetar_tela(page)
+            resultado["conta"] = nome
+            resultado["fases"], linha.fases = linha.fases, []
+            fila_eventos.put(("resultado", nome, (indice, resultado, time.monotonic() - inicio)))
+    finally:
+        await automation_async.fechar_contexto(context)
+        try: await pw.stop()
+        except Exception: pass
+
+def _worker_servico(nome, fila_tarefas, fila_eventos):
+    """Conta atendida pelo serviço de sessão residente (thread; um envio por pedido)."""
+    from core.session_service import enviar_lote_via_servico
+
+    fila_eventos.put(("livre", nome, None))
+    while True:
+        tarefa = fila_tarefas.get()
+        if tarefa is None:
+            break
+        indice, job = tarefa
+        inicio = time.monotonic()
+        resposta = enviar_lote_via_servico([job]) or {"ok": False, "erro": "Serviço de sessão parou de responder"}
+        if resposta.get("ok") and resposta.get("resultados"):
+            resultado = dict(resposta["resultados"][0])
+        else:
+            resultado = {"target": job.get("target"), "ok": False, "erro": resposta.get("erro") or "Falha no serviço de sessão"}
+        resultado["conta"] = nome
+        resultado["fases"] = resposta.get("fases")
+        fila_eventos.put(("resultado", nome, (indice, resultado, time.monotonic() - inicio)))
+
+class PoolContas:
+    """
+    Despachante de envios entre várias contas.
+
+    Args:
+        contas: nomes das contas a usar (None = todas as registradas)
+        log_file: log principal; cada conta grava em '<log>_<conta>.log'
+    """
+
+    def __init__(self, contas=None, modo_execucao='auto', logger=None, log_file=None):
+        registradas = [c["nome"] for c in listar_contas()]
+        self.contas = [c for c in (contas or registradas) if c in registradas]
+        self.modo_execucao = modo_execucao
+        self.logger = logger
+        self.log_file = log_file
+
+    def _log(self, msg):
+        from core.automation_base import _log
+        _log(self.logger, f"[POOL] {msg}")
+
+    def _log_conta(self, nome):
+        if not self.log_file:
+            return None
+        base, ext = os.path.splitext(str(self.log_file))
+        return f"{base}_{nome}{ext or '.log'}"
+
+    def executar(self, jobs):
+        """
+        Envia todos os jobs usando as contas livres.
+
+        Args:
+            jobs: lista de dicts {'target', 'mode', 'message', 'file_path', 'conta'(opcional)}
+
+        Returns:
+            (resultados, estatisticas):
+            - resultados: um por job, na ordem de entrada {'target', 'ok', 'erro', 'conta', 'status', 'latencia_s'}
+            - estatisticas: {conta: {'enviados', 'falhas', 'segundos', 'por_minuto'}}
+        """
+        jobs = list(jobs)
+        resultados = [None] * len(jobs)
+        pendentes = deque()
+
+        for i, job in enumerate(jobs):
+            conta = job.get("conta") or None
+            if conta and conta not in self.contas:
+                resultados[i] = {"target": job.get("target"), "ok": False, "erro": f"Conta não registrada: {conta}", "conta": conta}
+            else:
+                pendentes.append((i, job))
+
+        # Só abre as contas que têm algo para fazer
+        if any(not (j.get("conta") or None) for _, j in pendentes):
+            usadas = list(self.contas)
+        else:
+            usadas = [c for c in self.contas if any(j.get("conta") == c for _, j in pendentes)]
+
+        via_servico = set()
+        if CONTA_PADRAO in usadas:
+            from core.session_service import servico_ativo
+            from core.manutencao_perfil import perfil_em_uso
+            # O Chrome trava o perfil: um segundo navegador na principal não abriria
+            if servico_ativo():
+                via_servico.add(CONTA_PADRAO)
+                self._log(f"Conta '{CONTA_PADRAO}' atendida pelo serviço de sessão.")
+            elif perfil_em_uso(perfil_da_conta(CONTA_PADRAO)):
+                usadas.remove(CONTA_PADRAO)
+                self._log(f"⚠️ Perfil da conta '{CONTA_PADRAO}' está aberto em outro navegador, ela fica fora do pool.")
+
+        stats = {c: {"enviados": 0, "falhas": 0, "segundos": 0.0} for c in usadas}
+        if not pendentes:
+            return resultados, stats
+
+        # spawn: o Playwright não sobrevive a fork (e é o padrão no Windows)
+        ctx = multiprocessing.get_context("spawn")
+        fila_eventos = ctx.Queue()
+        processos, filas, ocupadas = {}, {}, {}
+
+        for nome in usadas:
+            filas[nome] = ctx.Queue()
+            if nome in via_servico:
+                processos[nome] = threading.Thread(
+                    target=_worker_servico, args=(nome, filas[nome], fila_eventos), daemon=True
+                )
+            else:
+                processos[nome] = ctx.Process(
+                    target=_worker,
+                    args=(nome, perfil_da_conta(nome), self.modo_execucao, self._log_conta(nome), filas[nome], fila_eventos),
+                    daemon=True
+                )
+            processos[nome].start()
+        vivas = set(usadas)
+        self._log(f"{len(pendentes)} envio(s) entre {len(usadas)} conta(s): {', '.join(usadas) or '-'}")
+
+        def falhar(i, job, erro, conta=None):
+            resultados[i] = {"target": job.get("target"), "ok": False, "erro": erro, "conta": conta or job.get("conta")}
+
+        def despachar(nome):
+            for item in pendentes:
+                conta = item[1].get("conta") or None
+                if conta in (None, nome):
+                    pendentes.remove(item)
+                    ocupadas[nome] = item
+                    filas[nome].put(item)
+                    return
+
+        def descartar_orfaos():
+            """Itens que nenhuma conta viva pode mais atender."""
+            for item in list(pendentes):
+                conta = item[1].get("conta") or None
+                if (conta and conta not in vivas) or not vivas:
+                    pendentes.remove(item)
+                    falhar(*item, f"Conta indisponível: {conta or 'nenhuma conta abriu'}")
+
+        inicio = time.monotonic()
+        try:
+            descartar_orfaos()
+            while pendentes or ocupadas:
+                try:
+                    tipo, nome, dados = fila_eventos.get(timeout=1)
+                except queue.Empty:
+                    # Processo morreu no meio de um envio (Chrome fechado, crash...)
+                    for nome, proc in processos.items():
+                        if nome in vivas and not proc.is_alive():
+                            vivas.discard(nome)
+                            self._log(f"❌ Processo da conta '{nome}' terminou inesperadamente.")
+                            if nome in ocupadas:
+                                falhar(*ocupadas.pop(nome), "Processo da conta terminou durante o envio", nome)
+                    descartar_orfaos()
+                    continue
+
+                if tipo == "falha_abertura":
+                    vivas.discard(nome)
+                    self._log(f"❌ Conta '{nome}' não abriu: {dados}")
+                    descartar_orfaos()
+                    continue
+
+                if tipo == "resultado":
+                    indice, resultado, segundos = dados
+                    ocupadas.pop(nome, None)
+                    resultados[indice] = resultado
+                    s = stats[nome]
+                    s["enviados" if resultado["ok"] else "falhas"] += 1
+                    s["segundos"] += segundos
+                    self._log(f"{'✅' if resultado['ok'] else '❌'} [{nome}] {resultado['target']} ({segundos:.1f}s)")
+
+                despachar(nome)
+        finally:
+            for nome in usadas:
+                try: filas[nome].put(None)
+                except Exception: pass
+            for proc in processos.values():
+                proc.join(TIMEOUT_ENCERRAR)
+                if proc.is_alive() and hasattr(proc, "terminate"):
+                    proc.terminate()
+
+        duracao = time.monotonic() - inicio
+        for nome, s in stats.items():
+            s["segundos"] = round(s["segundos"], 2)
+            s["por_minuto"] = round(s["enviados"] * 60 / duracao, 2) if duracao else 0.0
+            self._log(f"📊 [{nome}] {s['enviados']} ok, {s['falhas']} falha(s), {s['por_minuto']} envio(s)/min")
+        acumular_estatisticas(stats)
+        return resultados, stats
+
+def usar_pool(jobs):
+    """True se o lote precisa do pool: várias contas registradas ou item fixado em outra conta."""
+    if len(listar_contas()) > 1:
+        return True
+    return any((j.get("conta") or CONTA_PADRAO) != CONTA_PADRAO for j in jobs)
@@ -2,7 +2,7 @@ from datetime import datetime
 from .windows_scheduler import create_windows_task, create_task_bat
 
 def create_windows_task_interface(task_id, scheduled_time, target,
-                                  mode, message=None, file_path=None):
+                                  mode, message=None, file_path=None, conta=None):
 
     task_name = f"WA_Task_{task_id}"
 
@@ -18,6 +18,9 @@ def create_windows_task_interface(task_id, scheduled_time, target,
         "file_path": file_path or "",
         "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     }
+    if conta:
+        # Envio fixado em uma conta do registro (core/contas.py)
+        task_data["conta"] = conta
 
     create_task_bat(
         task_id=str(task_id),
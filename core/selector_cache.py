@@ -0,0 +1,116 @@
+import os
+import json
+import threading
+from core.paths import get_user_data_dir
+
+CACHE_FILE = os.path.join(get_user_data_dir(), "selector_cache.json")
+
+# Falhas seguidas do seletor vencedor antes de ele perder a primeira posição
+LIMITE_FALHAS_VENCEDOR = 3
+
+class SelectorCache:
+    """
+    Memória de quais seletores funcionaram em cada etapa da automação.
+
+    Estrutura salva em user_data/selector_cache.json:
+    {
+        "legenda": {
+            "vencedor": "css=...",
+            "falhas_seguidas": 0,
+            "stats": {"css=...": {"hits": 12, "misses": 1}, ...}
+        },
+        ...
+    }
+
+    O vencedor é tentado primeiro; depois os seletores com saldo positivo
+    (acertos - falhas); por último os demais na ordem original da lista,
+    com os que mais falharam no fim.
+    """
+
+    def __init__(self, caminho=CACHE_FILE, limite_falhas=LIMITE_FALHAS_VENCEDOR):
+        self.caminho = caminho
+        self.limite_falhas = limite_falhas
+        self._lock = threading.Lock()
+        self.dados = self._carregar()
+
+    def _carregar(self):
+        if not os.path.exists(self.caminho):
+            return {}
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+            return dados if isinstance(dados, dict) else {}
+        except Exception:
+            # Cache corrompido não pode derrubar um envio: começa do zero
+            return {}
+
+    def salvar(self):
+        """Grava de forma atômica (arquivo temporário + replace)."""
+        tmp = f"{self.caminho}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.dados, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, self.caminho)
+        except Exception as e:
+            print(f"[CACHE] Aviso: não foi possível salvar o cache de seletores: {e}")
+
+    def _etapa(self, etapa):
+        return self.dados.setdefault(etapa, {"vencedor": None, "falhas_seguidas": 0, "stats": {}})
+
+    def _stats(self, etapa, seletor):
+        return self._etapa(etapa)["stats"].setdefault(seletor, {"hits": 0, "misses": 0})
+
+    def ordenar(self, etapa, candidatos):
+        """Retorna os candidatos na ordem em que devem ser tentados."""
+        with self._lock:
+            info = self.dados.get(etapa)
+            if not info:
+                return list(candidatos)
+
+            stats = info.get("stats", {})
+            vencedor = info.get("vencedor")
+            indice = {sel: i for i, sel in enumerate(candidatos)}
+
+            def chave(sel):
+                s = stats.get(sel, {})
+                saldo = s.get("hits", 0) - s.get("misses", 0)
+                return (
+                    0 if sel == vencedor else 1,
+                    0 if saldo > 0 else 1,
+                    -saldo,
+                    indice[sel],
+                )
+
+            return sorted(dict.fromkeys(candidatos), key=chave)
+
+    def vencedor(self, etapa):
+        """Seletor que funcionou por último na etapa (ou None)."""
+        return (self.dados.get(etapa) or {}).get("vencedor")
+
+    def registrar_sucesso(self, etapa, seletor):
+        with self._lock:
+            info = self._etapa(etapa)
+            self._stats(etapa, seletor)["hits"] += 1
+            info["vencedor"] = seletor
+            info["falhas_seguidas"] = 0
+            self.salvar()
+
+    def registrar_falha(self, etapa, seletor):
+        """Conta a falha e rebaixa o vencedor após falhas seguidas."""
+        with self._lock:
+            info = self._etapa(etapa)
+            self._stats(etapa, seletor)["misses"] += 1
+            if seletor == info.get("vencedor"):
+                info["falhas_seguidas"] = info.get("falhas_seguidas", 0) + 1
+                if info["falhas_seguidas"] >= self.limite_falhas:
+                    info["vencedor"] = None
+                    info["falhas_seguidas"] = 0
+            self.salvar()
+
+_cache_instance = None
+
+def get_selector_cache():
+    global _cache_instance
+    if _cache_instance is None:
+        _cache_instance = SelectorCache()
+    return _cache_instance
@@ -0,0 +1,278 @@
+"""
+SERVIÇO DE SESSÃO RESIDENTE
+
+Mantém UM navegador logado no WhatsApp Web aberto continuamente e recebe
+envios de outros processos (executor.py, "Enviar Agora", Task Scheduler)
+por um socket local (127.0.0.1) autenticado.
+
+Sem o serviço rodando, os clientes recebem None e caem no fluxo antigo
+(executar_envio: abre o Chrome, envia e fecha).
+
+Uso:
+    python app.py --servico-sessao          (ou Study_Practices.exe --servico-sessao)
+    python app.py --parar-servico-sessao
+"""
+
+import os
+import json
+import asyncio
+import secrets
+from multiprocessing.connection import Listener, Client
+
+from core.paths import get_user_data_dir
+
+HOST = "127.0.0.1"
+SERVICE_FILE = os.path.join(get_user_data_dir(), "session_service.json")
+
+# Tempo máximo que um cliente espera a resposta de um envio (arquivos pesados)
+TIMEOUT_RESPOSTA = 600
+
+def _ler_info_servico():
+    """Lê porta/chave do serviço. Retorna None se o arquivo não existir."""
+    if not os.path.exists(SERVICE_FILE):
+        return None
+    try:
+        with open(SERVICE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+def _conectar():
+    info = _ler_info_servico()
+    if not info:
+        return None
+    try:
+        return Client((HOST, int(info["porta"])), authkey=bytes.fromhex(info["authkey"]))
+    except Exception:
+        # Arquivo órfão (serviço morto) ou porta recusada
+        return None
+
+def _requisitar(pedido, timeout=TIMEOUT_RESPOSTA):
+    conn = _conectar()
+    if conn is None:
+        return None
+    try:
+        conn.send(pedido)
+        if not conn.poll(timeout):
+            return {"ok": False, "erro": f"Serviço de sessão não respondeu em {timeout}s"}
+        return conn.recv()
+    except (EOFError, OSError) as e:
+        return {"ok": False, "erro": f"Conexão com o serviço de sessão perdida: {e}"}
+    finally:
+        conn.close()
+
+def servico_ativo():
+    """True se há um serviço de sessão respondendo."""
+    resposta = _requisitar({"op": "ping"}, timeout=5)
+    return bool(resposta and resposta.get("ok"))
+
+def enviar_via_servico(target, mode, message=None, file_path=None, timeout=TIMEOUT_RESPOSTA, ja_enviados=None):
+    """
+    Entrega um envio ao serviço residente.
+
+    Args:
+        ja_enviados: anexos que já saíram numa tentativa anterior (não são reenviados)
+
+    Returns:
+        None se o serviço não estiver rodando (o chamador deve usar executar_envio),
+        ou dict {'ok': bool, 'erro': str|None, 'status', 'latencia_s'}
+        (falha com anexos parcialmente enviados: também 'anexos_enviados').
+    """
+    return _requisitar({
+        "op": "enviar",
+        "target": target,
+        "mode": mode,
+        "message": message,
+        "file_path": file_path,
+        "ja_enviados": ja_enviados,
+    }, timeout=timeout)
+
+def enviar_lote_via_servico(jobs, timeout=None):
+    """
+    Entrega um lote de envios ao serviço residente.
+
+    Returns:
+        None se o serviço não estiver rodando, ou dict
+        {'ok': bool, 'erro': str|None, 'resultados': list[dict]}.
+    """
+    jobs = list(jobs)
+    if timeout is None:
+        timeout = TIMEOUT_RESPOSTA * max(1, len(jobs))
+    return _requisitar({"op": "enviar_lote", "jobs": jobs}, timeout=timeout)
+
+def parar_servico():
+    """Pede para o serviço fechar o navegador e encerrar."""
+    return _requisitar({"op": "encerrar"}, timeout=30)
+
+class ServicoSessao:
+    """Dono do navegador residente. Atende um pedido por vez (uma única página)."""
+
+    def __init__(self, userdir, logger=None, modo_execucao='auto'):
+        self.userdir = userdir
+        self.logger = logger
+        self.modo_execucao = modo_execucao
+        self.pw, self.context, self.page = None, None, None
+        self.contatos = None
+
+    def _indice_contatos(self):
+        """Índice de contatos do banco (opcional: sem banco, envia sem índice)."""
+        if self.contatos is None:
+            try:
+                from core.db import get_db
+                self.contatos = get_db()
+            except Exception as e:
+                self._log(f"⚠️ Índice de contatos indisponível: {e}")
+                self.contatos = False
+        return self.contatos or None
+
+    def _log(self, msg):
+        from core.automation_base import _log
+        _log(self.logger, f"[SERVIÇO] {msg}")
+
+    async def _abrir_navegador(self):
+        from core.automation_async import iniciar_driver
+        await self._fechar_navegador()
+        self.pw, self.context, self.page = await iniciar_driver(self.userdir, self.modo_execucao, self.logger)
+
+    async def _fechar_navegador(self):
+        from core.automation_async import fechar_contexto
+        if self.context: await fechar_contexto(self.context)
+        try:
+            if self.pw: await self.pw.stop()
+        except Exception: pass
+        self.pw, self.context, self.page = None, None, None
+
+    async def _garantir_sessao(self):
+        """Reabre o navegador se a página morreu; recarrega se o WhatsApp saiu do ar."""
+        if self.page is None or self.page.is_closed():
+            self._log("Página indisponível, reabrindo navegador...")
+            await self._abrir_navegador()
+            return
+        try:
+            await self.page.wait_for_selector('div[data-tab="3"]', timeout=3000)
+        except Exception:
+            self._log("WhatsApp não está pronto, recarregando...")
+            try:
+                await self.page.goto("https://web.whatsapp.com")
+                await self.page.wait_for_selector('div[data-tab="3"]', timeout=120000)
+            except Exception:
+                await self._abrir_navegador()
+
+    async def _processar(self, pedido):
+        from core.automation_async import enviar_na_pagina, enviar_lote_na_pagina, resetar_tela, _anexos_enviados
+        from core import linha_do_tempo
+        op = pedido.get("op")
+        # As fases medidas neste processo voltam na resposta para o executor gravar
+        linha = linha_do_tempo.iniciar()
+
+        if op == "ping":
+            return {"ok": True}
+
+        if op == "enviar":
+            try:
+                # Dentro do try: navegador que não reabre (perfil travado, Chromium caiu)
+                # vira resposta de erro em vez de derrubar o serviço
+                await self._garantir_sessao()
+                confirmacao = await enviar_na_pagina(
+                    self.page,
+                    target=pedido["target"],
+                    mode=pedido["mode"],
+                    message=pedido.get("message"),
+                    file_path=pedido.get("file_path"),
+                    logger=self.logger,
+                    contatos=self._indice_contatos(),
+                    ja_enviados=pedido.get("ja_enviados"),
+                )
+                return {"ok": True, "erro": None, "fases": linha.fases, **confirmacao}
+            except Exception as e:
+                self._log(f"❌ Falha no envio: {e}")
+                return {"ok": False, "erro": str(e), "fases": linha.fases, **_anexos_enviados(e)}
+            finally:
+                if self.page is not None:
+                    await resetar_tela(self.page)
+
+        if op == "enviar_lote":
+            try:
+                await self._garantir_sessao()
+                resultados = await enviar_lote_na_pagina(self.page, pedido.get("jobs") or [], self.logger, self._indice_contatos())
+                return {"ok": True, "erro": None, "resultados": resultados, "fases": linha.fases}
+            except Exception as e:
+                self._log(f"❌ Falha no lote: {e}")
+                return {"ok": False, "erro": str(e), "fases": linha.fases}
+
+        return {"ok": False, "erro": f"Operação desconhecida: {op}"}
+
+    def executar(self):
+        """Loop principal: abre o navegador uma vez e atende pedidos até 'encerrar'."""
+        asyncio.run(self._executar())
+
+    async def _executar(self):
+        # O socket é bloqueante: accept/recv/send rodam em thread para não travar o event loop
+        loop = asyncio.get_running_loop()
+        authkey = secrets.token_bytes(16)
+        listener = Listener((HOST, 0), authkey=authkey)
+        porta = listener.address[1]
+
+        try:
+            await self._abrir_navegador()
+
+            with open(SERVICE_FILE, 'w', encoding='utf-8') as f:
+                json.dump({"porta": porta, "authkey": authkey.hex(), "pid": os.getpid()}, f)
+            self._log(f"✓ Serviço de sessão ouvindo em {HOST}:{porta}")
+
+            while True:
+                try:
+                    conn = await loop.run_in_executor(None, listener.accept)
+                except Exception as e:
+                    # Cliente com chave errada ou desconectado no handshake
+                    self._log(f"⚠️ Conexão recusada: {e}")
+                    continue
+
+                with conn:
+                    try:
+                        pedido = await loop.run_in_executor(None, conn.recv)
+                    except (EOFError, OSError):
+                        continue
+
+                    if pedido.get("op") == "encerrar":
+                        conn.send({"ok": True})
+                        self._log("Encerrando a pedido do cliente.")
+                        break
+
+                    try:
+                        resposta = await self._processar(pedido)
+                    except Exception as e:
+                        # Último recurso: nenhum pedido pode derrubar o serviço residente
+                        self._log(f"❌ Erro ao atender '{pedido.get('op')}': {e}")
+                        resposta = {"ok": False, "erro": str(e)}
+                    try:
+                        conn.send(resposta)
+                    except (EOFError, OSError):
+                        self._log("⚠️ Cliente desconectou antes da resposta.")
+        finally:
+            try:
+                if os.path.exists(SERVICE_FILE):
+                    os.remove(SERVICE_FILE)
+            except Exception:
+                pass
+            listener.close()
+            await self._fechar_navegador()
+
+def main():
+    from datetime import datetime
+    from core.logger import get_logger
+    from core.paths import get_app_base_dir, get_whatsapp_profile_dir
+
+    log_file = os.path.join(get_app_base_dir(), "logs", datetime.now().strftime("%Y-%m-%d"), "session_service.log")
+    logger = get_logger("session_service", log_file)
+
+    if servico_ativo():
+        print("[SERVIÇO] Já existe um serviço de sessão rodando.")
+        return 1
+
+    ServicoSessao(get_whatsapp_profile_dir(), logger=logger).executar()
+    return 0
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""
+MEDIÇÃO DO TEMPO DE ABERTURA DA GUI
+
+app.py marca o instante zero assim que o processo começa a rodar; cada etapa
+chama marcar(). Quando a janela aparece, registrar() grava uma linha em
+logs/startup_timing.log com o tempo até a primeira janela e cada etapa:
+
+    2026-01-10 09:12:01 | primeira_janela=0.84s | imports=0.21s navegador=0.02s janela=0.55s ...
+"""
+
+import os
+import time
+from datetime import datetime
+
+_inicio = time.perf_counter()
+_marcas = []
+
+def iniciar(instante=None):
+    """Redefine o instante zero (app.py passa o perf_counter do início do processo)."""
+    global _inicio
+    _inicio = instante if instante is not None else time.perf_counter()
+    _marcas.clear()
+
+def marcar(fase):
+    """Registra que a etapa 'fase' terminou agora."""
+    _marcas.append((fase, time.perf_counter()))
+
+def decorrido():
+    return time.perf_counter() - _inicio
+
+def registrar():
+    """Grava o tempo até a primeira janela e a duração de cada etapa."""
+    from core.paths import get_app_base_dir
+    total = decorrido()
+    anterior, etapas = _inicio, []
+    for fase, instante in _marcas:
+        etapas.append(f"{fase}={instante - anterior:.2f}s")
+        anterior = instante
+    linha = f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | primeira_janela={total:.2f}s | {' '.join(etapas)}"
+    try:
+        pasta = os.path.join(get_app_base_dir(), "logs")
+        os.makedirs(pasta, exist_ok=True)
+        with open(os.path.join(pasta, "startup_timing.log"), "a", encoding="utf-8") as f:
+            f.write(linha + "\n")
+    except Exception:
+        pass
+    print(f"[STARTUP] {linha}")
+    return total
@@ -0,0 +1,105 @@
+"""
+PRAZOS DE UPLOAD DERIVADOS DO TAMANHO DOS ANEXOS
+
+Em vez de um limite fixo (5 min de preview + espera fixa após enviar), os prazos
+são calculados a partir do total de bytes dos arquivos e da vazão observada nos
+uploads anteriores (média móvel em user_data/upload_stats.json).
+
+Ajustes opcionais em user_data/config.json:
+    "upload": {
+        "vazao_inicial_kbps": 200,     # usada até existir histórico
+        "fator_seguranca": 3,          # prazo = base + fator x tempo estimado
+        "estagnado_s": 90,             # sem progresso por esse tempo = falha
+        "limite_max_s": 1800
+    }
+"""
+
+import os
+import json
+import threading
+from core.config import get_config
+from core.paths import get_user_data_dir
+
+STATS_FILE = os.path.join(get_user_data_dir(), "upload_stats.json")
+
+PADROES = {
+    "vazao_inicial_kbps": 200,
+    "fator_seguranca": 3,
+    "estagnado_s": 90,
+    "limite_min_s": 30,
+    "limite_max_s": 1800,
+    # Processamento local da tela de preview (miniatura/transcodificação)
+    "preview_base_s": 10,
+    "preview_mbps": 5,
+}
+
+# Peso da última medição na média móvel da vazão
+PESO_MEDICAO = 0.3
+
+_lock = threading.Lock()
+
+def _opcao(chave):
+    personalizados = get_config("upload", {}) or {}
+    return float(personalizados.get(chave, PADROES[chave]))
+
+def tamanho_total(lista_arquivos):
+    """Soma dos tamanhos (bytes) dos arquivos; os que não existem contam 0."""
+    total = 0
+    for caminho in lista_arquivos:
+        try:
+            total += os.path.getsize(caminho)
+        except OSError:
+            pass
+    return total
+
+def _ler_stats():
+    try:
+        with open(STATS_FILE, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+        return dados if isinstance(dados, dict) else {}
+    except Exception:
+        return {}
+
+def vazao_estimada():
+    """Bytes/s esperados para o próximo upload (histórico ou valor inicial)."""
+    vazao = _ler_stats().get("bytes_por_s")
+    if vazao and vazao > 0:
+        return float(vazao)
+    return _opcao("vazao_inicial_kbps") * 1024
+
+def registrar_vazao(total_bytes, segundos):
+    """Atualiza a média móvel com um upload concluído (ignora anexos pequenos demais para medir)."""
+    if total_bytes < 256 * 1024 or segundos <= 0.5:
+        return None
+    medida = total_bytes / segundos
+    with _lock:
+        dados = _ler_stats()
+        anterior = dados.get("bytes_por_s")
+        dados["bytes_por_s"] = medida if not anterior else (1 - PESO_MEDICAO) * anterior + PESO_MEDICAO * medida
+        dados["amostras"] = dados.get("amostras", 0) + 1
+        tmp = f"{STATS_FILE}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(dados, f)
+            os.replace(tmp, STATS_FILE)
+        except Exception as e:
+            print(f"[UPLOAD] Aviso: não foi possível salvar a vazão: {e}")
+    return medida
+
+def prazo_upload_s(total_bytes, vazao=None):
+    """Prazo (s) para o upload sair do estado pendente."""
+    vazao = vazao or vazao_estimada()
+    estimado = total_bytes / vazao
+    prazo = _opcao("limite_min_s") + _opcao("fator_seguranca") * estimado
+    return min(prazo, _opcao("limite_max_s"))
+
+def prazo_preview_ms(total_bytes, limite_ms):
+    """Prazo (ms) para a tela de preview ficar pronta, sem passar do limite configurado."""
+    segundos = _opcao("preview_base_s") + total_bytes / (_opcao("preview_mbps") * 1024 * 1024)
+    return int(min(segundos * 1000, limite_ms))
+
+def estagnado_s():
+    return _opcao("estagnado_s")
+
+def formatar_mb(total_bytes):
+    return f"{total_bytes / (1024 * 1024):.1f} MB"
@@ -151,4 +151,59 @@ def delete_windows_task(task_id):
             print(f"[AVISO] Não foi possível remover {task_name}: {result.stderr}")
             
     except Exception as e:
-        print(f"[ERRO] Exceção ao deletar tarefa: {str(e)}")
\ No newline at end of file
+        print(f"[ERRO] Exceção ao deletar tarefa: {str(e)}")
+
+
+def create_maintenance_task(schedule_time="03:00", dia_semana="SUN"):
+    """
+    Agenda a manutenção semanal do perfil (python app.py --manutencao-perfil).
+
+    Args:
+        schedule_time: Horário no formato HH:MM
+        dia_semana: Dia do schtasks (MON, TUE, ..., SUN)
+
+    Returns:
+        tuple: (sucesso: bool, mensagem: str)
+    """
+    app_path = Path(get_app_base_dir()).absolute()
+    scheduled_tasks_dir = app_path / "scheduled_tasks"
+    scheduled_tasks_dir.mkdir(exist_ok=True)
+    bat_path = scheduled_tasks_dir / "manutencao_perfil.bat"
+    vbs_path = scheduled_tasks_dir / "manutencao_perfil.vbs"
+
+    exe_path = Path(sys.executable).absolute()
+    if getattr(sys, 'frozen', False):
+        run_command = f'"{exe_path}" --manutencao-perfil'
+    else:
+        run_command = f'"{exe_path}" "{app_path / "app.py"}" --manutencao-perfil'
+
+    with open(bat_path, 'w', encoding='utf-8') as f:
+        f.write(f"""@echo off
+chcp 65001 >nul
+cd /d "{app_path}"
+{run_command}
+exit
+""")
+    with open(vbs_path, 'w', encoding='utf-8') as f:
+        f.write(f'CreateObject("Wscript.Shell").Run chr(34) & "{bat_path}" & chr(34), 0, False')
+
+    cmd = (
+        f'schtasks /create '
+        f'/tn "AutoMessage_Manutencao" '
+        f'/tr "{vbs_path}" '
+        f'/sc weekly /d {dia_semana} '
+        f'/st {schedule_time} '
+        f'/rl limited '
+        f'/f'
+    )
+    try:
+        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, encoding='cp850', errors='replace')
+        if result.returncode != 0:
+            erro = result.stderr if result.stderr else result.stdout
+            print(f"[ERRO SCHTASKS] Saída: {erro}")
+            return False, f"Erro ao agendar manutenção: {erro}"
+        print(f"[OK] Manutenção do perfil agendada: {dia_semana} às {schedule_time}")
+        return True, "Manutenção agendada com sucesso"
+    except Exception as e:
+        print(f"[EXCEÇÃO] Erro ao executar schtasks: {str(e)}")
+        return False, f"Exceção ao agendar manutenção: {str(e)}"
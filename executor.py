@@ -49,9 +49,136 @@ sys.path.insert(0, str(BASE_DIR))
 
 # Importações APENAS do core (SEM GUI)
 from core.db import get_db
-from core.automation import executar_envio
+from core.automation import executar_envio, executar_envio_em_lote, pior_status, FalhaParcialAnexos
+from core.session_service import enviar_via_servico, enviar_lote_via_servico
+from core.pool_contas import PoolContas, usar_pool
 from core.logger import get_logger
 from core.paths import get_whatsapp_profile_dir
+from core import linha_do_tempo
+
+def normalizar_jobs(dados: dict) -> list:
+    """
+    Monta a lista de envios de uma tarefa em lote.
+    
+    Cada item de dados["jobs"] pode ser um dict completo ou apenas o target (str);
+    campos ausentes (mode, message, file_path, conta) herdam o valor do topo do JSON.
+    """
+    jobs = []
+    for item in dados.get("jobs") or []:
+        if isinstance(item, str):
+            item = {"target": item}
+        jobs.append({
+            "target": item.get("target"),
+            "mode": item.get("mode") or dados.get("mode"),
+            "message": item.get("message", dados.get("message")),
+            "file_path": item.get("file_path", dados.get("file_path")),
+            "conta": item.get("conta", dados.get("conta")),
+        })
+    return jobs
+
+def _executar_unico(dados, profile_dir, modo_execucao, logger, contatos=None, ja_enviados=None):
+    """
+    Envio único: tenta o serviço de sessão e cai no navegador próprio.
+
+    Args:
+        ja_enviados: anexos que já saíram numa execução anterior (não são reenviados)
+
+    Returns:
+        dict {'status', 'latencia_s'} da confirmação do envio
+
+    Raises:
+        FalhaParcialAnexos: parte dos anexos saiu (ver .enviados)
+    """
+    resultado = None
+    if not dados.get("conta"):
+        # O serviço de sessão só mantém a conta principal aberta
+        resultado = enviar_via_servico(
+            target=dados["target"],
+            mode=dados["mode"],
+            message=dados.get("message"),
+            file_path=dados.get("file_path"),
+            ja_enviados=ja_enviados
+        )
+    
+    if resultado is None:
+        logger.info("Serviço de sessão indisponível, abrindo navegador próprio...")
+        return executar_envio(
+            userdir=profile_dir,
+            target=dados["target"],
+            mode=dados["mode"],
+            message=dados.get("message"),
+            file_path=dados.get("file_path"),
+            logger=logger,
+            modo_execucao=modo_execucao,
+            contatos=contatos,
+            ja_enviados=ja_enviados
+        )
+    linha_do_tempo.atual().incorporar(resultado.pop("fases", None))
+    if not resultado.get("ok"):
+        erro = resultado.get("erro") or "Falha no serviço de sessão"
+        # Só é falha parcial se algum anexo chegou a sair; o resto é erro comum (como no executar_envio)
+        if resultado.get("anexos_enviados"):
+            raise FalhaParcialAnexos(erro, enviados=resultado["anexos_enviados"])
+        raise Exception(erro)
+    logger.info("Envio realizado pelo serviço de sessão.")
+    return {"status": resultado.get("status"), "latencia_s": resultado.get("latencia_s")}
+
+def _executar_lote(jobs, profile_dir, modo_execucao, logger, contatos=None, log_file=None):
+    """Lote: uma única sessão do navegador para todos os envios (ou o pool, com várias contas)."""
+    if usar_pool(jobs):
+        logger.info("Várias contas disponíveis, distribuindo o lote pelo pool...")
+        resultados, _ = PoolContas(modo_execucao=modo_execucao, logger=logger, log_file=log_file).executar(jobs)
+        for i, r in enumerate(resultados):
+            linha_do_tempo.atual().incorporar(r.pop("fases", None), item=i)
+        return resultados
+
+    resultado = enviar_lote_via_servico(jobs)
+    
+    if resultado is None:
+        logger.info("Serviço de sessão indisponível, abrindo navegador próprio...")
+        return executar_envio_em_lote(
+            userdir=profile_dir,
+            jobs=jobs,
+            logger=logger,
+            modo_execucao=modo_execucao,
+            contatos=contatos
+        )
+    linha_do_tempo.atual().incorporar(resultado.pop("fases", None))
+    if not resultado.get("ok"):
+        raise Exception(resultado.get("erro") or "Falha no serviço de sessão")
+    logger.info("Lote realizado pelo serviço de sessão.")
+    return resultado["resultados"]
+
+def _anexos_de_execucao_anterior(db, task_id, quantidade, logger):
+    """
+    Anexos que já saíram na execução anterior desta tarefa, por item (None = nenhum).
+    Ao rodar de novo uma tarefa que falhou no meio, esses grupos não são reenviados.
+    """
+    if not task_id or db is None:
+        return [None] * quantidade
+    try:
+        anteriores = db.obter_resultado_lote(task_id)
+    except Exception as e:
+        logger.error(f"Não foi possível ler o resultado anterior: {e}")
+        return [None] * quantidade
+    if len(anteriores) != quantidade:
+        return [None] * quantidade
+    enviados = [None if r.get("ok") else r.get("anexos_enviados") for r in anteriores]
+    total = sum(len(e) for e in enviados if e)
+    if total:
+        logger.info(f"{total} anexo(s) já enviados na execução anterior não serão reenviados.")
+    return enviados
+
+def _salvar_linha_do_tempo(db, task_id, linha, logger):
+    """Grava as fases da execução (nunca derruba a tarefa por causa disso)."""
+    resumo = " | ".join(f"{f['fase']}={f['duracao_ms']}ms" for f in linha.fases if f.get("item") is None)
+    logger.info(f"Fases: {resumo}")
+    if not task_id or db is None:
+        return
+    try:
+        db.registrar_fases(task_id, linha.fases)
+    except Exception as e:
+        logger.error(f"Não foi possível gravar a linha do tempo: {e}")
 
 def main(json_path: str):
     """
@@ -72,7 +199,8 @@ def main(json_path: str):
     log_dir.mkdir(parents=True, exist_ok=True)
     
     task_name = Path(json_path).stem
-    logger = get_logger(task_name, log_dir / f"{task_name}.log")
+    log_file = log_dir / f"{task_name}.log"
+    logger = get_logger(task_name, log_file)
     
     logger.info("=" * 70)
     logger.info(f"EXECUTOR INICIADO | JSON: {json_path}")
@@ -80,9 +208,11 @@ def main(json_path: str):
     logger.info(f"sys.executable: {sys.executable}")
     logger.info(f"frozen: {getattr(sys, 'frozen', False)}")
     
+    linha = linha_do_tempo.iniciar()
+    task_id, db = None, None
     try:
         # ===== CARREGAR DADOS =====
-        with open(json_path, 'r', encoding='utf-8') as f:
+        with linha_do_tempo.fase("carregar_tarefa"), open(json_path, 'r', encoding='utf-8') as f:
             dados = json.load(f)
         
         task_id = dados.get("task_id")
@@ -90,28 +220,72 @@ def main(json_path: str):
         modo_execucao = 'manual' if task_id is None else 'auto'
         
         # ===== ATUALIZAR STATUS NO BANCO =====
-        db = get_db()
-        if task_id:
-            db.atualizar_status(task_id, "running")
+        with linha_do_tempo.fase("abrir_banco"):
+            db = get_db()
+            if task_id:
+                db.atualizar_status(task_id, "running")
         
         # ===== EXECUTAR AUTOMAÇÃO (ISOLADA) =====
-        profile_dir = get_whatsapp_profile_dir()
+        profile_dir = get_whatsapp_profile_dir(conta=dados.get("conta"))
         logger.info(f"Perfil: {profile_dir}")
         logger.info(f"Modo: {modo_execucao}")
         
-        executar_envio(
-            userdir=profile_dir,
-            target=dados["target"],
-            mode=dados["mode"],
-            message=dados.get("message"),
-            file_path=dados.get("file_path"),
-            logger=logger,
-            modo_execucao=modo_execucao
-        )
+        # Lote: a linha do banco (jobs_json) manda; "jobs" no JSON só vale para
+        # tarefas sem registro no banco (ex.: JSON montado à mão)
+        jobs_banco = db.obter_jobs(task_id) if task_id else None
+        if jobs_banco is not None or "jobs" in dados:
+            # ===== TAREFA EM LOTE =====
+            jobs = normalizar_jobs(dados if jobs_banco is None else {**dados, "jobs": jobs_banco})
+            logger.info(f"Lote com {len(jobs)} envio(s)")
+            for job, enviados in zip(jobs, _anexos_de_execucao_anterior(db, task_id, len(jobs), logger)):
+                if enviados:
+                    job["anexos_enviados"] = enviados
+            resultados = _executar_lote(jobs, profile_dir, modo_execucao, logger, contatos=db, log_file=log_file)
+            for job, r in zip(jobs, resultados):
+                # Falhou de novo antes dos anexos: continua valendo o que já tinha saído
+                if not r["ok"] and job.get("anexos_enviados") and not r.get("anexos_enviados"):
+                    r["anexos_enviados"] = job["anexos_enviados"]
+            
+            falhas = [r for r in resultados if not r["ok"]]
+            logger.info(f"Lote finalizado: {len(resultados) - len(falhas)} ok, {len(falhas)} falha(s)")
+            if task_id:
+                db.registrar_resultado_lote(task_id, resultados)
+                confirmados = [r for r in resultados if r["ok"]]
+                if confirmados:
+                    db.registrar_confirmacao(
+                        task_id,
+                        pior_status([r.get("status") for r in confirmados]),
+                        max(r.get("latencia_s") or 0 for r in confirmados)
+                    )
+            if falhas:
+                resumo = "; ".join(f"{r['target']}: {r['erro']}" for r in falhas[:10])
+                raise Exception(f"{len(falhas)} de {len(resultados)} envio(s) falharam: {resumo}")
+        else:
+            ja_enviados = _anexos_de_execucao_anterior(db, task_id, 1, logger)[0]
+            try:
+                confirmacao = _executar_unico(
+                    dados, profile_dir, modo_execucao, logger, contatos=db, ja_enviados=ja_enviados
+                ) or {}
+            except Exception as e:
+                # Guarda o que já saiu para a próxima execução não mandar em dobro
+                enviados = getattr(e, "enviados", None) or ja_enviados
+                if task_id and enviados:
+                    db.registrar_resultado_lote(task_id, [
+                        {"target": dados.get("target"), "ok": False, "erro": str(e), "anexos_enviados": enviados}
+                    ])
+                raise
+            if task_id and ja_enviados:
+                # Concluída: uma execução futura (reagendamento) envia tudo de novo
+                db.registrar_resultado_lote(task_id, [{"target": dados.get("target"), "ok": True, "erro": None}])
+            logger.info(f"Confirmação: {confirmacao.get('status')} em {confirmacao.get('latencia_s')}s")
+            if task_id:
+                db.registrar_confirmacao(task_id, confirmacao.get("status"), confirmacao.get("latencia_s"))
         
         # ===== SUCESSO =====
         if task_id:
             db.atualizar_status(task_id, "completed")
+        linha.encerrar("total")
+        _salvar_linha_do_tempo(db, task_id, linha, logger)
         
         logger.info("[OK] TAREFA CONCLUIDA COM SUCESSO")
         logger.info("=" * 70)
@@ -127,6 +301,8 @@ def main(json_path: str):
         
         if task_id:
             db.registrar_erro(task_id, str(e))
+        linha.encerrar("total", ok=False)
+        _salvar_linha_do_tempo(db, task_id, linha, logger)
         
         # Grava arquivo de status para GUI ler
         status_file = Path(json_path).with_suffix('.status')
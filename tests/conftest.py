@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Testes rodam a partir da raiz do projeto (mesmo esquema de imports do app.py/executor.py)
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
@@ -0,0 +1,109 @@
+import os
+import asyncio
+
+import pytest
+
+from core import automation_base
+from core.automation_base import agrupar_anexos, extrair_numero, pior_status, separar_arquivos, titulo_corresponde
+
+
+@pytest.fixture(autouse=True)
+def config_padrao(monkeypatch):
+    monkeypatch.setattr(automation_base, "get_config", lambda chave, padrao=None: padrao)
+
+
+def _arquivos(pasta, nomes, tamanho=1):
+    caminhos = []
+    for nome in nomes:
+        caminho = os.path.join(str(pasta), nome)
+        with open(caminho, "wb") as f:
+            f.write(b"x" * tamanho)
+        caminhos.append(caminho)
+    return caminhos
+
+
+def _nomes(grupos):
+    return [(is_media, [os.path.basename(c) for c in caminhos]) for is_media, caminhos in grupos]
+
+
+def test_agrupar_separa_midia_de_documento_na_ordem(tmp_path):
+    arquivos = _arquivos(tmp_path, ["a.pdf", "b.jpg", "c.docx", "d.mp4"])
+    assert _nomes(agrupar_anexos(arquivos)) == [
+        (False, ["a.pdf", "c.docx"]),
+        (True, ["b.jpg", "d.mp4"]),
+    ]
+
+
+def test_agrupar_respeita_limite_de_arquivos(tmp_path):
+    arquivos = _arquivos(tmp_path, ["1.jpg", "2.jpg", "3.jpg", "4.pdf"])
+    assert _nomes(agrupar_anexos(arquivos, max_arquivos=2)) == [
+        (True, ["1.jpg", "2.jpg"]),
+        (True, ["3.jpg"]),
+        (False, ["4.pdf"]),
+    ]
+
+
+def test_agrupar_respeita_limite_de_bytes(tmp_path):
+    arquivos = _arquivos(tmp_path, ["1.pdf", "2.pdf", "3.pdf"], tamanho=600)
+    assert _nomes(agrupar_anexos(arquivos, max_bytes=1000)) == [
+        (False, ["1.pdf"]), (False, ["2.pdf"]), (False, ["3.pdf"]),
+    ]
+
+
+def test_separar_arquivos_um_por_linha():
+    assert separar_arquivos('"/tmp/a.jpg"\n\n /tmp/b.pdf ') == [os.path.abspath("/tmp/a.jpg"), os.path.abspath("/tmp/b.pdf")]
+
+
+@pytest.mark.parametrize("target, esperado", [
+    ("+55 (11) 99999-9999", "5511999999999"),
+    ("5511999999999", "5511999999999"),
+    ("11999999999", "5511999999999"),
+    ("+1 415 555 0100", "14155550100"),
+    ("Fulano de Tal", None),
+    ("123", None),
+    ("", None),
+])
+def test_extrair_numero(target, esperado):
+    assert extrair_numero(target) == esperado
+
+
+@pytest.mark.parametrize("target, titulo, esperado", [
+    ("Fulano", "fulano de tal", True),
+    ("5511999999999", "+55 11 99999-9999", True),
+    ("Fulano", "Beltrano", False),
+    ("5511999999999", "+55 11 98888-7777", False),
+    ("12-34", "Grupo 1234", False),
+])
+def test_titulo_corresponde(target, titulo, esperado):
+    assert titulo_corresponde(target, titulo) is esperado
+
+
+def test_pior_status():
+    assert pior_status(["lida", "enviada", "entregue"]) == "enviada"
+    assert pior_status(["lida", None, "xyz"]) == "lida"
+    assert pior_status([None]) is None
+
+
+def test_api_sincrona_usa_um_unico_loop(monkeypatch):
+    from core import automation, automation_async
+    loops = []
+
+    async def registrar(*args, **kwargs):
+        loops.append(asyncio.get_running_loop())
+        return {"status": "enviada"}
+
+    async def abrir(*args, **kwargs):
+        await registrar()
+        return "pw", "context", "page"
+
+    monkeypatch.setattr(automation_async, "iniciar_driver", abrir)
+    for nome in ("enviar_na_pagina", "resetar_tela", "_fechar", "executar_envio", "executar_envio_em_lote"):
+        monkeypatch.setattr(automation_async, nome, registrar)
+
+    with automation.NavegadorSincrono("perfil") as nav:
+        assert nav.enviar("5511999999999", "text", "oi") == {"status": "enviada"}
+    automation.executar_envio("perfil", "5511999999999", "text", "oi")
+    automation.executar_envio_em_lote("perfil", [])
+
+    assert len(loops) == 6 and len(set(map(id, loops))) == 1
+    assert nav._page is None
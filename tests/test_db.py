@@ -0,0 +1,378 @@
+import datetime
+import sqlite3
+import threading
+
+import pytest
+
+from core import db as modulo_db
+from core.db import SchedulerDB, perfil_durabilidade
+
+BASE = datetime.datetime(2030, 1, 1, 12, 0)
+
+
+@pytest.fixture
+def banco(tmp_path):
+    banco = SchedulerDB(tmp_path / "scheduler.db", durabilidade="equilibrado")
+    yield banco
+    banco.fechar_conexao()
+
+
+def _novo(banco, nome, minutos=0, **extra):
+    return banco.adicionar(nome, "5511999999999", "text", BASE + datetime.timedelta(minutes=minutos),
+                           message="oi", **extra)
+
+
+# =============================
+# CONEXÕES
+# =============================
+def test_conexao_reaproveitada_por_thread(banco):
+    principal = banco._get_conn()
+    banco._liberar(principal)
+    assert banco._get_conn() is principal
+
+    outra = []
+    t = threading.Thread(target=lambda: outra.append(banco._get_conn()))
+    t.start()
+    t.join()
+    assert outra[0] is not principal
+
+
+def test_liberar_desfaz_transacao_esquecida(banco):
+    conn = banco._get_conn()
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("DELETE FROM agendamentos")
+    banco._liberar(conn)
+    assert not conn.in_transaction
+    assert _novo(banco, "depois") > 0
+
+
+def test_sem_reaproveitar_abre_conexao_nova(tmp_path):
+    banco = SchedulerDB(tmp_path / "x.db", reutilizar_conexao=False)
+    primeira = banco._get_conn()
+    banco._liberar(primeira)
+    assert banco._get_conn() is not primeira
+
+
+# =============================
+# DURABILIDADE
+# =============================
+@pytest.mark.parametrize("nome, esperado", [
+    ("paranoico", "paranoico"),
+    ("balanced", "equilibrado"),
+    ("PARANOID", "paranoico"),
+    ("inexistente", modulo_db.PERFIL_DURABILIDADE_PADRAO),
+])
+def test_perfil_durabilidade(nome, esperado):
+    assert perfil_durabilidade(nome) == esperado
+
+
+@pytest.mark.parametrize("perfil, synchronous", [("paranoico", 2), ("equilibrado", 1)])
+def test_perfil_define_pragmas_da_conexao(tmp_path, perfil, synchronous):
+    banco = SchedulerDB(tmp_path / "x.db", durabilidade=perfil)
+    conn = banco._get_conn()
+    try:
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == synchronous
+        assert conn.execute("PRAGMA wal_autocheckpoint").fetchone()[0] == \
+            modulo_db.PERFIS_DURABILIDADE[perfil]["wal_autocheckpoint"]
+    finally:
+        banco._liberar(conn)
+        banco.fechar_conexao()
+
+
+# =============================
+# MIGRAÇÕES
+# =============================
+def test_banco_novo_aplica_todas_as_migracoes(banco):
+    conn = banco._get_conn()
+    try:
+        versao = conn.execute("PRAGMA user_version").fetchone()[0]
+        colunas = {r[1] for r in conn.execute("PRAGMA table_info(agendamentos)")}
+    finally:
+        banco._liberar(conn)
+    assert versao == SchedulerDB.MIGRACOES[-1][0]
+    assert {"scheduled_ts", "jobs_json", "resultado_json", "envio_status"} <= colunas
+
+
+def test_reabrir_nao_reaplica_migracoes(tmp_path, capsys):
+    SchedulerDB(tmp_path / "x.db").fechar_conexao()
+    capsys.readouterr()
+    SchedulerDB(tmp_path / "x.db").fechar_conexao()
+    assert "Migração" not in capsys.readouterr().out
+
+
+def test_migra_banco_anterior_ao_controle_de_versao(tmp_path):
+    caminho = tmp_path / "antigo.db"
+    conn = sqlite3.connect(str(caminho))
+    conn.execute("""
+        CREATE TABLE agendamentos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_name TEXT UNIQUE NOT NULL,
+            target TEXT NOT NULL,
+            mode TEXT NOT NULL,
+            message TEXT,
+            file_path TEXT,
+            scheduled_time TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            json_path TEXT,
+            executed_at TEXT,
+            error_message TEXT
+        )
+    """)
+    conn.execute(
+        "INSERT INTO agendamentos (task_name, target, mode, scheduled_time, created_at) VALUES (?, ?, ?, ?, ?)",
+        ("legado", "Fulano", "text", BASE.isoformat(), BASE.isoformat())
+    )
+    conn.commit()
+    conn.close()
+
+    banco = SchedulerDB(caminho)
+    try:
+        registro = banco.obter_detalhes("legado")
+        assert registro["scheduled_ts"] == int(BASE.timestamp())
+        assert registro["jobs_json"] is None
+    finally:
+        banco.fechar_conexao()
+
+
+# =============================
+# PAGINAÇÃO POR CHAVE
+# =============================
+def _todas_as_paginas(banco, limite, **filtros):
+    linhas, cursor = [], None
+    while True:
+        pagina, cursor = banco.listar_pagina(limite=limite, cursor=cursor, **filtros)
+        linhas.extend(pagina)
+        if cursor is None:
+            return linhas
+
+
+@pytest.fixture
+def historico(banco):
+    # Datas repetidas (desempate pelo id) e uma data ilegível (scheduled_ts NULL)
+    for i, minutos in enumerate([5, 1, 5, 3, 0, 5, 2, 1]):
+        _novo(banco, f"t{i}", minutos, jobs=[{"target": "A"}, {"target": "B"}] if i == 3 else None)
+    conn = banco._get_conn()
+    try:
+        conn.execute("UPDATE agendamentos SET scheduled_ts = NULL WHERE task_name = 't4'")
+        conn.execute("UPDATE agendamentos SET status = 'completed' WHERE task_name IN ('t1', 't2', 't4')")
+        conn.commit()
+    finally:
+        banco._liberar(conn)
+    return banco
+
+
+def _esperado(banco, where="1 = 1", params=()):
+    conn = banco._get_conn()
+    try:
+        return [r[:8] for r in conn.execute(f"""
+            SELECT id, task_name, target, mode, scheduled_time, status, created_at,
+                json_array_length(jobs_json), scheduled_ts
+            FROM agendamentos WHERE {where}
+            ORDER BY scheduled_ts IS NULL, scheduled_ts DESC, id DESC
+        """, params)]
+    finally:
+        banco._liberar(conn)
+
+
+@pytest.mark.parametrize("limite", range(1, 10))
+def test_paginas_cobrem_tudo_sem_repetir(historico, limite):
+    assert _todas_as_paginas(historico, limite) == _esperado(historico)
+
+
+@pytest.mark.parametrize("limite", [1, 2, 5])
+def test_paginas_com_filtros(historico, limite):
+    assert _todas_as_paginas(historico, limite, status="completed") == \
+        _esperado(historico, "status = 'completed'")
+    assert _todas_as_paginas(historico, limite, status=["pending", "completed"]) == _esperado(historico)
+
+    desde, ate = BASE + datetime.timedelta(minutes=1), BASE + datetime.timedelta(minutes=5)
+    assert _todas_as_paginas(historico, limite, desde=desde, ate=ate) == _esperado(
+        historico, "scheduled_ts >= ? AND scheduled_ts < ?", (int(desde.timestamp()), int(ate.timestamp()))
+    )
+
+
+def test_insercao_entre_paginas_nao_repete_linhas(historico):
+    primeira, cursor = historico.listar_pagina(limite=3)
+    _novo(historico, "mais_recente", 60)
+    resto = _todas_as_paginas_a_partir(historico, cursor, 3)
+    ids = [r[0] for r in primeira + resto]
+    assert len(ids) == len(set(ids)) == len(_esperado(historico)) - 1
+
+
+def _todas_as_paginas_a_partir(banco, cursor, limite):
+    linhas = []
+    while cursor is not None:
+        pagina, cursor = banco.listar_pagina(limite=limite, cursor=cursor)
+        linhas.extend(pagina)
+    return linhas
+
+
+# =============================
+# REGISTRO DE ALTERAÇÕES
+# =============================
+def test_alteracoes_desde(banco):
+    assert banco.revisao_atual() == 0
+    a, b = _novo(banco, "a"), _novo(banco, "b")
+
+    revisao, linhas, excluidos = banco.alteracoes_desde(0)
+    assert [r[0] for r in linhas] == [a, b] and excluidos == []
+    assert revisao == banco.revisao_atual()
+
+    banco.atualizar_status(a, "completed")
+    banco.deletar(b)
+    nova, linhas, excluidos = banco.alteracoes_desde(revisao)
+    assert [(r[0], r[5]) for r in linhas] == [(a, "completed")]
+    assert excluidos == [b]
+    assert banco.alteracoes_desde(nova) == (nova, [], [])
+
+
+def test_coluna_fora_do_historico_nao_gera_revisao(banco):
+    task_id = _novo(banco, "a")
+    revisao = banco.revisao_atual()
+    banco.registrar_confirmacao(task_id, "entregue", 1.5)
+    banco.registrar_resultado_lote(task_id, [{"ok": True}])
+    assert banco.revisao_atual() == revisao
+
+
+def _lote(nome, minutos=0, **extra):
+    item = {"task_name": nome, "target": "5511999999999", "mode": "text",
+            "scheduled_time": BASE + datetime.timedelta(minutes=minutos), "message": "oi"}
+    item.update(extra)
+    return item
+
+
+# =============================
+# OPERAÇÕES EM LOTE
+# =============================
+def test_adicionar_em_lote_informa_conflitos(banco):
+    _novo(banco, "existente")
+    ids, conflitos = banco.adicionar_em_lote([
+        _lote("a"),
+        _lote("existente"),
+        _lote("a"),
+        _lote("modo_ruim", mode="video"),
+        {"task_name": "sem_target", "mode": "text", "scheduled_time": BASE},
+        _lote("b"),
+    ])
+
+    assert ids[1] == ids[2] == ids[3] == ids[4] == -1
+    assert banco.obter_por_id(ids[0])["task_name"] == "a"
+    assert banco.obter_por_id(ids[5])["task_name"] == "b"
+    erros = {c["indice"]: c["erro"] for c in conflitos}
+    assert erros[1] == "task_name já existe"
+    assert erros[2] == "task_name repetido no lote"
+    assert erros[3].startswith("restrição violada")
+    assert erros[4].startswith("dados inválidos")
+    assert [c["indice"] for c in conflitos] == [1, 2, 3, 4]
+
+
+def test_adicionar_em_lote_nome_repetido_apos_linha_rejeitada(banco):
+    # A primeira "x" cai no CHECK; o id gravado é o da segunda, e a terceira é a repetida
+    ids, conflitos = banco.adicionar_em_lote([
+        _lote("x", mode="video", target="1"),
+        _lote("x", target="2"),
+        _lote("x", target="3"),
+    ])
+    assert ids[0] == ids[2] == -1
+    assert banco.obter_por_id(ids[1])["target"] == "2"
+    assert [(c["indice"], c["erro"]) for c in conflitos] == [
+        (0, "restrição violada (mode inválido ou campo obrigatório vazio)"),
+        (2, "task_name repetido no lote"),
+    ]
+
+
+def test_adicionar_em_lote_grava_jobs(banco):
+    jobs = [{"target": "A", "mode": "text", "message": "oi", "file_path": None}]
+    ids, _ = banco.adicionar_em_lote([_lote("lote", jobs=jobs)])
+    assert banco.obter_por_id(ids[0])["jobs_json"] is not None
+
+
+def test_atualizar_status_em_lote(banco):
+    a, b = _novo(banco, "a"), _novo(banco, "b")
+    ids, conflitos = banco.atualizar_status_em_lote([
+        (a, "running"),
+        ("b", "completed"),
+        (9999, "failed"),
+        (a, "inventado"),
+        (a, "failed", "erro x"),
+    ])
+
+    assert ids == [a, b, -1, -1, a]
+    assert [(c["indice"], c["erro"]) for c in conflitos] == [
+        (2, "agendamento não encontrado"),
+        (3, "status inválido: 'inventado'"),
+    ]
+    assert banco.obter_por_id(a)["status"] == "failed"
+    assert banco.obter_por_id(a)["error_message"] == "erro x"
+    assert banco.obter_por_id(b)["status"] == "completed"
+
+
+def test_atualizar_status_em_lote_status_invalido(banco):
+    a = _novo(banco, "a")
+    ids, conflitos = banco.atualizar_status_em_lote([(a, "inventado")])
+    assert ids == [-1]
+    assert conflitos[0]["erro"] == "status inválido: 'inventado'"
+    assert banco.obter_por_id(a)["status"] == "pending"
+
+
+def test_atualizar_status_em_lote_ocorrencia_repetida_rejeitada(banco):
+    a = _novo(banco, "a")
+    ids, conflitos = banco.atualizar_status_em_lote([(a, "inventado"), (a, "completed")])
+    assert ids == [-1, a]
+    assert [c["indice"] for c in conflitos] == [0]
+    assert banco.obter_por_id(a)["status"] == "completed"
+
+
+@pytest.mark.parametrize("ordem, esperado", [
+    ([("id", "failed"), ("nome", "completed")], "completed"),
+    ([("nome", "completed"), ("id", "failed")], "failed"),
+])
+def test_atualizar_status_em_lote_vale_a_ultima_por_id_ou_nome(banco, ordem, esperado):
+    a = _novo(banco, "a")
+    chave = {"id": a, "nome": "a"}
+    ids, conflitos = banco.atualizar_status_em_lote([(chave[k], status) for k, status in ordem])
+    assert ids == [a, a] and conflitos == []
+    assert banco.obter_por_id(a)["status"] == esperado
+
+
+def test_insercao_em_lote_gera_revisoes(banco):
+    ids, _ = banco.adicionar_em_lote([_lote("a"), _lote("b")])
+    _, linhas, _ = banco.alteracoes_desde(0)
+    assert sorted(r[0] for r in linhas) == sorted(ids)
+
+
+# =============================
+# RESULTADO POR ITEM
+# =============================
+def test_resultado_lote_e_limpo_ao_editar(banco):
+    task_id = _novo(banco, "a")
+    assert banco.obter_resultado_lote(task_id) == []
+
+    resultados = [{"target": "A", "ok": False, "anexos_enviados": ["/x/a.jpg"]}]
+    banco.registrar_resultado_lote(task_id, resultados)
+    assert banco.obter_resultado_lote(task_id) == resultados
+
+    banco.atualizar_agendamento_completo(task_id, "A", "text", "oi", None, BASE)
+    assert banco.obter_resultado_lote(task_id) == []
+
+
+# =============================
+# TAREFAS EM LOTE
+# =============================
+def test_obter_jobs(banco):
+    jobs = [{"target": "A", "mode": "text", "message": "oi"}, {"target": "B"}]
+    lote, unico = _novo(banco, "lote", jobs=jobs), _novo(banco, "unico")
+    assert banco.obter_jobs(lote) == jobs
+    assert banco.obter_jobs(str(lote)) == jobs
+    assert banco.obter_jobs(unico) is None
+    assert banco.obter_jobs(9999) is None
+
+
+def test_historico_traz_total_de_envios(banco):
+    lote = _novo(banco, "lote", jobs=[{"target": "A"}, {"target": "B"}, {"target": "C"}])
+    unico = _novo(banco, "unico", 1)
+    totais = {r[0]: r[7] for r in banco.listar_pagina()[0]}
+    assert totais == {lote: 3, unico: None}
+    assert {r[0]: r[7] for r in banco.listar_todos()} == totais
+    assert {r[0]: r[7] for r in banco.alteracoes_desde(0)[1]} == totais
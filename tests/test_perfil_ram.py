@@ -0,0 +1,168 @@
+import os
+
+import pytest
+
+from core import perfil_ram
+from core.perfil_ram import (
+    MARCADOR_COMPLETO, SUFIXO_ANTIGO, SUFIXO_NOVO, PerfilEmRam, recuperar,
+)
+
+
+def _criar(pasta, conteudo, completo=False):
+    os.makedirs(os.path.join(pasta, "Default"), exist_ok=True)
+    with open(os.path.join(pasta, "Default", "Cookies"), "w") as f:
+        f.write(conteudo)
+    if completo:
+        with open(os.path.join(pasta, MARCADOR_COMPLETO), "w") as f:
+            f.write("ok")
+
+
+def _conteudo(pasta):
+    with open(os.path.join(pasta, "Default", "Cookies")) as f:
+        return f.read()
+
+
+@pytest.fixture
+def perfil(tmp_path):
+    return str(tmp_path / "perfil")
+
+
+def _restos(perfil):
+    return [p for p in (perfil + SUFIXO_NOVO, perfil + SUFIXO_ANTIGO) if os.path.exists(p)]
+
+
+# =============================
+# RECUPERAÇÃO DE TROCA INTERROMPIDA
+# =============================
+def test_morreu_entre_as_renomeacoes_aplica_copia_nova(perfil):
+    # perfil -> perfil.antigo feito, perfil.novo -> perfil não
+    _criar(perfil + SUFIXO_ANTIGO, "velho")
+    _criar(perfil + SUFIXO_NOVO, "novo", completo=True)
+    recuperar(perfil)
+    assert _conteudo(perfil) == "novo"
+    assert not os.path.exists(os.path.join(perfil, MARCADOR_COMPLETO))
+    assert _restos(perfil) == []
+
+
+def test_morreu_antes_da_primeira_renomeacao_aplica_copia_pronta(perfil):
+    _criar(perfil, "velho")
+    _criar(perfil + SUFIXO_NOVO, "novo", completo=True)
+    recuperar(perfil)
+    assert _conteudo(perfil) == "novo"
+    assert _restos(perfil) == []
+
+
+def test_copia_incompleta_e_descartada(perfil):
+    _criar(perfil, "velho")
+    _criar(perfil + SUFIXO_NOVO, "pela metade")
+    recuperar(perfil)
+    assert _conteudo(perfil) == "velho"
+    assert _restos(perfil) == []
+
+
+def test_sem_perfil_e_copia_incompleta_restaura_o_antigo(perfil):
+    _criar(perfil + SUFIXO_ANTIGO, "velho")
+    _criar(perfil + SUFIXO_NOVO, "pela metade")
+    recuperar(perfil)
+    assert _conteudo(perfil) == "velho"
+    assert _restos(perfil) == []
+
+
+def test_morreu_depois_das_renomeacoes_apaga_o_antigo(perfil):
+    _criar(perfil, "novo", completo=True)
+    _criar(perfil + SUFIXO_ANTIGO, "velho")
+    recuperar(perfil)
+    assert _conteudo(perfil) == "novo"
+    assert not os.path.exists(os.path.join(perfil, MARCADOR_COMPLETO))
+    assert _restos(perfil) == []
+
+
+# =============================
+# CICLO COMPLETO
+# =============================
+def test_preparar_e_sincronizar(perfil, tmp_path):
+    _criar(perfil, "sessao 1")
+    os.makedirs(os.path.join(perfil, "Default", "Cache"))
+
+    copia = PerfilEmRam(perfil, str(tmp_path / "ram"))
+    caminho = copia.preparar()
+    assert _conteudo(caminho) == "sessao 1"
+    assert not os.path.exists(os.path.join(caminho, "Default", "Cache"))
+    with pytest.raises(RuntimeError):
+        PerfilEmRam(perfil, str(tmp_path / "ram2")).preparar()
+
+    _criar(caminho, "sessao 2")
+    copia.sincronizar()
+    assert _conteudo(perfil) == "sessao 2"
+    assert not os.path.exists(caminho)
+    assert not os.path.exists(copia.trava)
+    assert _restos(perfil) == []
+
+
+def test_falha_na_troca_aplica_a_copia_completa(perfil, tmp_path, monkeypatch):
+    _criar(perfil, "sessao 1")
+    copia = PerfilEmRam(perfil, str(tmp_path / "ram"))
+    _criar(copia.preparar(), "sessao 2")
+
+    # A segunda renomeação (perfil.novo -> perfil) falha uma vez: o perfil real
+    # já foi para perfil.antigo e recuperar() precisa aplicar a cópia completa
+    replace, falhas = os.replace, []
+
+    def falhar_na_segunda(origem, destino):
+        if origem.endswith(SUFIXO_NOVO) and not falhas:
+            falhas.append(origem)
+            raise OSError("disco cheio")
+        return replace(origem, destino)
+
+    monkeypatch.setattr(perfil_ram.os, "replace", falhar_na_segunda)
+    copia.sincronizar()
+
+    assert falhas
+    assert _conteudo(perfil) == "sessao 2"
+    assert _restos(perfil) == []
+    assert not os.path.exists(copia.trava)
+
+
+# =============================
+# SINCRONIZAÇÃO INCREMENTAL
+# =============================
+def _arquivo(pasta, relativo, conteudo):
+    caminho = os.path.join(pasta, relativo)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, "w") as f:
+        f.write(conteudo)
+    return caminho
+
+
+@pytest.fixture
+def com_cache(perfil):
+    _criar(perfil, "sessao 1")
+    _arquivo(perfil, os.path.join("Default", "Preferences"), "prefs")
+    _arquivo(perfil, os.path.join("Default", "Apagado"), "some")
+    return _arquivo(perfil, os.path.join("Default", "Cache", "dados"), "cache")
+
+
+def test_sincronizar_copia_so_o_que_mudou(perfil, tmp_path, com_cache):
+    inode_prefs = os.stat(os.path.join(perfil, "Default", "Preferences")).st_ino
+    copia = PerfilEmRam(perfil, str(tmp_path / "ram"))
+    caminho = copia.preparar()
+    _criar(caminho, "sessao 2 maior")
+    os.remove(os.path.join(caminho, "Default", "Apagado"))
+    copia.sincronizar()
+
+    assert _conteudo(perfil) == "sessao 2 maior"
+    # Inalterado: o mesmo arquivo do perfil real (hard link), sem copiar bytes
+    assert os.stat(os.path.join(perfil, "Default", "Preferences")).st_ino == inode_prefs
+    assert not os.path.exists(os.path.join(perfil, "Default", "Apagado"))
+    # Caches continuam no perfil real por padrão
+    assert os.path.exists(com_cache)
+
+
+def test_limpar_caches_e_opcional(perfil, tmp_path, com_cache, monkeypatch):
+    monkeypatch.setattr(perfil_ram, "get_config", lambda chave, padrao=None: {"limpar_caches": True})
+    copia = PerfilEmRam(perfil, str(tmp_path / "ram"))
+    copia.preparar()
+    copia.sincronizar()
+
+    assert _conteudo(perfil) == "sessao 1"
+    assert not os.path.exists(com_cache)
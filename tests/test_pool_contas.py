@@ -0,0 +1,48 @@
+import pytest
+
+from core import pool_contas, session_service, manutencao_perfil
+from core.contas import CONTA_PADRAO
+from core.pool_contas import PoolContas
+
+
+@pytest.fixture
+def perfil_livre(monkeypatch, tmp_path):
+    monkeypatch.setattr(pool_contas, "perfil_da_conta", lambda nome=None: str(tmp_path / (nome or CONTA_PADRAO)))
+    monkeypatch.setattr(pool_contas, "acumular_estatisticas", lambda stats: None)
+    monkeypatch.setattr(manutencao_perfil, "perfil_em_uso", lambda perfil: False)
+
+
+def test_principal_vai_pelo_servico_quando_ativo(monkeypatch, perfil_livre):
+    pedidos = []
+
+    def servico(jobs, timeout=None):
+        pedidos.append(jobs)
+        job = jobs[0]
+        if job["target"] == "ruim":
+            return {"ok": True, "resultados": [{"target": "ruim", "ok": False, "erro": "contato não encontrado"}], "fases": []}
+        return {"ok": True, "resultados": [{"target": job["target"], "ok": True, "erro": None, "status": "enviada"}],
+                "fases": [{"fase": "enviar", "inicio_ms": 0, "duracao_ms": 5, "ok": 1}]}
+
+    monkeypatch.setattr(session_service, "servico_ativo", lambda: True)
+    monkeypatch.setattr(session_service, "enviar_lote_via_servico", servico)
+
+    jobs = [{"target": "A", "mode": "text", "message": "oi"}, {"target": "ruim", "mode": "text", "message": "oi"}]
+    resultados, stats = PoolContas(contas=[CONTA_PADRAO]).executar(jobs)
+
+    assert [len(p) for p in pedidos] == [1, 1]
+    assert [(r["target"], r["ok"], r["conta"]) for r in resultados] == [
+        ("A", True, CONTA_PADRAO), ("ruim", False, CONTA_PADRAO),
+    ]
+    assert resultados[0]["fases"][0]["fase"] == "enviar"
+    assert stats[CONTA_PADRAO]["enviados"] == 1 and stats[CONTA_PADRAO]["falhas"] == 1
+
+
+def test_principal_fica_fora_com_perfil_em_uso(monkeypatch, perfil_livre):
+    monkeypatch.setattr(session_service, "servico_ativo", lambda: False)
+    monkeypatch.setattr(manutencao_perfil, "perfil_em_uso", lambda perfil: True)
+
+    resultados, stats = PoolContas(contas=[CONTA_PADRAO]).executar([{"target": "A", "mode": "text", "message": "oi"}])
+
+    assert stats == {}
+    assert resultados[0]["ok"] is False
+    assert resultados[0]["erro"].startswith("Conta indisponível")
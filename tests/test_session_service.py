@@ -0,0 +1,83 @@
+import json
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from core import automation_async, session_service
+from core.session_service import ServicoSessao
+
+
+@pytest.fixture
+def arquivo_servico(monkeypatch, tmp_path):
+    caminho = str(tmp_path / "session_service.json")
+    monkeypatch.setattr(session_service, "SERVICE_FILE", caminho)
+    return caminho
+
+
+@pytest.fixture
+def servico(monkeypatch, arquivo_servico):
+    pedidos = []
+
+    async def abrir(self):
+        self.page = "pagina"
+
+    async def nada(*args, **kwargs):
+        return None
+
+    async def enviar_na_pagina(page, target, mode, message=None, file_path=None, logger=None, contatos=None, ja_enviados=None):
+        pedidos.append((page, target, mode, message, ja_enviados))
+        if target == "ruim":
+            raise Exception("contato não encontrado")
+        return {"status": "enviada", "latencia_s": 0.5}
+
+    monkeypatch.setattr(ServicoSessao, "_abrir_navegador", abrir)
+    monkeypatch.setattr(ServicoSessao, "_fechar_navegador", nada)
+    monkeypatch.setattr(ServicoSessao, "_garantir_sessao", nada)
+    monkeypatch.setattr(ServicoSessao, "_indice_contatos", lambda self: None)
+    monkeypatch.setattr(automation_async, "enviar_na_pagina", enviar_na_pagina)
+    monkeypatch.setattr(automation_async, "resetar_tela", nada)
+
+    thread = threading.Thread(target=ServicoSessao("perfil", logger=lambda m: None).executar, daemon=True)
+    thread.start()
+    limite = time.time() + 10
+    while not os.path.exists(arquivo_servico):
+        assert time.time() < limite and thread.is_alive(), "serviço não subiu"
+        time.sleep(0.02)
+    yield thread, pedidos
+    if thread.is_alive():
+        session_service.parar_servico()
+        thread.join(10)
+
+
+def test_ping_enviar_e_encerrar(servico, arquivo_servico):
+    thread, pedidos = servico
+    assert session_service.servico_ativo()
+
+    resposta = session_service.enviar_via_servico("5511999999999", "text", "oi", ja_enviados=["a.jpg"])
+    assert resposta["ok"] is True and resposta["erro"] is None
+    assert (resposta["status"], resposta["latencia_s"]) == ("enviada", 0.5)
+    assert pedidos == [("pagina", "5511999999999", "text", "oi", ["a.jpg"])]
+
+    falha = session_service.enviar_via_servico("ruim", "text", "oi")
+    assert falha["ok"] is False and falha["erro"] == "contato não encontrado"
+
+    assert session_service.parar_servico() == {"ok": True}
+    thread.join(10)
+    assert not thread.is_alive()
+    assert not os.path.exists(arquivo_servico)
+    assert session_service.enviar_via_servico("5511999999999", "text", "oi") is None
+
+
+def test_arquivo_orfao_cai_no_fluxo_antigo(arquivo_servico):
+    # Porta de um serviço que morreu sem apagar o arquivo
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        porta = s.getsockname()[1]
+    with open(arquivo_servico, "w", encoding="utf-8") as f:
+        json.dump({"porta": porta, "authkey": "00" * 16, "pid": 0}, f)
+
+    assert session_service.enviar_via_servico("5511999999999", "text", "oi") is None
+    assert session_service.servico_ativo() is False
@@ -10,13 +10,13 @@ from datetime import datetime, timedelta
 from tkinter import filedialog, messagebox
 
 import customtkinter as ctk
-from tkcalendar import Calendar
 
 # Importações do Core (Assumindo estrutura correta baseada no seu código original)
-from core.db import db
-from core import automation, windows_scheduler
+# Banco, agendador do Windows e tkcalendar carregam no primeiro uso (abertura mais rápida)
+from core.db import get_db, SchedulerDB
 from core.automation import contador_execucao 
 from core.paths import get_whatsapp_profile_dir, get_app_base_dir
+from core import tempo_inicio
 
 # --- Constantes ---
 BASE_DIR = get_app_base_dir()
@@ -26,6 +26,17 @@ GEOMETRY_FILE = os.path.join(BASE_DIR, "data", "window_pos.txt")
 
 DEBUG_LOG = os.path.join(BASE_DIR, "gui_sync_debug.log")
 
+# Histórico: agendamentos carregados por vez ("Carregar mais" traz a próxima página)
+PAGINA_HISTORICO = 50
+FILTROS_STATUS = {
+    "Todos": None,
+    "Pendentes": "pending",
+    "Executando": "running",
+    "Concluídos": "completed",
+    "Falhas": "failed",
+    "Cancelados": "cancelled",
+}
+
 def debug_log(msg):
     """Helper para log de debug de sincronização"""
     try:
@@ -67,6 +78,9 @@ class App(ctk.CTk):
         # --- Variáveis de Estado ---
         self.file_path = None
         self.cards_agendamentos = {}
+        # Histórico exibido: chave para a próxima página e última revisão do banco aplicada
+        self.cursor_historico = None
+        self.revisao_historico = 0
         self.temp_edit_file = None # Variável temporária para janela de edição
 
         # cache de estados para detectar mudança
@@ -91,14 +105,27 @@ class App(ctk.CTk):
 
         self._setup_envio_tab()
         self._setup_gestao_tab()
+        tempo_inicio.marcar("layout")
         
+        # --- Eventos e Loop ---
+        self.protocol("WM_DELETE_WINDOW", self._ao_fechar)
+        # Carga inicial (banco) só depois da janela aparecer
+        self._janela_exibida = False
+        self.bind("<Map>", self._ao_exibir_janela, add="+")
+
+    def _ao_exibir_janela(self, event=None):
+        if self._janela_exibida or event is None or event.widget is not self:
+            return
+        self._janela_exibida = True
+        tempo_inicio.marcar("janela")
+        tempo_inicio.registrar()
+        self.after(10, self._carga_inicial)
+
+    def _carga_inicial(self):
         # --- Carga Inicial de Dados ---
         self.atualizar_contador_exibicao()
         self._carregar_agendamentos()
-        
-        # --- Eventos e Loop ---
-        self.protocol("WM_DELETE_WINDOW", self._ao_fechar)
-        # Inicia loop de atualização após 5s
+        # Inicia loop de atualização após 2s
         self.after(2000, self._loop_atualizacao)
 
     # =========================================
@@ -162,7 +189,7 @@ class App(ctk.CTk):
     def _loop_atualizacao(self):
         """Loop silencioso de atualização a cada 2 segundos."""
         try:
-            self._carregar_agendamentos()
+            self._sincronizar_agendamentos()
             self.atualizar_contador_exibicao()
         except Exception as e:
             import traceback
@@ -217,6 +244,7 @@ class App(ctk.CTk):
         top.attributes("-topmost", True)
         self._aplicar_icone(top)
 
+        from tkcalendar import Calendar
         cal = Calendar(top, selectmode='day', date_pattern='dd/mm/yyyy',
                        background=self.colors["hover"],
                        selectbackground=self.colors["hover"],
@@ -254,6 +282,9 @@ class App(ctk.CTk):
         ctk.CTkLabel(tab, text="Contato / Número:", font=("Roboto", 12)).pack(anchor="w", padx=15, pady=(5, 0))
         self.target_input = ctk.CTkEntry(tab, placeholder_text="Ex: 5511999999999 / Tips Basic", height=35)
         self.target_input.pack(fill="x", padx=10, pady=5)
+        self.target_input.bind("<KeyRelease>", self._atualizar_sugestoes_contato)
+        # Sugestões do índice de contatos (só aparece quando há resultados)
+        self.sugestoes_frame = ctk.CTkFrame(tab, fg_color="transparent")
 
         self.mode_select = ctk.CTkOptionMenu(tab, values=["Somente texto", "Somente arquivo", "Arquivo + texto"], 
                                            command=self._on_mode_change, 
@@ -303,6 +334,36 @@ class App(ctk.CTk):
                       fg_color=self.colors["primary"], hover_color=self.colors["hover"], 
                       command=self._schedule_task).pack(side="left", expand=True, padx=5)
 
+    def _atualizar_sugestoes_contato(self, event=None):
+        """Autocompletar do contato a partir do índice de contatos já resolvidos."""
+        if event is not None and event.keysym in ("Left", "Right", "Up", "Down", "Tab", "Shift_L", "Shift_R", "Control_L", "Control_R"):
+            return
+        for w in self.sugestoes_frame.winfo_children():
+            w.destroy()
+
+        texto = self.target_input.get().strip()
+        sugestoes = []
+        if len(texto) >= 2 and (event is None or event.keysym != "Escape"):
+            try: sugestoes = [sug for sug in get_db().buscar_contatos(texto, 4) if sug[0] != texto.lower()]
+            except Exception as e: debug_log(f"Erro ao buscar contatos: {e}")
+
+        if not sugestoes:
+            self.sugestoes_frame.pack_forget()
+            return
+
+        for target, nome, numero in sugestoes:
+            rotulo = f"📇 {nome or target}" + (f"  ·  {numero}" if numero else "")
+            ctk.CTkButton(self.sugestoes_frame, text=rotulo, height=24, anchor="w",
+                          fg_color="transparent", border_width=1, border_color=self.colors["primary"],
+                          text_color=("gray10", "gray90"), hover_color=self.colors["hover"],
+                          command=lambda t=target: self._escolher_sugestao_contato(t)).pack(fill="x", pady=1)
+        self.sugestoes_frame.pack(fill="x", padx=10, after=self.target_input)
+
+    def _escolher_sugestao_contato(self, target):
+        self.target_input.delete(0, 'end')
+        self.target_input.insert(0, target)
+        self.sugestoes_frame.pack_forget()
+
     def _setup_placeholder(self, textbox, placeholder_text):
         """Lógica para placeholder em caixa de texto multiline"""
         textbox.insert("0.0", placeholder_text)
@@ -338,6 +399,7 @@ class App(ctk.CTk):
 
     def _reset_fields(self):
         self.target_input.delete(0, 'end')
+        self.sugestoes_frame.pack_forget()
         self.message_input.configure(state="normal")
         self.message_input.delete("1.0", "end")
         self.file_path = None
@@ -515,7 +577,7 @@ class App(ctk.CTk):
             if dt < datetime.now(): return messagebox.showerror("Erro", "O horário deve ser no futuro.")
             
             task_name = f"ZapTask_{int(datetime.now().timestamp())}"
-            t_id = db.adicionar(task_name=task_name, target=target, mode=mode, message=message, 
+            t_id = get_db().adicionar(task_name=task_name, target=target, mode=mode, message=message, 
                                 file_path=self.file_path, scheduled_time=dt)
 
             if not t_id or t_id == -1:
@@ -537,14 +599,17 @@ class App(ctk.CTk):
             
             if suc:
                 self.after(0, lambda: messagebox.showinfo("Agendado", "Tarefa criada com sucesso!"))
-                self.after(0, self._carregar_agendamentos)
+                self.after(0, self._sincronizar_agendamentos)
                 self.after(0, self._reset_fields)
             else:
-                db.deletar(t_id)
+                get_db().deletar(t_id)
                 self.after(0, lambda: messagebox.showerror("Erro", f"Falha no Agendador:\n{msg}"))
         except Exception as e:
-            db.deletar(t_id)
+            get_db().deletar(t_id)
             self.after(0, lambda: messagebox.showerror("Erro", f"Erro interno:\n{str(e)}"))
+        finally:
+            # Cada thread tem a sua conexão com o banco: fecha a desta antes de terminar
+            get_db().fechar_conexao()
 
     # =========================================
     #            ABA 2: GESTÃO E HISTÓRICO
@@ -564,74 +629,183 @@ class App(ctk.CTk):
         )
         self.sync_label.pack(side="right", padx=10)
 
+        self.filtro_status = ctk.CTkOptionMenu(header, values=list(FILTROS_STATUS), width=130,
+                                               command=self._ao_mudar_filtro,
+                                               fg_color=self.colors["primary"], button_color=self.colors["primary"],
+                                               button_hover_color=self.colors["hover"])
+        self.filtro_status.pack(side="left", padx=10, pady=5)
+
         self.scrollable_frame = ctk.CTkScrollableFrame(tab, label_text="Histórico")
-        self.scrollable_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        self.scrollable_frame.pack(fill="both", expand=True, padx=10, pady=(10, 5))
+
+        self.btn_carregar_mais = ctk.CTkButton(tab, text="Carregar mais", state="disabled",
+                                               fg_color=self.colors["primary"], hover_color=self.colors["hover"],
+                                               command=self._carregar_mais_agendamentos)
+        self.btn_carregar_mais.pack(pady=(0, 10))
+
+    def _status_filtrado(self):
+        return FILTROS_STATUS.get(self.filtro_status.get()) if hasattr(self, 'filtro_status') else None
+
+    def _ao_mudar_filtro(self, _valor=None):
+        """Novo filtro: volta para a primeira página."""
+        self._carregar_agendamentos()
+
+    def _carregar_mais_agendamentos(self):
+        """Busca só a próxima página (a partir do cursor) e acrescenta os cards no fim."""
+        if self.cursor_historico is None:
+            return
+        try:
+            linhas, self.cursor_historico = get_db().listar_pagina(
+                limite=PAGINA_HISTORICO, cursor=self.cursor_historico, status=self._status_filtrado()
+            )
+            for row in linhas:
+                if row[0] not in self.cards_agendamentos:
+                    self._criar_card_agendamento(row)
+            self._atualizar_botao_carregar_mais()
+        except Exception as e:
+            messagebox.showerror("Erro", str(e))
+
+    def _atualizar_botao_carregar_mais(self):
+        self.btn_carregar_mais.configure(state="normal" if self.cursor_historico is not None else "disabled")
+
+    @staticmethod
+    def _chave(ts, t_id):
+        """Chave de ordenação do histórico (mais recentes primeiro); data ilegível vai para o fim."""
+        return (ts if ts is not None else float("-inf"), t_id)
+
+    def _chave_linha(self, row):
+        return self._chave(SchedulerDB._epoch(row[4]), row[0])
+
+    def _na_janela(self, row):
+        """A linha cabe no trecho do histórico já exibido (filtro + páginas carregadas)?"""
+        status = self._status_filtrado()
+        if status and str(row[5]).lower() != status:
+            return False
+        return self.cursor_historico is None or self._chave_linha(row) >= self._chave(*self.cursor_historico)
+
+    def _dados_card(self, row):
+        """(data amigável, status em minúsculas, cor do status) de uma linha do histórico."""
+        status_colors = {
+            "pending": self.colors["gray"], 
+            "running": "#2196F3", 
+            "completed": self.colors["success"], 
+            "failed": self.colors["danger"],
+            "cancelled": "#ff9800"
+        }
+        status_lower = str(row[5]).lower()
+        try: dt_amigavel = datetime.fromisoformat(row[4]).strftime("%d/%m/%Y %H:%M")
+        except: dt_amigavel = row[4]
+        return dt_amigavel, status_lower, status_colors.get(status_lower, self.colors["gray"])
+
+    @staticmethod
+    def _texto_alvo(row):
+        """Destino exibido no card: o contato, ou a quantidade de envios de uma tarefa em lote."""
+        if row[7]:
+            return f"📦 Lote: {row[7]} envios"
+        return f"📱 {row[2]}"
+
+    def _marcar_sincronizado(self):
+        self.sync_label.configure(
+            text=f"✅ Última atualização: {datetime.now().strftime('%H:%M:%S')}", 
+            text_color="green"
+        )
 
     def _carregar_agendamentos(self):
-        """Atualização Inteligente: Só mexe no DOM se houver mudanças."""
+        """Carga completa da primeira página (abertura da janela e troca de filtro)."""
         try:
-            if hasattr(self, 'sync_label'):
-                self.sync_label.configure(text="🔄 Atualizando...", text_color="orange")
-            agendamentos = db.listar_todos()
-            ids_atuais = [row[0] for row in agendamentos]
-        
-            # 1. Remove itens deletados
-            for t_id in list(self.cards_agendamentos.keys()):
-                if t_id not in ids_atuais:
-                    self.cards_agendamentos[t_id]['frame'].destroy()
-                    del self.cards_agendamentos[t_id]
-            
-            status_colors = {
-                "pending": self.colors["gray"], 
-                "running": "#2196F3", 
-                "completed": self.colors["success"], 
-                "failed": self.colors["danger"],
-                "cancelled": "#ff9800"
-            }
-
-            for row in agendamentos:
-                t_id, _, target, _, sched_time, status = row[0], row[1], row[2], row[3], row[4], row[5]
-                status_lower = str(status).lower()
-                cor = status_colors.get(status_lower, self.colors["gray"])
-                
-                try: dt_amigavel = datetime.fromisoformat(sched_time).strftime("%d/%m/%Y %H:%M")
-                except: dt_amigavel = sched_time
-
-                # 2. Atualiza existentes (Sem piscar a tela)
-                if t_id in self.cards_agendamentos:
-                    card = self.cards_agendamentos[t_id]
-                    if card['status_str'] != status_lower:
-                        card['label_status'].configure(text=status_lower.upper(), text_color=cor)
-                        card['status_str'] = status_lower
-                        state = "normal" if status_lower != "running" else "disabled"
-                        card['btn_edit'].configure(state=state)
-                        card['btn_del'].configure(state=state)
-                    
-                    if card['label_target'].cget("text") != f"📱 {target}":
-                        card['label_target'].configure(text=f"📱 {target}")
-                    if card['label_date'].cget("text") != f"📅 {dt_amigavel}":
-                        card['label_date'].configure(text=f"📅 {dt_amigavel}")
-
-                # 3. Cria novos
+            self.sync_label.configure(text="🔄 Atualizando...", text_color="orange")
+            db = get_db()
+            # Revisão lida antes da página: o que mudar entre as duas consultas volta na próxima sincronização
+            self.revisao_historico = db.revisao_atual()
+            linhas, self.cursor_historico = db.listar_pagina(limite=PAGINA_HISTORICO, status=self._status_filtrado())
+
+            for card in self.cards_agendamentos.values():
+                card['frame'].destroy()
+            self.cards_agendamentos = {}
+            for row in linhas:
+                self._criar_card_agendamento(row)
+            self._atualizar_botao_carregar_mais()
+            self._marcar_sincronizado()
+        except Exception as e:
+            self.sync_label.configure(text="❌ Erro na sincronização", text_color="red")
+            raise
+
+    def _sincronizar_agendamentos(self):
+        """
+        Atualização Inteligente: aplica só as linhas alteradas desde a última revisão vista.
+        Sem alterações (o caso comum) é uma consulta de uma linha e nenhum widget é tocado.
+        """
+        try:
+            db = get_db()
+            if db.revisao_atual() == self.revisao_historico:
+                return
+            self.revisao_historico, linhas, excluidos = db.alteracoes_desde(self.revisao_historico)
+
+            for t_id in excluidos:
+                self._remover_card(t_id)
+            for row in linhas:
+                if self._na_janela(row):
+                    self._atualizar_card(row)
                 else:
-                    self._criar_card_agendamento(t_id, row, target, dt_amigavel, status_lower, cor)
-            if hasattr(self, 'sync_label'):
-                self.sync_label.configure(
-                    text=f"✅ Última atualização: {datetime.now().strftime('%H:%M:%S')}", 
-                    text_color="green"
-                )
+                    # Saiu do filtro ou foi para depois da última página carregada
+                    self._remover_card(row[0])
+            self._marcar_sincronizado()
         except Exception as e:
             self.sync_label.configure(text="❌ Erro na sincronização", text_color="red")
             raise
 
-    def _criar_card_agendamento(self, t_id, row, target, dt_text, status_str, status_color):
+    def _remover_card(self, t_id):
+        card = self.cards_agendamentos.pop(t_id, None)
+        if card:
+            card['frame'].destroy()
+
+    def _atualizar_card(self, row):
+        """Cria o card ou mexe só no que mudou (sem piscar a tela); data nova reposiciona o card."""
+        card = self.cards_agendamentos.get(row[0])
+        if card is None:
+            self._criar_card_agendamento(row)
+            return
+
+        alvo = self._texto_alvo(row)
+        dt_amigavel, status_lower, cor = self._dados_card(row)
+        if card['status_str'] != status_lower:
+            card['label_status'].configure(text=status_lower.upper(), text_color=cor)
+            card['status_str'] = status_lower
+            state = "normal" if status_lower != "running" else "disabled"
+            # Lote não tem formulário de edição (um destino só): apenas excluir
+            card['btn_edit'].configure(state="disabled" if row[7] else state)
+            card['btn_del'].configure(state=state)
+        
+        if card['label_target'].cget("text") != alvo:
+            card['label_target'].configure(text=alvo)
+        if card['label_date'].cget("text") != f"📅 {dt_amigavel}":
+            card['label_date'].configure(text=f"📅 {dt_amigavel}")
+        card['btn_edit'].configure(command=lambda r=row: self._abrir_edicao(r))
+        card['btn_del'].configure(command=lambda r=row: self._excluir_agendamento(r))
+
+        chave = self._chave_linha(row)
+        if chave != card['chave']:
+            card['chave'] = chave
+            card['frame'].pack_forget()
+            self._posicionar_card(card)
+
+    def _posicionar_card(self, card):
+        """Empacota o card antes do primeiro card exibido com chave menor (mais antigo)."""
+        seguintes = [c for c in self.cards_agendamentos.values() if c is not card and c['chave'] < card['chave']]
+        if seguintes:
+            card['frame'].pack(fill="x", pady=5, padx=5, before=max(seguintes, key=lambda c: c['chave'])['frame'])
+        else:
+            card['frame'].pack(fill="x", pady=5, padx=5)
+
+    def _criar_card_agendamento(self, row):
+        t_id = row[0]
+        dt_text, status_str, status_color = self._dados_card(row)
         card = ctk.CTkFrame(self.scrollable_frame, border_width=1)
-        card.pack(fill="x", pady=5, padx=5)
         
         info = ctk.CTkFrame(card, fg_color="transparent")
         info.pack(side="left", fill="both", expand=True, padx=10, pady=10)
         
-        lbl_target = ctk.CTkLabel(info, text=f"📱 {target}", font=("Roboto", 12, "bold"))
+        lbl_target = ctk.CTkLabel(info, text=self._texto_alvo(row), font=("Roboto", 12, "bold"))
         lbl_target.pack(anchor="w")
         lbl_date = ctk.CTkLabel(info, text=f"📅 {dt_text}", font=("Roboto", 10), text_color="gray")
         lbl_date.pack(anchor="w")
@@ -649,7 +823,8 @@ class App(ctk.CTk):
 
         
         b_edit = ctk.CTkButton(btns, text="📝", width=30, fg_color=self.colors["primary"], hover_color=self.colors["hover"], 
-                               command=lambda r=row: self._abrir_edicao(r))
+                               command=lambda r=row: self._abrir_edicao(r),
+                               state="disabled" if row[7] else "normal")
         b_edit.pack(side="left", padx=2)
         
         b_del = ctk.CTkButton(btns, text="🗑️", width=30, fg_color=self.colors["danger"], hover_color=self.colors["danger_hover"], 
@@ -658,19 +833,23 @@ class App(ctk.CTk):
         
         self.cards_agendamentos[t_id] = {
             'frame': card, 'label_status': lbl_status, 'label_target': lbl_target,
-            'label_date': lbl_date, 'status_str': status_str, 'btn_edit': b_edit, 'btn_del': b_del
+            'label_date': lbl_date, 'status_str': status_str, 'btn_edit': b_edit, 'btn_del': b_del,
+            'chave': self._chave_linha(row)
         }
+        self._posicionar_card(self.cards_agendamentos[t_id])
 
     def _excluir_agendamento(self, row):
         if messagebox.askyesno("Excluir", f"Deseja remover {row[2]}?"):
             try:
+                from core import windows_scheduler
                 windows_scheduler.delete_windows_task(row[0])
-                db.deletar(row[0])
-                self._carregar_agendamentos()
+                get_db().deletar(row[0])
+                self._sincronizar_agendamentos()
             except Exception as e: messagebox.showerror("Erro", str(e))
 
     def _abrir_edicao(self, row):
-        task_data = db.obter_por_id(row[0])
+        from core import windows_scheduler
+        task_data = get_db().obter_por_id(row[0])
         if not task_data: return
 
         edit_win = ctk.CTkToplevel(self)
@@ -762,7 +941,7 @@ class App(ctk.CTk):
                 if nova_dt < datetime.now(): return messagebox.showerror("Erro", "Data no passado")
 
                 windows_scheduler.delete_windows_task(task_data['id'])
-                db.atualizar_agendamento_completo(task_data['id'], t_val, m_val, msg_val, self.temp_edit_file, nova_dt)
+                get_db().atualizar_agendamento_completo(task_data['id'], t_val, m_val, msg_val, self.temp_edit_file, nova_dt)
                 
                 json_cfg = {"target": t_val, "mode": m_val, "message": msg_val, "file_path": self.temp_edit_file}
                 windows_scheduler.create_task_bat(task_data['id'], task_data['task_name'], json_cfg)
@@ -770,7 +949,7 @@ class App(ctk.CTk):
 
                 messagebox.showinfo("Sucesso", "Atualizado!")
                 edit_win.destroy()
-                self._carregar_agendamentos()
+                self._sincronizar_agendamentos()
             except Exception as e:
                 messagebox.showerror("Erro", str(e))
 